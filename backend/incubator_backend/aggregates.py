@@ -0,0 +1,41 @@
+"""
+Database aggregates that Django does not ship.
+"""
+import statistics
+
+from django.db.models import Aggregate, FloatField
+
+
+class Median(Aggregate):
+    """
+    Median of a column. Uses PERCENTILE_CONT on PostgreSQL and the MEDIAN
+    aggregate registered on SQLite connections by register_sqlite_functions.
+    """
+    function = 'MEDIAN'
+    name = 'Median'
+    output_field = FloatField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            function='PERCENTILE_CONT',
+            template='%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)',
+            **extra_context
+        )
+
+
+class _SQLiteMedian:
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        if value is not None:
+            self.values.append(float(value))
+
+    def finalize(self):
+        return statistics.median(self.values) if self.values else None
+
+
+def register_sqlite_functions(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        connection.connection.create_aggregate('MEDIAN', 1, _SQLiteMedian)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class IncubatorBackendConfig(AppConfig):
+    name = 'incubator_backend'
+
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
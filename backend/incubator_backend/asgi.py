@@ -14,3 +14,19 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'incubator_backend.settings')
 
 application = get_asgi_application()
+
+# Load roles and stages before the first request. Lookups load them lazily
+# if the database is not reachable yet.
+from django.db import DatabaseError  # noqa: E402
+from incubator_backend.reference import registry  # noqa: E402
+
+try:
+    registry.warm()
+except DatabaseError:
+    pass
+
+# Notification Server-Sent Events need a long-lived async response, they are
+# answered here before Django
+from incubator_backend.notification_stream import with_notification_stream  # noqa: E402
+
+application = with_notification_stream(application)
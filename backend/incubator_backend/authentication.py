@@ -0,0 +1,108 @@
+"""
+JWT authentication for incubator_backend.User.
+
+Tokens issued at login carry the user's role and is_active flag as signed
+claims (see add_user_claims). UserJWTAuthentication builds request.user from
+those claims without a query, the other fields load lazily if a view reads
+them. Tokens without the claims fall back to a bounded, short-TTL cache of
+user rows, which the User save/delete handlers in signals.py invalidate.
+
+Claims are refreshed from the user row whenever an access token is refreshed,
+so a role change or deactivation applies within one access token lifetime.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+from .reference import get_role_name
+
+ROLE_CLAIM = 'role'
+ROLE_ID_CLAIM = 'role_id'
+IS_ACTIVE_CLAIM = 'is_active'
+
+# Fields known from the token claims, everything else is deferred
+CLAIM_FIELDS = ['id', 'role_id', 'is_active']
+
+
+def add_user_claims(token, user):
+    token[ROLE_ID_CLAIM] = user.role_id
+    token[ROLE_CLAIM] = get_role_name(user.role_id)
+    token[IS_ACTIVE_CLAIM] = user.is_active
+    return token
+
+
+class UserCache:
+    """
+    Process-local LRU cache of user rows with a time to live.
+    """
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rows = OrderedDict()
+
+    def get(self, user_id):
+        """
+        Return a fresh User instance for user_id, or None if there is no such user.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._rows.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._rows.move_to_end(user_id)
+                return User.from_db(DEFAULT_DB_ALIAS, entry[1], entry[2])
+
+        field_names = [field.attname for field in User._meta.concrete_fields]
+        values = User.objects.filter(id=user_id).values_list(*field_names).first()
+        if values is None:
+            return None
+        with self._lock:
+            self._rows[user_id] = (now + self.ttl, field_names, values)
+            self._rows.move_to_end(user_id)
+            while len(self._rows) > self.max_size:
+                self._rows.popitem(last=False)
+        return User.from_db(DEFAULT_DB_ALIAS, field_names, values)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._rows.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+
+
+user_cache = UserCache(
+    max_size=getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 30),
+)
+
+
+class UserJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if ROLE_ID_CLAIM in validated_token and IS_ACTIVE_CLAIM in validated_token:
+            user = User.from_db(
+                DEFAULT_DB_ALIAS, CLAIM_FIELDS,
+                [user_id, validated_token[ROLE_ID_CLAIM], validated_token[IS_ACTIVE_CLAIM]]
+            )
+        else:
+            # Token issued before the claims existed
+            user = user_cache.get(user_id)
+            if user is None:
+                raise AuthenticationFailed("User not found", code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code='user_inactive')
+        return user
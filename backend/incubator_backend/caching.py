@@ -0,0 +1,136 @@
+"""
+Version counters for cached data.
+
+Cached entries include the current version of what they depend on in their
+key. Bumping the version on writes makes every older entry unreachable, so
+nothing has to be deleted explicitly.
+
+The counters are CacheVersion rows. The cache backend is a per-host file
+cache whose incr is a read followed by a write, so two processes bumping
+at once could both write the same value and lose one of the bumps; the
+database increments atomically instead. Reading the versions of a request
+is one primary key lookup.
+
+Every model of the app also has a version, bumped by the save/delete handlers
+in signals.py, and the time of its last write. conditional_on() turns them
+into ETag and Last-Modified validators for conditional GETs, cache_response()
+into keys for cached response data.
+"""
+import functools
+import hashlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+from .models import CacheVersion
+
+
+def get_version(name):
+    return CacheVersion.get_many([name])[name][0]
+
+
+def bump_version(name):
+    CacheVersion.bump(name)
+
+
+def _model_version_name(model):
+    return f'model:{model._meta.label_lower}'
+
+
+def bump_model_version(model):
+    bump_version(_model_version_name(model))
+
+
+def get_model_versions(models):
+    """
+    Return {model: (version, last write timestamp)} in one query when every
+    counter already exists.
+    """
+    names = {model: _model_version_name(model) for model in models}
+    found = CacheVersion.get_many(list(names.values()))
+    return {model: found[name] for model, name in names.items()}
+
+
+def _request_versions(request, models):
+    # The validators and the response cache of one request share one read
+    memo = request.__dict__.setdefault('_model_versions', {})
+    if models not in memo:
+        memo[models] = get_model_versions(models)
+    return memo[models]
+
+
+def _versions_digest(versions):
+    text = ';'.join(f'{model._meta.label_lower}={version}' for model, (version, _) in versions.items())
+    return hashlib.md5(text.encode(), usedforsecurity=False).hexdigest()
+
+
+def conditional_on(*models, vary=None):
+    """
+    Decorator answering If-None-Match / If-Modified-Since with 304 for a view
+    whose GET response only depends on rows of models. The validators come
+    from the model versions, so an unchanged response costs one lookup of
+    the counters instead of the view's queries.
+
+    A response that also depends on something else, e.g. the current date,
+    passes vary(request, *args, **kwargs) returning a string that describes
+    it. That string is part of the ETag, and no Last-Modified is sent since
+    the model write times cannot account for it.
+    """
+    def etag(request, *args, **kwargs):
+        digest = _versions_digest(_request_versions(request, models))
+        if vary is not None:
+            digest = hashlib.md5(f'{digest}|{vary(request, *args, **kwargs)}'.encode(), usedforsecurity=False).hexdigest()
+        return digest
+
+    def last_modified(request, *args, **kwargs):
+        versions = _request_versions(request, models)
+        return datetime.fromtimestamp(max(modified for _, modified in versions.values()), tz=timezone.utc)
+
+    return condition(etag_func=etag, last_modified_func=last_modified if vary is None else None)
+
+
+def cache_response(*models, timeout=None, per_user=False):
+    """
+    Decorator caching the data and headers of successful GET responses of a
+    DRF view whose output only depends on rows of models. Entries are keyed by the route,
+    the query parameters and the model versions, so any write to one of the
+    models makes them unreachable.
+
+    Entries are shared by every client. A view whose output depends on the
+    requesting user, e.g. on their role, passes per_user=True to key them
+    by user as well; it should pass a matching vary to conditional_on.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            query = '&'.join(f'{name}={value}' for name, values in sorted(request.GET.lists()) for value in values)
+            user = f'|user={request.user.pk}' if per_user else ''
+            key = 'response:v2:' + hashlib.md5(
+                f'{request.get_host()}{request.path}?{query}|{_versions_digest(_request_versions(request, models))}{user}'.encode(),
+                usedforsecurity=False
+            ).hexdigest()
+            cached = cache.get(key)
+            if cached is not None:
+                data, headers = cached
+                return Response(data, headers=headers)
+
+            response = view(request, *args, **kwargs)
+            if per_user:
+                patch_vary_headers(response, ['Authorization'])
+            if response.status_code == 200 and isinstance(response, Response):
+                # Keep the headers the view set, such as X-Result-Limit
+                headers = {name: value for name, value in response.items() if name.lower() != 'content-type'}
+                cache.set(key, (response.data, headers), timeout)
+            return response
+        return wrapper
+    return decorator
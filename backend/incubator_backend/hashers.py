@@ -0,0 +1,52 @@
+"""
+Password hashing policy.
+
+PASSWORD_HASHERS in settings picks the algorithm, the first entry hashes new
+passwords and the others only verify older hashes. TunablePBKDF2PasswordHasher
+reads its work factor from settings.PASSWORD_HASH_ITERATIONS, so raising it
+needs no code change: User.check_password rehashes a password with the
+current policy on the next successful login.
+
+Sync code, including sync views under ASGI which Django already runs off the
+event loop, hashes with django.contrib.auth.hashers directly. Async code uses
+amake_password and acheck_password, which await the hash on a bounded pool
+of PASSWORD_HASH_WORKERS threads so the event loop keeps serving other
+requests. PBKDF2 releases the GIL, so hashes on the pool run in parallel up
+to its size and queue beyond it.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class TunablePBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', hashers.PBKDF2PasswordHasher.iterations)
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1,
+    thread_name_prefix='password-hash',
+)
+
+
+async def amake_password(password):
+    return await asyncio.get_running_loop().run_in_executor(_executor, hashers.make_password, password)
+
+
+async def acheck_password(password, encoded, setter=None):
+    """
+    Same contract as django.contrib.auth.hashers.acheck_password, setter
+    being a coroutine function, but the hash runs on the pool instead of
+    the event loop.
+    """
+    is_correct, must_update = await asyncio.get_running_loop().run_in_executor(
+        _executor, hashers.verify_password, password, encoded
+    )
+    if setter and is_correct and must_update:
+        await setter(password)
+    return is_correct
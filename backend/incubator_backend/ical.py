@@ -0,0 +1,77 @@
+"""
+iCalendar (RFC 5545) output for events.
+
+ical_lines() turns an iterator of events into the lines of a VCALENDAR
+without holding the events or the output in memory, for use as the body of
+a StreamingHttpResponse.
+"""
+from datetime import timezone as dt_timezone
+
+from django.utils import timezone
+
+PRODUCT_ID = '-//ENSIA Incubator//Events//EN'
+
+# Content lines are folded at 75 octets
+LINE_LIMIT = 75
+
+
+def escape_text(value):
+    return (
+        (value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def format_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def fold(line):
+    """
+    Split a content line into chunks of at most LINE_LIMIT octets, the
+    continuation lines starting with a space. Never splits a UTF-8 character.
+    """
+    encoded = line.encode('utf-8')
+    if len(encoded) <= LINE_LIMIT:
+        return line + '\r\n'
+    parts = []
+    limit = LINE_LIMIT
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Back off to the start of a character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        # The leading space counts towards the limit
+        limit = LINE_LIMIT - 1
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def ical_lines(events, name, domain):
+    """
+    Yield the folded lines of a calendar named `name` holding `events`.
+    Event UIDs are made unique with `domain`.
+    """
+    stamp = format_datetime(timezone.now())
+    yield fold('BEGIN:VCALENDAR')
+    yield fold('VERSION:2.0')
+    yield fold(f'PRODID:{PRODUCT_ID}')
+    yield fold('CALSCALE:GREGORIAN')
+    yield fold(f'X-WR-CALNAME:{escape_text(name)}')
+    for event in events:
+        yield fold('BEGIN:VEVENT')
+        yield fold(f'UID:event-{event.id}@{domain}')
+        yield fold(f'DTSTAMP:{stamp}')
+        yield fold(f'DTSTART:{format_datetime(event.start_time)}')
+        yield fold(f'DTEND:{format_datetime(event.end_time)}')
+        yield fold(f'SUMMARY:{escape_text(event.title)}')
+        if event.description:
+            yield fold(f'DESCRIPTION:{escape_text(event.description)}')
+        yield fold(f'LOCATION:{escape_text(event.location)}')
+        yield fold('END:VEVENT')
+    yield fold('END:VCALENDAR')
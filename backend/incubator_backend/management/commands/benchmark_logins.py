@@ -0,0 +1,61 @@
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from incubator_backend.models import User
+from incubator_backend.reference import get_role
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure logins per second for one worker process: POST /auth/login/ from "
+        "--threads concurrent clients with the current password hashing policy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=50, help="Total number of logins.")
+        parser.add_argument('--threads', type=int, default=4, help="Concurrent clients, like a threaded worker.")
+
+    def handle(self, *args, **options):
+        role = get_role('student')
+        if role is None:
+            raise CommandError("The student role is missing.")
+
+        password = uuid.uuid4().hex
+        user = User(full_name='Login benchmark', email=f'login-benchmark-{uuid.uuid4().hex[:8]}@ensia.edu.dz', role=role)
+        user.set_password(password)
+        user.save()
+        try:
+            timings, wall = self.run(user.email, password, options['logins'], options['threads'])
+        finally:
+            user.delete()
+
+        self.stdout.write(
+            f"hasher: {settings.PASSWORD_HASHERS[0]}, iterations: {getattr(settings, 'PASSWORD_HASH_ITERATIONS', '-')}\n"
+            f"logins: {len(timings)}, threads: {options['threads']}\n"
+            f"logins/sec: {len(timings) / wall:.2f}\n"
+            f"latency p50: {statistics.median(timings) * 1000:.1f} ms, "
+            f"mean: {statistics.fmean(timings) * 1000:.1f} ms, max: {max(timings) * 1000:.1f} ms"
+        )
+
+    def run(self, email, password, logins, threads):
+        def login(_):
+            client = Client(HTTP_HOST='localhost')
+            start = time.perf_counter()
+            response = client.post('/auth/login/', {'email': email, 'password': password}, content_type='application/json')
+            elapsed = time.perf_counter() - start
+            connection.close()
+            if response.status_code != 200:
+                raise CommandError(f"Login failed with status {response.status_code}: {response.content[:200]}")
+            return elapsed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            timings = list(executor.map(login, range(logins)))
+        return timings, time.perf_counter() - start
@@ -0,0 +1,163 @@
+import json
+import re
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver
+from django.utils import timezone
+
+from incubator_backend.models import (
+    User, Startup, TeamMember, Application, Stage, Deliverable, Resource,
+    Event, JuryEvaluation, FileMetadata, Notification, IncubationForm, DocumentUpload
+)
+from incubator_backend.serializers import MyTokenObtainPairSerializer
+
+# First path segment -> queryset used to fill the <int:id> of detail routes
+SAMPLE_OBJECTS = {
+    'users': lambda: User.objects.all(),
+    'startups': lambda: Startup.objects.all(),
+    'applications': lambda: Application.objects.all(),
+    'stages': lambda: Stage.objects.all(),
+    'deliverables': lambda: Deliverable.objects.all(),
+    'resources': lambda: Resource.objects.all(),
+    'events': lambda: Event.objects.all(),
+    'jury-evaluations': lambda: JuryEvaluation.objects.all(),
+    'files': lambda: FileMetadata.objects.all(),
+    'notifications': lambda: Notification.objects.all(),
+    'incubation-form': lambda: IncubationForm.objects.all(),
+    'mentors': lambda: User.objects.filter(role__name='mentor'),
+    'trainers': lambda: User.objects.filter(role__name='trainer'),
+}
+
+
+def calendar_query():
+    start = timezone.localdate()
+    return f'?from={start}&to={start + timedelta(days=30)}'
+
+
+def calendar_feed_query():
+    trainer_id = Event.objects.order_by('id').values_list('user_id', flat=True).first()
+    return f'?user={trainer_id}' if trainer_id is not None else ''
+
+
+# Query strings for routes that need one to do real work, as strings or
+# callables run once per benchmark
+ROUTE_QUERY_STRINGS = {
+    'global-search': '?q=data',
+    'events-calendar': calendar_query,
+    'events-calendar-feed': calendar_feed_query,
+}
+
+
+def percentile(samples, percent):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[percent - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Call every GET route in urls.py through the Django test client and report "
+        "p50/p95/p99 latency and query counts as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help="Requests per route.")
+        parser.add_argument('--routes', nargs='*', default=None, help="Only benchmark these URL names.")
+        parser.add_argument('--output', default=None, help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        admin = User.objects.filter(role__name='admin', is_active=True).first()
+        if admin is not None:
+            token = MyTokenObtainPairSerializer.get_token(admin).access_token
+            client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+        routes = {}
+        for pattern in get_resolver().url_patterns:
+            # Skip included URLconfs (admin, allauth), only this project's routes
+            if not isinstance(pattern, URLPattern):
+                continue
+            view_class = getattr(pattern.callback, 'cls', None) or getattr(pattern.callback, 'view_class', None)
+            if view_class is not None and not hasattr(view_class, 'get'):
+                continue
+            name = pattern.name or str(pattern.pattern)
+            if options['routes'] and name not in options['routes']:
+                continue
+            path = self.build_path(str(pattern.pattern))
+            if path is None:
+                routes[name] = {'path': str(pattern.pattern), 'skipped': 'no sample object'}
+                continue
+            unfilled = re.findall(r'<[^>]+>', path)
+            if unfilled:
+                routes[name] = {'path': str(pattern.pattern), 'skipped': f"no sample for {', '.join(unfilled)}"}
+                continue
+            query = ROUTE_QUERY_STRINGS.get(name, '')
+            if callable(query):
+                query = query()
+            routes[name] = self.benchmark(client, path + query, options['iterations'])
+
+        report = json.dumps(
+            {'generated_at': timezone.now().isoformat(), 'iterations': options['iterations'], 'routes': routes},
+            indent=2
+        )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(report)
+
+    def build_path(self, route):
+        """
+        Replace the route's converters with the ids of existing objects.
+        Returns None when there is no object to use, converters left in the
+        path have no sample and the route is skipped.
+        """
+        segments = route.split('/')
+        kwargs = {}
+        if '<int:startup_id>' in route:
+            member = TeamMember.objects.first()
+            if member is None:
+                return None
+            kwargs.update({'<int:startup_id>': member.startup_id, '<int:member_id>': member.id})
+        if '<int:id>' in route:
+            sample = SAMPLE_OBJECTS.get(segments[0])
+            obj = sample().order_by('id').first() if sample else None
+            if obj is None:
+                return None
+            kwargs['<int:id>'] = obj.id
+        if '<uuid:upload_id>' in route:
+            upload = DocumentUpload.objects.order_by('-updated_at').first()
+            if upload is None:
+                return None
+            kwargs['<uuid:upload_id>'] = upload.id
+        for placeholder, value in kwargs.items():
+            route = route.replace(placeholder, str(value))
+        return '/' + route
+
+    def benchmark(self, client, path, iterations):
+        timings, queries, statuses = [], [], {}
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(path)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured.captured_queries))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        return {
+            'path': path,
+            'statuses': statuses,
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': max(queries),
+        }
@@ -0,0 +1,249 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from incubator_backend import search
+from incubator_backend.caching import bump_model_version
+from incubator_backend.models import (
+    ROLE_CHOICES, User, Role, Startup, TeamMember, Application, ApplicationVote,
+    ApplicationScore, Stage, Deliverable, Resource, ResourceRequest, Event,
+    Notification, IncubationForm, IncubationFormScore, AnalyticsSnapshot,
+    ResourceUsage, NotificationCounter
+)
+
+BATCH_SIZE = 1000
+
+STAGES = [('Idea', 1, 3), ('Prototype', 2, 4), ('MVP', 3, 6), ('Scaling', 4, 12)]
+RESOURCE_TYPES = ['room', 'laptop', 'gpu', 'cloud credits', 'printer']
+WORDS = (
+    'smart farming health delivery drone solar water education payment market '
+    'logistics energy tourism waste recycling ai vision language mobile platform '
+    'data network secure cloud robot sensor clinic school student city transport'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a realistic dataset with bulk_create: users, startups with teams, "
+        "applications with votes and scores, incubation forms, deliverables, events, "
+        "resources, requests and notifications."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=3000, help="Number of users to create.")
+        parser.add_argument('--startups', type=int, default=300, help="Number of startups to create.")
+        parser.add_argument('--seed', type=int, default=None, help="Random seed, for reproducible datasets.")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        # Unique per run so several datasets can be generated in the same database
+        self.run_id = uuid.uuid4().hex[:6]
+
+        n_users, n_startups = options['users'], options['startups']
+        n_students = int(n_users * 0.85)
+        if n_startups * 5 > n_students:
+            raise CommandError(
+                f"{n_startups} startups need up to {n_startups * 5} students, raise --users or lower --startups."
+            )
+
+        with transaction.atomic():
+            counts = self.generate(n_users, n_students, n_startups)
+
+        # bulk_create skips the signal handlers, rebuild what they maintain
+        AnalyticsSnapshot.reconcile()
+        ResourceUsage.rebuild()
+        IncubationForm.rebuild_scores()
+        NotificationCounter.rebuild()
+        if search.is_supported():
+            search.rebuild_index()
+        for model in apps.get_app_config('incubator_backend').get_models():
+            bump_model_version(model)
+
+        for name, count in counts.items():
+            self.stdout.write(f"{name}: {count}")
+        self.stdout.write(self.style.SUCCESS("Dataset generated."))
+
+    def bulk(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+        if created and created[0].pk is None:
+            raise CommandError("The database backend must return primary keys from bulk inserts.")
+        return created
+
+    def sentence(self, words):
+        return ' '.join(self.random.choice(WORDS) for _ in range(words)).capitalize()
+
+    def generate(self, n_users, n_students, n_startups):
+        rnd = self.random
+        now = timezone.now()
+        roles = {name: Role.objects.get_or_create(name=name)[0] for name, _ in ROLE_CHOICES}
+        stages = list(Stage.objects.all()) or self.bulk(Stage, [
+            Stage(name=name, sequence_order=order, duration_months=months) for name, order, months in STAGES
+        ])
+
+        # Users: mostly students, the rest spread over staff roles. Hashing is
+        # slow on purpose, so every generated user shares one password hash.
+        password_hash = make_password('password123')
+        staff_roles = ['mentor', 'trainer', 'coach', 'admin']
+        users = self.bulk(User, [
+            User(
+                full_name=f"{self.sentence(2)} {i}"[:30],
+                email=f"user{self.run_id}{i}@ensia.edu.dz",
+                password_hash=password_hash,
+                role=roles['student'] if i < n_students else roles[staff_roles[i % len(staff_roles)]],
+            )
+            for i in range(n_users)
+        ])
+        students = users[:n_students]
+        staff = users[n_students:]
+        mentors = [user for user in staff if user.role_id == roles['mentor'].id] or staff
+        trainers = [user for user in staff if user.role_id == roles['trainer'].id] or staff
+
+        # Startups with a leader and 2-4 members, each student in one team at most
+        startups = self.bulk(Startup, [
+            Startup(
+                name=f"{self.sentence(2)} {self.run_id}-{i}",
+                description=self.sentence(25),
+                status=rnd.choice(['pending', 'approved', 'approved', 'rejected']),
+                stage=rnd.choice(stages),
+            )
+            for i in range(n_startups)
+        ])
+        pool = list(students)
+        rnd.shuffle(pool)
+        members, team_names = [], {}
+        for startup in startups:
+            team = [pool.pop() for _ in range(rnd.randint(3, 5))]
+            team_names[startup.id] = ', '.join(user.full_name for user in team)
+            startup.user = team[0]
+            members.append(TeamMember(startup=startup, user=team[0], role_in_team='Team Leader'))
+            members += [TeamMember(startup=startup, user=user, role_in_team='Member') for user in team[1:]]
+        Startup.objects.bulk_update(startups, ['user'], batch_size=BATCH_SIZE)
+        self.bulk(TeamMember, members)
+
+        # Applications, with votes and scores from distinct reviewers
+        applications = self.bulk(Application, [
+            Application(startup=startup, status=rnd.choice(['pending', 'approved', 'rejected']))
+            for startup in startups
+        ])
+        votes, scores = [], []
+        for application in applications:
+            for reviewer in rnd.sample(mentors, min(len(mentors), rnd.randint(1, 6))):
+                votes.append(ApplicationVote(application=application, user=reviewer, vote=rnd.random() < 0.6))
+                scores.append(ApplicationScore(application=application, user=reviewer, score=rnd.randint(0, 20)))
+        self.bulk(ApplicationVote, votes)
+        self.bulk(ApplicationScore, scores)
+
+        # Incubation forms, one per startup, most of them scored
+        forms = self.bulk(IncubationForm, [
+            IncubationForm(
+                project_id=f"P-{self.run_id}-{i}",
+                team_leader_name=startup.user.full_name,
+                team_leader_year=str(rnd.randint(1, 5)),
+                team_leader_email=startup.user.email,
+                team_leader_phone=f"0{rnd.randint(500000000, 799999999)}",
+                team_members=team_names[startup.id],
+                project_title=startup.name[:255],
+                project_domain=rnd.choice(WORDS),
+                is_ai_project=rnd.random() < 0.4,
+                project_summary=self.sentence(80),
+                dev_stage=rnd.choice(['idea', 'prototype', 'mvp', 'scaling']),
+                demo_link=f"https://example.com/demo/{self.run_id}/{i}",
+                key_milestones=self.sentence(40),
+                current_challenges=self.sentence(40),
+                problem_statement=self.sentence(60),
+                target_audience=self.sentence(20),
+                expected_impact=self.sentence(40),
+                confirmation=True,
+                status=rnd.choice(['pending', 'pending', 'approved', 'rejected', 'in_progress']),
+            )
+            for i, startup in enumerate(startups)
+        ])
+        form_scores = self.bulk(IncubationFormScore, [
+            IncubationFormScore(
+                incubation_form=form,
+                reviewer=reviewer,
+                problem_understanding=rnd.randint(0, 10),
+                solution_fit=rnd.randint(0, 10),
+                technical_soundness=rnd.randint(0, 10),
+            )
+            for form in forms if rnd.random() < 0.7
+            for reviewer in rnd.sample(mentors, min(len(mentors), rnd.randint(1, 4)))
+        ])
+
+        deliverables = self.bulk(Deliverable, [
+            Deliverable(
+                title=self.sentence(3)[:100],
+                description=self.sentence(30),
+                due_date=(now + timedelta(days=rnd.randint(-60, 90))).date(),
+                status=rnd.choice(['pending', 'submitted', 'reviewed']),
+                stage=rnd.choice(stages),
+                startup=startup,
+            )
+            for startup in startups for _ in range(rnd.randint(1, 4))
+        ])
+
+        # Events spread over the last and next three months
+        events = []
+        for _ in range(n_startups * 2):
+            start = now + timedelta(days=rnd.randint(-90, 90), hours=rnd.randint(8, 17))
+            events.append(Event(
+                title=self.sentence(3)[:100],
+                description=self.sentence(20),
+                start_time=start,
+                end_time=start + timedelta(hours=rnd.randint(1, 3)),
+                location=f"Room {rnd.randint(1, 20)}",
+                user=rnd.choice(trainers),
+            ))
+        events = self.bulk(Event, events)
+
+        resources = self.bulk(Resource, [
+            Resource(
+                type=rnd.choice(RESOURCE_TYPES),
+                name=f"{self.sentence(2)} {self.run_id}-{i}"[:100],
+                description=self.sentence(10),
+                quantity_available=rnd.randint(5, 100),
+            )
+            for i in range(max(10, n_startups // 10))
+        ])
+        requests = self.bulk(ResourceRequest, [
+            ResourceRequest(
+                quantity_requested=rnd.randint(1, 5),
+                status=rnd.choice(['pending', 'approved', 'rejected']),
+                startup=startup,
+                resource=rnd.choice(resources),
+                user=startup.user,
+            )
+            for startup in startups for _ in range(rnd.randint(0, 3))
+        ])
+
+        notifications = self.bulk(Notification, [
+            Notification(
+                type=rnd.choice(['event', 'application', 'deliverable', 'resource']),
+                message=self.sentence(12),
+                is_read=rnd.random() < 0.5,
+                user=user,
+            )
+            for user in users for _ in range(rnd.randint(0, 6))
+        ])
+
+        return {
+            'users': len(users),
+            'startups': len(startups),
+            'team members': len(members),
+            'applications': len(applications),
+            'votes': len(votes),
+            'scores': len(scores),
+            'incubation forms': len(forms),
+            'incubation form scores': len(form_scores),
+            'deliverables': len(deliverables),
+            'events': len(events),
+            'resources': len(resources),
+            'resource requests': len(requests),
+            'notifications': len(notifications),
+        }
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from incubator_backend import uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked document uploads left incomplete and their partial files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=float,
+            help="Idle time after which an incomplete upload is deleted, defaults to settings.UPLOAD_EXPIRY.",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(hours=options['hours']) if options['hours'] is not None else None
+        deleted = uploads.purge_stale(older_than)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} incomplete upload(s)."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from incubator_backend import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from the startups, incubation forms, users and events tables."
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError("Full-text search needs PostgreSQL or SQLite.")
+        counts = search.rebuild_index()
+        for object_type, count in counts.items():
+            self.stdout.write(f"{object_type}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {sum(counts.values())} object(s)."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from incubator_backend.models import AnalyticsSnapshot, ResourceUsage, IncubationForm, NotificationCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the analytics snapshot counters, resource usage rollup, incubation form score "
+        "averages and unread notification counters from the source tables and repair any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only report drift, do not repair the counters.",
+        )
+
+    def handle(self, *args, **options):
+        repair = not options['check']
+        drift = AnalyticsSnapshot.reconcile(repair=repair)
+        for resource_id, (stored, actual) in ResourceUsage.rebuild(repair=repair).items():
+            drift[f"resource {resource_id} used"] = (stored, actual)
+        for form_id, (stored, actual) in IncubationForm.rebuild_scores(repair=repair).items():
+            drift[f"incubation form {form_id} total_score"] = (stored, actual)
+        for user_id, (stored, actual) in NotificationCounter.rebuild(repair=repair).items():
+            drift[f"user {user_id} unread notifications"] = (stored, actual)
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Analytics snapshot is up to date."))
+            return
+        for name, (stored, actual) in drift.items():
+            self.stdout.write(f"{name}: stored {stored}, actual {actual}")
+        if options['check']:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} counter(s) drifted."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {len(drift)} counter(s)."))
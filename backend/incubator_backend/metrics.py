@@ -0,0 +1,222 @@
+"""
+Per-route request metrics exposed in the Prometheus text format.
+
+RequestMetricsMiddleware times every request, counts its database queries
+and their time through a connection execute wrapper, and aggregates the
+numbers in-process per resolved URL name. Streamed responses are measured
+until their last chunk is sent, as their queries run while the body is
+produced. metrics_view renders the numbers at /metrics/ for admins and for
+a scraper presenting settings.METRICS_SCRAPE_TOKEN. Routes listed in
+settings.METRICS_QUERY_BUDGETS log a warning with the executed SQL when a
+request runs more queries than its budget.
+"""
+import hmac
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .authentication import UserJWTAuthentication
+from .utils import is_admin
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Keep at most this many statements per request for budget warnings
+MAX_RECORDED_QUERIES = 200
+
+
+class RouteStats:
+    __slots__ = ('bucket_counts', 'count', 'duration_sum', 'queries', 'db_seconds', 'response_bytes')
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.duration_sum = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = defaultdict(RouteStats)
+        self._statuses = defaultdict(int)
+
+    def record(self, route, method, status_code, duration, queries, db_seconds, response_bytes):
+        with self._lock:
+            stats = self._routes[(route, method)]
+            stats.count += 1
+            stats.duration_sum += duration
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    stats.bucket_counts[index] += 1
+                    break
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+            stats.response_bytes += response_bytes
+            self._statuses[(route, method, status_code)] += 1
+
+    def render(self):
+        with self._lock:
+            routes = {key: _copy_stats(stats) for key, stats in self._routes.items()}
+            statuses = dict(self._statuses)
+
+        lines = [
+            '# HELP http_requests_total Requests handled, by route, method and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (route, method, status_code), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{_labels(route=route, method=method, status=status_code)} {count}')
+
+        lines += [
+            '# HELP http_request_duration_seconds Request latency, by route and method.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (route, method), stats in sorted(routes.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'http_request_duration_seconds_bucket{_labels(route=route, method=method, le=bound)} {cumulative}'
+                )
+            lines.append(
+                f'http_request_duration_seconds_bucket{_labels(route=route, method=method, le="+Inf")} {stats.count}'
+            )
+            lines.append(f'http_request_duration_seconds_sum{_labels(route=route, method=method)} {stats.duration_sum}')
+            lines.append(f'http_request_duration_seconds_count{_labels(route=route, method=method)} {stats.count}')
+
+        for name, attribute, help_text in (
+            ('http_request_db_queries_total', 'queries', 'Database queries run, by route and method.'),
+            ('http_request_db_seconds_total', 'db_seconds', 'Time spent in database queries, by route and method.'),
+            ('http_response_size_bytes_total', 'response_bytes', 'Response body bytes sent, by route and method.'),
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            for (route, method), stats in sorted(routes.items()):
+                lines.append(f'{name}{_labels(route=route, method=method)} {getattr(stats, attribute)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._statuses.clear()
+
+
+def _copy_stats(stats):
+    copy = RouteStats()
+    for attribute in RouteStats.__slots__:
+        value = getattr(stats, attribute)
+        setattr(copy, attribute, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+registry = MetricsRegistry()
+
+
+class QueryRecorder:
+    """
+    Execute wrapper that counts queries and their time for one request.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            if len(self.statements) < MAX_RECORDED_QUERIES:
+                self.statements.append(sql)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budgets = getattr(settings, 'METRICS_QUERY_BUDGETS', {})
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        if response.streaming and not response.is_async:
+            # The body runs its queries as it is sent, record once it is done
+            response.streaming_content = self._measure_stream(
+                response.streaming_content, request, response, recorder, start
+            )
+        else:
+            response_bytes = 0 if response.streaming else len(response.content)
+            self._record(request, response, recorder, start, response_bytes)
+        return response
+
+    def _measure_stream(self, content, request, response, recorder, start):
+        response_bytes = 0
+        try:
+            chunks = iter(content)
+            while True:
+                with connection.execute_wrapper(recorder):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                response_bytes += len(chunk)
+                yield chunk
+        finally:
+            self._record(request, response, recorder, start, response_bytes)
+
+    def _record(self, request, response, recorder, start, response_bytes):
+        duration = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        route = (match.url_name or match.route) if match else 'unresolved'
+        registry.record(
+            route, request.method, response.status_code, duration,
+            recorder.count, recorder.seconds, response_bytes
+        )
+
+        budget = self.budgets.get(route)
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                "Query budget exceeded on %s %s (%s): %d queries, budget %d\n%s",
+                request.method, request.path, route, recorder.count, budget,
+                '\n'.join(recorder.statements)
+            )
+
+
+def _may_read_metrics(request):
+    authorization = request.headers.get('Authorization', '').split()
+    if len(authorization) != 2 or authorization[0] != 'Bearer':
+        return False
+    scrape_token = getattr(settings, 'METRICS_SCRAPE_TOKEN', None)
+    if scrape_token and hmac.compare_digest(authorization[1].encode(), scrape_token.encode()):
+        return True
+    try:
+        authenticated = UserJWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return False
+    return authenticated is not None and is_admin(authenticated[0])
+
+
+def metrics_view(request):
+    if not _may_read_metrics(request):
+        return JsonResponse({'error': 'Admin or metrics token required', 'code': 'metrics_forbidden'}, status=403)
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 06:52
+
+from django.db import migrations, models
+
+
+def create_snapshot(apps, schema_editor):
+    AnalyticsSnapshot = apps.get_model('incubator_backend', 'AnalyticsSnapshot')
+    Startup = apps.get_model('incubator_backend', 'Startup')
+    Application = apps.get_model('incubator_backend', 'Application')
+    IncubationForm = apps.get_model('incubator_backend', 'IncubationForm')
+    User = apps.get_model('incubator_backend', 'User')
+    AnalyticsSnapshot.objects.create(
+        pk=1,
+        active_startups=Startup.objects.filter(status='approved').count(),
+        pending_applications=Application.objects.filter(status='pending').count(),
+        pending_forms=IncubationForm.objects.filter(status='pending').count(),
+        mentors_count=User.objects.filter(role__name='mentor').count(),
+        trainers_count=User.objects.filter(role__name='trainer').count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0008_alter_incubationformscore_incubation_form'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('active_startups', models.IntegerField(default=0)),
+                ('pending_applications', models.IntegerField(default=0)),
+                ('pending_forms', models.IntegerField(default=0)),
+                ('mentors_count', models.IntegerField(default=0)),
+                ('trainers_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'analytics_snapshot',
+            },
+        ),
+        migrations.RunPython(create_snapshot, migrations.RunPython.noop),
+    ]
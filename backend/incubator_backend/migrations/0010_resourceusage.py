@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+
+
+def create_usage(apps, schema_editor):
+    Resource = apps.get_model('incubator_backend', 'Resource')
+    ResourceUsage = apps.get_model('incubator_backend', 'ResourceUsage')
+    resources = Resource.objects.annotate(
+        used_quantity=Coalesce(
+            Sum('resourcerequest__quantity_requested', filter=Q(resourcerequest__status='approved')),
+            0
+        )
+    )
+    ResourceUsage.objects.bulk_create([
+        ResourceUsage(resource_id=resource_id, used=used)
+        for resource_id, used in resources.values_list('id', 'used_quantity')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0009_analyticssnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceUsage',
+            fields=[
+                ('resource', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='usage', serialize=False, to='incubator_backend.resource')),
+                ('used', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'resource_usage',
+            },
+        ),
+        migrations.RunPython(create_usage, migrations.RunPython.noop),
+    ]
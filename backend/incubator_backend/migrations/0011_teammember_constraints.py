@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-18 06:54
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_memberships(apps, schema_editor):
+    """
+    Refuse to add the constraints over rows that break them. Which
+    membership to keep is a decision for an admin, so the conflicting rows
+    are listed to be resolved by hand before migrating again.
+    """
+    TeamMember = apps.get_model('incubator_backend', 'TeamMember')
+    problems = []
+    for row in TeamMember.objects.values('user').order_by().annotate(count=Count('id')).filter(count__gt=1):
+        startups = TeamMember.objects.filter(user=row['user']).values_list('startup', flat=True)
+        problems.append(f"user {row['user']} is a member of startups {', '.join(map(str, startups))}")
+    leaders = TeamMember.objects.filter(role_in_team='Team Leader')
+    for row in leaders.values('startup').order_by().annotate(count=Count('id')).filter(count__gt=1):
+        users = leaders.filter(startup=row['startup']).values_list('user', flat=True)
+        problems.append(f"startup {row['startup']} has team leaders {', '.join(map(str, users))}")
+    if problems:
+        raise RuntimeError(
+            'Resolve these team memberships before migrating:\n' + '\n'.join(problems)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0010_resourceusage'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_memberships, migrations.RunPython.noop),
+        # Implied by one_startup_per_user
+        migrations.AlterUniqueTogether(
+            name='teammember',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='teammember',
+            constraint=models.UniqueConstraint(fields=('user',), name='one_startup_per_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='teammember',
+            constraint=models.UniqueConstraint(condition=models.Q(('role_in_team', 'Team Leader')), fields=('startup',), name='one_leader_per_startup'),
+        ),
+    ]
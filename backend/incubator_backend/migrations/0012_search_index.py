@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            """
+            CREATE TABLE search_index (
+                object_type varchar(20) NOT NULL,
+                object_id bigint NOT NULL,
+                title text NOT NULL,
+                body text NOT NULL,
+                document tsvector NOT NULL,
+                PRIMARY KEY (object_type, object_id)
+            )
+            """
+        )
+        schema_editor.execute("CREATE INDEX search_index_document_gin ON search_index USING GIN (document)")
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "object_type UNINDEXED, object_id UNINDEXED, title, body, tokenize='unicode61')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute("DROP TABLE IF EXISTS search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0011_teammember_constraints'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
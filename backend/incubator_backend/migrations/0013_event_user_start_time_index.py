@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0012_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'start_time'], name='events_user_id_893d7c_idx'),
+        ),
+    ]
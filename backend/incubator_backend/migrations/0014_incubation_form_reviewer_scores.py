@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-18 07:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Avg, Count, FloatField
+
+CRITERIA = ('problem_understanding', 'solution_fit', 'technical_soundness')
+
+
+def backfill_form_scores(apps, schema_editor):
+    IncubationForm = apps.get_model('incubator_backend', 'IncubationForm')
+    IncubationFormScore = apps.get_model('incubator_backend', 'IncubationFormScore')
+    rows = IncubationFormScore.objects.values('incubation_form').order_by().annotate(
+        score_count=Count('id'),
+        **{f'{criterion}_avg': Avg(criterion, output_field=FloatField()) for criterion in CRITERIA}
+    )
+    for row in rows:
+        form_id = row.pop('incubation_form')
+        row['total_score'] = sum(row[f'{criterion}_avg'] for criterion in CRITERIA)
+        IncubationForm.objects.filter(pk=form_id).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0013_event_user_start_time_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incubationform',
+            name='problem_understanding_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='incubationform',
+            name='score_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='incubationform',
+            name='solution_fit_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='incubationform',
+            name='technical_soundness_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='incubationform',
+            name='total_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='incubationformscore',
+            name='reviewer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='incubation_form_scores', to='incubator_backend.user'),
+        ),
+        migrations.RunPython(backfill_form_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='incubationform',
+            index=models.Index(fields=['status', '-total_score', '-id'], name='incubation_form_status_score'),
+        ),
+        migrations.AddIndex(
+            model_name='incubationform',
+            index=models.Index(fields=['-total_score', '-id'], name='incubation_form_total_score'),
+        ),
+        migrations.AddConstraint(
+            model_name='incubationformscore',
+            constraint=models.UniqueConstraint(fields=('incubation_form', 'reviewer'), name='one_score_per_reviewer'),
+        ),
+    ]
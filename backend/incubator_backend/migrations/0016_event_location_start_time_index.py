@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0015_document_upload'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location', 'start_time'], name='events_locatio_30b837_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0016_event_location_start_time_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'end_time'], name='events_user_id_046cc9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location', 'end_time'], name='events_locatio_b3b200_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 07:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def create_counters(apps, schema_editor):
+    Notification = apps.get_model('incubator_backend', 'Notification')
+    NotificationCounter = apps.get_model('incubator_backend', 'NotificationCounter')
+    unread = Notification.objects.filter(is_read=False).values('user').order_by().annotate(total=Count('id'))
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=row['user'], unread=row['total']) for row in unread.iterator()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0017_event_end_time_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to='incubator_backend.user')),
+                ('unread', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'notification_counters',
+            },
+        ),
+        migrations.RunPython(create_counters, migrations.RunPython.noop),
+    ]
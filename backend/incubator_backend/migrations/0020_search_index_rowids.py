@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# search.ROWID_STRIDE and search.ROWID_TYPE_CODES at the time of writing
+ROWID_SQL = (
+    "object_id * 8 + CASE object_type"
+    " WHEN 'startup' THEN 0 WHEN 'incubation_form' THEN 1 WHEN 'user' THEN 2 WHEN 'event' THEN 3 END"
+)
+
+
+def key_rows_by_rowid(apps, schema_editor):
+    # Only the SQLite FTS5 table is addressed by rowid
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE TEMP TABLE search_index_rows AS SELECT object_type, object_id, title, body FROM search_index"
+    )
+    schema_editor.execute("DELETE FROM search_index")
+    schema_editor.execute(
+        f"INSERT INTO search_index (rowid, object_type, object_id, title, body) "
+        f"SELECT {ROWID_SQL}, object_type, object_id, title, body FROM search_index_rows"
+    )
+    schema_editor.execute("DROP TABLE search_index_rows")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0019_notification_user_read_created'),
+    ]
+
+    operations = [
+        migrations.RunPython(key_rows_by_rowid, migrations.RunPython.noop),
+    ]
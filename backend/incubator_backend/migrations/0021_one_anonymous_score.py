@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-18 07:33
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, FloatField, Max
+
+CRITERIA = ('problem_understanding', 'solution_fit', 'technical_soundness')
+
+
+def drop_duplicate_anonymous_scores(apps, schema_editor):
+    """
+    Keep the latest anonymous score of each form and recompute the stored
+    averages of the forms that had several.
+    """
+    IncubationForm = apps.get_model('incubator_backend', 'IncubationForm')
+    IncubationFormScore = apps.get_model('incubator_backend', 'IncubationFormScore')
+    duplicated = (
+        IncubationFormScore.objects.filter(reviewer__isnull=True).values('incubation_form').order_by()
+        .annotate(count=Count('id'), latest=Max('id')).filter(count__gt=1)
+    )
+    form_ids = []
+    for row in duplicated:
+        IncubationFormScore.objects.filter(
+            incubation_form=row['incubation_form'], reviewer__isnull=True
+        ).exclude(id=row['latest']).delete()
+        form_ids.append(row['incubation_form'])
+
+    rows = IncubationFormScore.objects.filter(incubation_form__in=form_ids).values('incubation_form').order_by().annotate(
+        score_count=Count('id'),
+        **{f'{criterion}_avg': Avg(criterion, output_field=FloatField()) for criterion in CRITERIA}
+    )
+    for row in rows:
+        form_id = row.pop('incubation_form')
+        row['total_score'] = sum(row[f'{criterion}_avg'] for criterion in CRITERIA)
+        IncubationForm.objects.filter(pk=form_id).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0020_search_index_rowids'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_anonymous_scores, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='incubationformscore',
+            constraint=models.UniqueConstraint(condition=models.Q(('reviewer__isnull', True)), fields=('incubation_form',), name='one_anonymous_score'),
+        ),
+    ]
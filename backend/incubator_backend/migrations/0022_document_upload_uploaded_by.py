@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 07:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0021_one_anonymous_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentupload',
+            name='uploaded_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to='incubator_backend.user'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator_backend', '0022_document_upload_uploaded_by'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField()),
+                ('modified', models.FloatField()),
+            ],
+            options={
+                'db_table': 'cache_versions',
+            },
+        ),
+    ]
@@ -1,8 +1,13 @@
-from django.db import models
+import time
+import uuid
+
+from django.db import models, transaction, IntegrityError
 from django.core.exceptions import ValidationError
 from django.contrib.auth.hashers import make_password, check_password
+from .hashers import amake_password, acheck_password
 from django.utils import timezone
-from django.db.models import F, Q
+from django.db.models import F, Q, Sum, Avg, Count, Value, ExpressionWrapper
+from django.db.models.functions import Coalesce, NullIf
 
 # Enums
 ROLE_CHOICES = [
@@ -59,11 +64,36 @@ class User(models.Model):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)  # ✅ Optional, good for admin access
 
+    # Authenticated users come from UserJWTAuthentication, DRF permission
+    # classes and the role checks in utils.py test these
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
     def set_password(self, raw_password):
         self.password_hash = make_password(raw_password)
 
     def check_password(self, raw_password):
-        return check_password(raw_password, self.password_hash)
+        def rehash(raw_password):
+            # The hashing policy changed since this hash was made
+            self.set_password(raw_password)
+            if self.pk:
+                User.objects.filter(pk=self.pk).update(password_hash=self.password_hash)
+        return check_password(raw_password, self.password_hash, rehash)
+
+    async def acheck_password(self, raw_password):
+        """
+        check_password for async code, the hashes run off the event loop.
+        """
+        async def rehash(raw_password):
+            self.password_hash = await amake_password(raw_password)
+            if self.pk:
+                await User.objects.filter(pk=self.pk).aupdate(password_hash=self.password_hash)
+        return await acheck_password(raw_password, self.password_hash, rehash)
 
     def __str__(self):
         return self.full_name
@@ -111,31 +141,63 @@ class TeamMember(models.Model):
 
     class Meta:
         db_table = 'team_members'
-        unique_together = ('startup', 'user')
+        constraints = [
+            # A user belongs to at most one startup
+            models.UniqueConstraint(fields=['user'], name='one_startup_per_user'),
+            # A startup has at most one team leader
+            models.UniqueConstraint(
+                fields=['startup'],
+                condition=Q(role_in_team='Team Leader'),
+                name='one_leader_per_startup'
+            ),
+        ]
     
     def clean(self):
-        # Validate that user is a student
-        if hasattr(self.user, 'role') and self.user.role and self.user.role.name != 'student':
-            raise ValidationError(f"Team members must be students, but {self.user.full_name} has role {self.user.role.name}")
-        
-        # Validate that user is not already in another startup
-        if self.role_in_team == 'Team Leader':
-            existing_leader = TeamMember.objects.filter(
-                user=self.user, 
-                role_in_team='Team Leader'
-            ).exclude(pk=self.pk)
-            
-            if existing_leader.exists():
-                raise ValidationError(f"{self.user.full_name} is already a team leader for another startup")
-        
-        # Check if user is already in another startup (any role)
-        existing_member = TeamMember.objects.filter(user=self.user).exclude(pk=self.pk)
-        if existing_member.exists():
-            raise ValidationError(f"{self.user.full_name} is already a member of another startup")
+        # Validate that user is a student. Membership rules are enforced by
+        # the database constraints above.
+        from .reference import get_role_name
+        role_name = get_role_name(self.user.role_id)
+        if role_name and role_name != 'student':
+            raise ValidationError(
+                f"Team members must be students, but {self.user.full_name} has role {role_name}",
+                code='not_student'
+            )
+
+    def membership_conflict(self):
+        """
+        Describe which membership rule a failed save broke, or return None.
+        Only runs after the database rejected the row.
+        """
+        others = TeamMember.objects.exclude(pk=self.pk).select_related('startup', 'user')
+        existing = others.filter(user_id=self.user_id).first()
+        if existing:
+            if self.role_in_team == 'Team Leader' and existing.role_in_team == 'Team Leader':
+                return ValidationError(
+                    f"{self.user.full_name} is already a team leader for another startup",
+                    code='already_team_leader'
+                )
+            return ValidationError(
+                f"{self.user.full_name} is already a member of {existing.startup.name}",
+                code='already_team_member'
+            )
+        leader = others.filter(startup_id=self.startup_id, role_in_team='Team Leader').first()
+        if leader and self.role_in_team == 'Team Leader':
+            return ValidationError(
+                f"{leader.startup.name} already has a team leader: {leader.user.full_name}",
+                code='startup_has_leader'
+            )
+        return None
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError:
+            conflict = self.membership_conflict()
+            if conflict is None:
+                raise
+            raise conflict
 
     def __str__(self):
         return f"{self.user.full_name} in {self.startup.name}"
@@ -254,6 +316,63 @@ class ResourceRequest(models.Model):
         db_table = 'resource_requests'
 
 
+class ResourceUsage(models.Model):
+    """
+    Rollup of the quantity of a resource taken by approved requests, kept
+    current by the ResourceRequest signal handlers in signals.py.
+    """
+    resource = models.OneToOneField(Resource, on_delete=models.CASCADE, primary_key=True, related_name='usage')
+    used = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Usage of {self.resource.name}"
+
+    class Meta:
+        db_table = 'resource_usage'
+
+    @staticmethod
+    def compute(resources=None):
+        """
+        Annotate resources with the quantity used by approved requests in a
+        single grouped query.
+        """
+        if resources is None:
+            resources = Resource.objects.all()
+        return resources.annotate(
+            used_quantity=Coalesce(
+                Sum('resourcerequest__quantity_requested', filter=Q(resourcerequest__status='approved')),
+                0
+            )
+        )
+
+    @classmethod
+    def increment(cls, resource_id, delta):
+        if not delta:
+            return
+        updated = cls.objects.filter(resource_id=resource_id).update(
+            used=F('used') + delta, updated_at=timezone.now()
+        )
+        if not updated:
+            cls.rebuild(Resource.objects.filter(id=resource_id))
+
+    @classmethod
+    def rebuild(cls, resources=None, repair=True):
+        """
+        Recompute the rollup rows from the requests table and return the
+        drift as {resource_id: (stored, actual)}, stored being None for a
+        missing row. Rows are repaired unless repair is False.
+        """
+        stored = dict(cls.objects.values_list('resource_id', 'used'))
+        drift = {}
+        for resource_id, used in cls.compute(resources).values_list('id', 'used_quantity'):
+            if stored.get(resource_id) != used:
+                drift[resource_id] = (stored.get(resource_id), used)
+                if repair:
+                    cls.objects.update_or_create(resource_id=resource_id, defaults={'used': used})
+        return drift
+
+
 class ResourceAllocation(models.Model):
     allocated_quantity = models.IntegerField()
     allocated_at = models.DateTimeField(auto_now_add=True)
@@ -285,6 +404,13 @@ class Event(models.Model):
         db_table = 'events'
         indexes = [
             models.Index(fields=['start_time', 'location']),
+            # Per-user session counts and next session lookups
+            models.Index(fields=['user', 'start_time']),
+            # Per-location calendars
+            models.Index(fields=['location', 'start_time']),
+            # Booking conflicts, overlapping events end after the new start
+            models.Index(fields=['user', 'end_time']),
+            models.Index(fields=['location', 'end_time']),
         ]
         constraints = [
             models.CheckConstraint(
@@ -351,6 +477,79 @@ class Notification(models.Model):
 
     class Meta:
         db_table = 'notifications'
+        indexes = [
+            # A user's unread notifications, by age, for the bulk updates
+            models.Index(fields=['user', 'is_read', 'created_at'], name='notification_user_read_created'),
+        ]
+
+
+class NotificationCounter(models.Model):
+    """
+    Number of unread notifications of a user, kept current by the
+    Notification signal handlers in signals.py and by the bulk writes in
+    notifications.py.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'notification_counters'
+
+    @classmethod
+    def get_unread(cls, user_id):
+        return cls.objects.filter(user_id=user_id).values_list('unread', flat=True).first() or 0
+
+    @staticmethod
+    def compute(users=None):
+        """
+        Annotate users with their number of unread notifications in a single
+        grouped query.
+        """
+        if users is None:
+            users = User.objects.all()
+        return users.annotate(unread_count=Count('notification', filter=Q(notification__is_read=False)))
+
+    @classmethod
+    def increment(cls, user_id, delta):
+        if not delta:
+            return
+        updated = cls.objects.filter(user_id=user_id).update(unread=F('unread') + delta, updated_at=timezone.now())
+        if not updated:
+            cls.rebuild(User.objects.filter(id=user_id))
+
+    @classmethod
+    def increment_many(cls, user_ids, delta):
+        """
+        Move the counters of several users by the same delta with one
+        UPDATE, creating missing counters first. Call before the
+        notifications are inserted: a user without a counter has no unread
+        notifications.
+        """
+        if not delta or not user_ids:
+            return
+        cls.objects.bulk_create([cls(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+        cls.objects.filter(user_id__in=user_ids).update(unread=F('unread') + delta, updated_at=timezone.now())
+
+    @classmethod
+    def rebuild(cls, users=None, repair=True):
+        """
+        Recompute the counters from the notifications table and return the
+        drift as {user_id: (stored, actual)}, stored being None for a
+        missing counter. Counters are repaired unless repair is False.
+        """
+        stored_counters = cls.objects.all()
+        if users is not None:
+            stored_counters = stored_counters.filter(user__in=users)
+        stored = dict(stored_counters.values_list('user_id', 'unread'))
+        drift = {}
+        for user_id, unread in cls.compute(users).values_list('id', 'unread_count'):
+            # A missing counter stands for no unread notifications
+            if stored.get(user_id, 0) != unread:
+                drift[user_id] = (stored.get(user_id), unread)
+                if repair:
+                    cls.objects.update_or_create(user_id=user_id, defaults={'unread': unread})
+        return drift
 
 
 
@@ -425,6 +624,15 @@ class IncubationForm(models.Model):
     confirmation = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     
+    # Review scores, averaged over the reviewers' IncubationFormScore rows
+    # and kept current by the score signal handlers in signals.py. The
+    # averages stay at 0 while score_count is 0.
+    score_count = models.IntegerField(default=0)
+    problem_understanding_avg = models.FloatField(default=0)
+    solution_fit_avg = models.FloatField(default=0)
+    technical_soundness_avg = models.FloatField(default=0)
+    total_score = models.FloatField(default=0)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -437,15 +645,92 @@ class IncubationForm(models.Model):
         verbose_name = "Incubation Form"
         verbose_name_plural = "Incubation Forms"
         db_table = "incubator_backend_incubation_form"
+        indexes = [
+            # Review queues ordered or filtered by score
+            models.Index(fields=['status', '-total_score', '-id'], name='incubation_form_status_score'),
+            models.Index(fields=['-total_score', '-id'], name='incubation_form_total_score'),
+        ]
+
+    @classmethod
+    def apply_score_delta(cls, form_id, count, deltas):
+        """
+        Fold `count` added (or removed, if negative) scores whose criteria
+        sums change by deltas[criterion] into the stored averages, in one
+        UPDATE. The expressions read the row once the UPDATE has locked it,
+        so concurrent reviewers never overwrite each other's scores.
+        """
+        # NULL once the last score is gone, which Coalesce turns back into 0
+        new_count = NullIf(F('score_count') + count, 0)
+        averages = {
+            f'{criterion}_avg': Coalesce(
+                ExpressionWrapper(
+                    (F(f'{criterion}_avg') * F('score_count') + deltas.get(criterion, 0)) / new_count,
+                    output_field=models.FloatField()
+                ),
+                0.0
+            )
+            for criterion in IncubationFormScore.CRITERIA
+        }
+        cls.objects.filter(pk=form_id).update(
+            score_count=F('score_count') + count,
+            total_score=sum(averages.values(), Value(0.0)),
+            **averages,
+        )
+
+    @staticmethod
+    def compute_scores(forms=None):
+        """
+        Annotate forms with their score count and averages in a single
+        grouped query.
+        """
+        if forms is None:
+            forms = IncubationForm.objects.all()
+        averages = {
+            f'actual_{criterion}_avg': Avg(f'scores__{criterion}', output_field=models.FloatField())
+            for criterion in IncubationFormScore.CRITERIA
+        }
+        return forms.order_by().annotate(actual_score_count=Count('scores'), **averages)
+
+    @classmethod
+    def rebuild_scores(cls, forms=None, repair=True):
+        """
+        Recompute the stored score averages from the scores table and return
+        the drift as {form_id: (stored, actual)} on the total score. Rows
+        are repaired unless repair is False.
+        """
+        drift = {}
+        for form in cls.compute_scores(forms).only('id', 'score_count', 'total_score'):
+            actual = {
+                f'{criterion}_avg': getattr(form, f'actual_{criterion}_avg') or 0.0
+                for criterion in IncubationFormScore.CRITERIA
+            }
+            actual['total_score'] = sum(actual.values())
+            actual['score_count'] = form.actual_score_count
+            # Averages are floats, ignore rounding differences
+            if form.score_count != actual['score_count'] or abs(form.total_score - actual['total_score']) > 1e-6:
+                drift[form.id] = (form.total_score, actual['total_score'])
+                if repair:
+                    cls.objects.filter(pk=form.id).update(**actual)
+        return drift
 
 
 
 class IncubationFormScore(models.Model):
+    CRITERIA = ('problem_understanding', 'solution_fit', 'technical_soundness')
+
     incubation_form = models.ForeignKey(
         IncubationForm, 
         on_delete=models.CASCADE,
         related_name='scores'
     )
+    # NULL for the single anonymous score stored before per-reviewer scoring
+    reviewer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='incubation_form_scores'
+    )
     problem_understanding = models.IntegerField(default=0)
     solution_fit = models.IntegerField(default=0)
     technical_soundness = models.IntegerField(default=0)
@@ -454,6 +739,168 @@ class IncubationFormScore(models.Model):
     
     class Meta:
         db_table = 'incubator_backend_incubation_form_score'
+        constraints = [
+            models.UniqueConstraint(fields=['incubation_form', 'reviewer'], name='one_score_per_reviewer'),
+            # NULLs never collide in the constraint above
+            models.UniqueConstraint(
+                fields=['incubation_form'], condition=Q(reviewer__isnull=True), name='one_anonymous_score'
+            ),
+        ]
         
     def total_score(self):
         return self.problem_understanding + self.solution_fit + self.technical_soundness
+
+
+class DocumentUpload(models.Model):
+    """
+    Chunked, resumable upload of an incubation form's supporting document.
+
+    Chunks are appended to a partial file at `received`. Once the last byte
+    arrives the file is hashed and moved to content-addressed storage, where
+    identical files share one copy (see uploads.py), and `file` names it.
+
+    Only the uploader reads, writes or attaches an upload: the user who
+    started it, or for an anonymous upload whoever holds its signed token.
+    """
+    STATUS_CHOICES = (
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    # Checksum announced by the client, verified on completion, then the
+    # actual checksum of the file
+    sha256 = models.CharField(max_length=64, blank=True)
+    file = models.FileField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    # None for anonymous uploads, see uploads.issue_token
+    uploaded_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name='document_uploads'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+    class Meta:
+        db_table = 'document_uploads'
+        indexes = [
+            # Purging abandoned uploads
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+
+class AnalyticsSnapshot(models.Model):
+    """
+    Single-row table of dashboard counters. The counters are kept current
+    incrementally by the signal handlers in signals.py and can be recomputed
+    from the source tables with the reconcile_analytics command.
+    """
+    SINGLETON_ID = 1
+
+    active_startups = models.IntegerField(default=0)
+    pending_applications = models.IntegerField(default=0)
+    pending_forms = models.IntegerField(default=0)
+    mentors_count = models.IntegerField(default=0)
+    trainers_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'analytics_snapshot'
+
+    @classmethod
+    def get(cls):
+        snapshot, _ = cls.objects.get_or_create(pk=cls.SINGLETON_ID)
+        return snapshot
+
+    @classmethod
+    def compute(cls):
+        """
+        Recompute every counter from the source tables.
+        """
+        return {
+            'active_startups': Startup.objects.filter(status='approved').count(),
+            'pending_applications': Application.objects.filter(status='pending').count(),
+            'pending_forms': IncubationForm.objects.filter(status='pending').count(),
+            'mentors_count': User.objects.filter(role__name='mentor').count(),
+            'trainers_count': User.objects.filter(role__name='trainer').count(),
+        }
+
+    @classmethod
+    def increment(cls, counter, delta):
+        if delta:
+            cls.objects.filter(pk=cls.SINGLETON_ID).update(
+                **{counter: F(counter) + delta, 'updated_at': timezone.now()}
+            )
+
+    @classmethod
+    def reconcile(cls, repair=True):
+        """
+        Compare the stored counters with the source tables and return the
+        drift as {counter: (stored, actual)}. Counters are repaired unless
+        repair is False.
+        """
+        snapshot = cls.get()
+        actual = cls.compute()
+        drift = {
+            name: (getattr(snapshot, name), value)
+            for name, value in actual.items()
+            if getattr(snapshot, name) != value
+        }
+        if repair and drift:
+            for name, value in actual.items():
+                setattr(snapshot, name, value)
+            snapshot.save()
+        return drift
+
+
+class CacheVersion(models.Model):
+    """
+    Version counter of cached data, see caching.py. Counters live in the
+    database rather than the cache: every process bumps them with one
+    UPDATE of value + 1, which the database serializes, so concurrent bumps
+    are never lost.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField()
+    # time.time() of the last bump
+    modified = models.FloatField()
+
+    class Meta:
+        db_table = 'cache_versions'
+
+    @classmethod
+    def get_many(cls, names):
+        """
+        Return {name: (value, modified)}, creating missing counters.
+        """
+        found = {name: (value, modified) for name, value, modified in
+                 cls.objects.filter(name__in=names).values_list('name', 'value', 'modified')}
+        missing = [name for name in names if name not in found]
+        if missing:
+            cls._create(missing)
+            found.update(
+                (name, (value, modified)) for name, value, modified in
+                cls.objects.filter(name__in=missing).values_list('name', 'value', 'modified')
+            )
+        return found
+
+    @classmethod
+    def bump(cls, name):
+        now = time.time()
+        if not cls.objects.filter(name=name).update(value=F('value') + 1, modified=now):
+            cls._create([name])
+            cls.objects.filter(name=name).update(value=F('value') + 1, modified=now)
+
+    @classmethod
+    def _create(cls, names):
+        # Start from the clock so a lost counter never reuses an old version,
+        # whose cached entries may still be around
+        start = time.time_ns()
+        cls.objects.bulk_create(
+            [cls(name=name, value=start, modified=time.time()) for name in names], ignore_conflicts=True
+        )
@@ -0,0 +1,211 @@
+"""
+Server-Sent Events stream of a user's notifications, served by the ASGI
+application (see asgi.py) at STREAM_PATH. WSGI deployments do not serve it.
+
+Browsers cannot set headers on an EventSource, so the access token may be
+given as ?token= as well as in the Authorization header. The stream sends:
+
+    event: unread        data: {"unread": <count>}, on connect and on change
+    event: notification  data: the notification, id: its id
+
+The shared Notification version is read at most once per POLL_INTERVAL
+seconds per process for all connections, and a connection only queries
+the notifications when it moved, so idle streams cost one counter lookup
+per process and interval. A reconnecting client sends Last-Event-ID and
+receives what it missed. The stream ends when the access token expires,
+the client then reconnects with a fresh token.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from .authentication import UserJWTAuthentication
+from .caching import get_model_versions
+from .models import Notification, NotificationCounter
+
+STREAM_PATH = '/notifications/stream/'
+
+# Seconds between checks for new notifications
+POLL_INTERVAL = getattr(settings, 'NOTIFICATION_STREAM_POLL_INTERVAL', 2)
+# Seconds between comments that keep proxies from closing an idle stream
+HEARTBEAT_INTERVAL = 15
+# Most notifications sent per check, the rest follow on the next one
+BATCH_SIZE = 100
+
+NOTIFICATION_FIELDS = ('id', 'type', 'message', 'is_read', 'created_at', 'user_id')
+
+
+def _authenticate(raw_token):
+    """
+    Return (user, expiry timestamp) for a valid access token, or None.
+    """
+    authentication = UserJWTAuthentication()
+    try:
+        token = authentication.get_validated_token(raw_token)
+        user = authentication.get_user(token)
+    except (InvalidToken, AuthenticationFailed, TokenError):
+        return None
+    finally:
+        close_old_connections()
+    return user, token.get('exp')
+
+
+def _last_id(user_id):
+    try:
+        return Notification.objects.filter(user_id=user_id).order_by('-id').values_list('id', flat=True).first() or 0
+    finally:
+        close_old_connections()
+
+
+def _changes(user_id, after_id):
+    try:
+        rows = list(
+            Notification.objects.filter(user_id=user_id, id__gt=after_id)
+            .order_by('id').values(*NOTIFICATION_FIELDS)[:BATCH_SIZE]
+        )
+        return rows, NotificationCounter.get_unread(user_id)
+    finally:
+        close_old_connections()
+
+
+class _VersionReader:
+    """
+    Notification version shared by the connections of this process,
+    re-read at most once per POLL_INTERVAL.
+    """
+    def __init__(self):
+        self._version = None
+        self._read_at = 0.0
+        self._lock = None
+
+    async def get(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if time.monotonic() - self._read_at >= POLL_INTERVAL:
+                self._version = await sync_to_async(
+                    lambda: get_model_versions([Notification])[Notification][0]
+                )()
+                self._read_at = time.monotonic()
+            return self._version
+
+
+_versions = _VersionReader()
+
+
+def _message(event, data, event_id=None):
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append('data: ' + json.dumps(data, cls=DjangoJSONEncoder))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+def _cors_headers(headers):
+    origin = headers.get(b'origin')
+    if origin is None:
+        return []
+    if getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False):
+        return [(b'access-control-allow-origin', b'*')]
+    if origin.decode('latin-1') in getattr(settings, 'CORS_ALLOWED_ORIGINS', []):
+        return [(b'access-control-allow-origin', origin), (b'vary', b'Origin')]
+    return []
+
+
+async def _reject(send, status, message):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps(message).encode('utf-8')})
+
+
+async def notification_stream(scope, receive, send):
+    if scope['method'] != 'GET':
+        return await _reject(send, 405, {'error': 'Method not allowed', 'code': 'method_not_allowed'})
+    headers = dict(scope['headers'])
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    raw_token = query.get('token', [None])[0]
+    authorization = headers.get(b'authorization', b'').decode('latin-1').split()
+    if len(authorization) == 2 and authorization[0] == 'Bearer':
+        raw_token = authorization[1]
+
+    authenticated = await sync_to_async(_authenticate)(raw_token) if raw_token else None
+    if authenticated is None:
+        return await _reject(send, 401, {'error': 'A valid access token is required', 'code': 'not_authenticated'})
+    user, expires_at = authenticated
+
+    last_event_id = headers.get(b'last-event-id', b'').decode('latin-1') or query.get('last_event_id', [''])[0]
+    last_id = int(last_event_id) if last_event_id.isdigit() else await sync_to_async(_last_id)(user.pk)
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            # Keep nginx from buffering the stream
+            (b'x-accel-buffering', b'no'),
+        ] + _cors_headers(headers),
+    })
+
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        disconnected.set()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        await send({'type': 'http.response.body', 'body': f'retry: {POLL_INTERVAL * 1000}\n\n'.encode(), 'more_body': True})
+        version, unread, last_sent = None, None, time.monotonic()
+        while not disconnected.is_set() and (expires_at is None or time.time() < expires_at):
+            current_version = await _versions.get()
+            if current_version != version:
+                version = current_version
+                rows, current_unread = await sync_to_async(_changes)(user.pk, last_id)
+                body = b''
+                if current_unread != unread:
+                    unread = current_unread
+                    body += _message('unread', {'unread': unread})
+                for row in rows:
+                    row['user'] = row.pop('user_id')
+                    body += _message('notification', row, row['id'])
+                    last_id = row['id']
+                if len(rows) == BATCH_SIZE:
+                    # More to send, look again on the next check
+                    version = None
+                if body:
+                    await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+                    last_sent = time.monotonic()
+            if time.monotonic() - last_sent >= HEARTBEAT_INTERVAL:
+                await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+                last_sent = time.monotonic()
+            try:
+                await asyncio.wait_for(disconnected.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+        if not disconnected.is_set():
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        watcher.cancel()
+
+
+def with_notification_stream(application):
+    """
+    Wrap an ASGI application so STREAM_PATH is answered by the stream.
+    """
+    async def router(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+            return await notification_stream(scope, receive, send)
+        return await application(scope, receive, send)
+    return router
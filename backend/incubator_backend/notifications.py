@@ -0,0 +1,149 @@
+"""
+Notification fan-out and bulk changes.
+
+resolve_audience() turns an audience description into one query over
+users, fan_out() inserts one notification per user of that query with
+chunked bulk inserts in a single transaction. mark_read() and delete()
+change many notifications of one user with a single UPDATE or DELETE.
+
+An audience is a dict of criteria, all of which a user must match:
+
+    role            role name(s): users with that role
+    stage           stage id(s): members of startups in that stage
+    startup_status  status(es): members of startups with that status
+    event           event id(s): users booked on those events. Events only
+                    record their trainer, so that is who this reaches.
+
+Each criterion takes a single value or a list. Inactive users are never
+notified.
+"""
+from django.db import transaction
+
+from .caching import bump_model_version
+from .models import Event, Notification, NotificationCounter, Startup, User
+from .reference import get_role, get_stage
+
+# Rows per INSERT
+BATCH_SIZE = 1000
+
+AUDIENCE_CRITERIA = ('role', 'stage', 'startup_status', 'event')
+
+
+class AudienceError(ValueError):
+    pass
+
+
+def _values(audience, criterion):
+    value = audience[criterion]
+    values = value if isinstance(value, list) else [value]
+    if not values:
+        raise AudienceError(f"'{criterion}' must not be empty")
+    # Values are looked up and hashed, only plain strings and numbers fit
+    if any(isinstance(value, bool) or not isinstance(value, (str, int)) for value in values):
+        raise AudienceError(f"'{criterion}' must be a string, a number or a list of them")
+    return values
+
+
+def _ids(audience, criterion):
+    try:
+        return [int(value) for value in _values(audience, criterion)]
+    except (TypeError, ValueError):
+        raise AudienceError(f"'{criterion}' must be an id or a list of ids")
+
+
+def resolve_audience(audience):
+    """
+    Return a queryset of the ids of the users matching every criterion of
+    audience. Raises AudienceError for an invalid description.
+    """
+    if not isinstance(audience, dict) or not audience:
+        raise AudienceError("The audience must be an object with at least one criterion")
+    unknown = [criterion for criterion in audience if criterion not in AUDIENCE_CRITERIA]
+    if unknown:
+        raise AudienceError(f"Unknown audience criteria: {', '.join(unknown)}")
+
+    users = User.objects.filter(is_active=True)
+    if 'role' in audience:
+        roles = [get_role(name) for name in _values(audience, 'role')]
+        if None in roles:
+            raise AudienceError("Unknown role")
+        users = users.filter(role_id__in=[role.id for role in roles])
+
+    # Startup criteria apply to the same membership
+    startup_filters = {}
+    if 'stage' in audience:
+        stage_ids = _ids(audience, 'stage')
+        if any(get_stage(stage_id) is None for stage_id in stage_ids):
+            raise AudienceError("Unknown stage")
+        startup_filters['stage_id__in'] = stage_ids
+    if 'startup_status' in audience:
+        statuses = _values(audience, 'startup_status')
+        valid_statuses = {value for value, _ in Startup._meta.get_field('status').choices}
+        if not set(statuses) <= valid_statuses:
+            raise AudienceError(f"startup_status must be one of {', '.join(sorted(valid_statuses))}")
+        startup_filters['status__in'] = statuses
+    if startup_filters:
+        users = users.filter(teammember__startup__in=Startup.objects.filter(**startup_filters))
+
+    if 'event' in audience:
+        users = users.filter(id__in=Event.objects.filter(id__in=_ids(audience, 'event')).values('user_id'))
+
+    return users.values_list('id', flat=True).distinct()
+
+
+def fan_out(user_ids, type, message):
+    """
+    Create a notification for each distinct user id and return how many
+    were created. bulk_create sends no signals, so the unread counters and
+    the Notification version are updated here.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    with transaction.atomic():
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            batch = user_ids[start:start + BATCH_SIZE]
+            NotificationCounter.increment_many(batch, 1)
+            Notification.objects.bulk_create([
+                Notification(user_id=user_id, type=type, message=message) for user_id in batch
+            ])
+        transaction.on_commit(lambda: bump_model_version(Notification))
+    return len(user_ids)
+
+
+def mark_read(user, ids=None, before=None):
+    """
+    Mark the user's unread notifications as read, all of them or only
+    those with the given ids and/or created before `before`. Returns how
+    many were marked.
+    """
+    notifications = Notification.objects.filter(user=user, is_read=False)
+    if ids is not None:
+        notifications = notifications.filter(id__in=ids)
+    if before is not None:
+        notifications = notifications.filter(created_at__lt=before)
+    with transaction.atomic():
+        # update() sends no signals, the counter and version follow here
+        updated = notifications.update(is_read=True)
+        if updated:
+            NotificationCounter.increment(user.id, -updated)
+            transaction.on_commit(lambda: bump_model_version(Notification))
+    return updated
+
+
+def delete(user, ids):
+    """
+    Delete the user's notifications with the given ids and return how many
+    were deleted.
+    """
+    notifications = Notification.objects.filter(user=user, id__in=ids)
+    with transaction.atomic():
+        # Marking the unread ones read first counts them and locks them, so
+        # the counter moves by exactly what the DELETE removes
+        unread = notifications.filter(is_read=False).update(is_read=True)
+        # One DELETE statement: QuerySet.delete() would load every row to send
+        # its signals. Notifications have no dependent rows, the counter and
+        # version follow here as in mark_read().
+        deleted = notifications._raw_delete(notifications.db)
+        NotificationCounter.increment(user.id, -unread)
+        if deleted:
+            transaction.on_commit(lambda: bump_model_version(Notification))
+    return deleted
@@ -0,0 +1,95 @@
+"""
+Process-local registry of reference data: roles and stages.
+
+Both tables are tiny and almost never written, so every process loads them
+once and answers lookups from memory. The save/delete handlers in signals.py
+clear the registry of the process that made the change and bump the shared
+'reference_data' version. Other processes compare their copy against that
+version at most every CHECK_INTERVAL seconds and reload when it moved.
+
+The registry hands out shared model instances, treat them as read-only.
+"""
+import threading
+import time
+
+from .caching import get_version, bump_version
+from .models import Role, Stage
+
+VERSION_NAME = 'reference_data'
+
+# Seconds between checks of the shared version
+CHECK_INTERVAL = 5.0
+
+
+class ReferenceData:
+    __slots__ = ('roles_by_id', 'roles_by_name', 'stages')
+
+    def __init__(self, roles, stages):
+        self.roles_by_id = {role.id: role for role in roles}
+        self.roles_by_name = {role.name: role for role in roles}
+        self.stages = {stage.id: stage for stage in stages}
+
+
+class ReferenceRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def data(self):
+        data = self._data
+        if data is not None and time.monotonic() - self._checked_at < CHECK_INTERVAL:
+            return data
+        with self._lock:
+            # Read the version before loading, a write during the load then
+            # shows up as a newer version on the next check
+            version = get_version(VERSION_NAME)
+            if self._data is None or version != self._version:
+                self._data = ReferenceData(list(Role.objects.order_by('id')), list(Stage.objects.order_by('id')))
+                self._version = version
+            self._checked_at = time.monotonic()
+            return self._data
+
+    def warm(self):
+        self.data()
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+        bump_version(VERSION_NAME)
+
+
+registry = ReferenceRegistry()
+
+
+def get_role(name):
+    """
+    Return the Role named name, or None.
+    """
+    return registry.data().roles_by_name.get(name)
+
+
+def get_roles():
+    """
+    Return all roles ordered by id.
+    """
+    return list(registry.data().roles_by_id.values())
+
+
+def get_role_name(role_id):
+    if role_id is None:
+        return None
+    role = registry.data().roles_by_id.get(role_id)
+    return role.name if role else None
+
+
+def get_stages():
+    """
+    Return all stages ordered by id.
+    """
+    return list(registry.data().stages.values())
+
+
+def get_stage(stage_id):
+    return registry.data().stages.get(stage_id)
@@ -0,0 +1,135 @@
+"""
+Booking conflicts between events.
+
+An event books its trainer (Event.user) and its location from start_time
+to end_time, end excluded. Two events conflict when they share the trainer
+or the location and their intervals overlap.
+
+conflicting_events() checks one event against the table with an indexed
+overlap query, lock_resources() serializes concurrent bookings of the same
+trainer or location so the check cannot race with another write.
+check_slots() checks many proposed slots at once: one query loads the
+bookings that can overlap them, then a sweep over the sorted interval
+endpoints pairs overlapping intervals, O((n + m) log(n + m)) plus the
+number of conflicts found.
+"""
+import zlib
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Event, User
+
+USER = 'user'
+LOCATION = 'location'
+
+
+def overlapping(start, end):
+    # Ending after the start is the selective bound for bookings around
+    # now, served by the (user, end_time) and (location, end_time) indexes
+    return Q(end_time__gt=start, start_time__lt=end)
+
+
+def conflicting_events(start, end, user_id=None, location=None, exclude_id=None):
+    """
+    Events overlapping [start, end) with the same trainer or location,
+    each annotated with the reasons it conflicts.
+    """
+    resources = Q()
+    if user_id is not None:
+        resources |= Q(user_id=user_id)
+    if location:
+        resources |= Q(location=location)
+    if not resources:
+        return []
+    events = Event.objects.filter(resources, overlapping(start, end)).order_by('start_time', 'id')
+    if exclude_id is not None:
+        events = events.exclude(id=exclude_id)
+    conflicts = []
+    for event in events:
+        event.conflict_reasons = [
+            reason for reason, matches in (
+                (USER, user_id is not None and event.user_id == user_id),
+                (LOCATION, bool(location) and event.location == location),
+            ) if matches
+        ]
+        conflicts.append(event)
+    return conflicts
+
+
+def lock_resources(user_id=None, location=None):
+    """
+    Hold the trainer's and the location's booking locks until the end of
+    the current transaction. Trainers lock their user row, locations take
+    a transaction-level advisory lock on PostgreSQL. Other backends
+    serialize writes anyway.
+    """
+    if user_id is not None:
+        list(User.objects.select_for_update().filter(id=user_id).values_list('id'))
+    if location and connection.vendor == 'postgresql':
+        key = zlib.crc32(f'event-location:{location}'.encode('utf-8'))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+
+
+def check_slots(slots):
+    """
+    Check proposed slots, dicts with start_time, end_time and optionally
+    user and location, against the existing events and against each other.
+    Returns, for each slot in order, the conflicting events as
+    [(event, reasons)] and the indices of the other slots it overlaps.
+    """
+    if not slots:
+        return []
+    results = [{'events': defaultdict(list), 'slots': set()} for _ in slots]
+
+    user_ids = {slot['user'] for slot in slots if slot.get('user') is not None}
+    locations = {slot['location'] for slot in slots if slot.get('location')}
+    resources = Q(user_id__in=user_ids) | Q(location__in=locations)
+    window_start = min(slot['start_time'] for slot in slots)
+    window_end = max(slot['end_time'] for slot in slots)
+    bookings = list(
+        Event.objects.filter(resources, overlapping(window_start, window_end))
+        .only('id', 'title', 'start_time', 'end_time', 'location', 'user_id')
+    )
+
+    # Interval endpoints per resource. At equal times ends sort before
+    # starts, so back-to-back intervals do not overlap.
+    endpoints = defaultdict(list)
+    for index, slot in enumerate(slots):
+        for resource in ((USER, slot.get('user')), (LOCATION, slot.get('location'))):
+            if resource[1] not in (None, ''):
+                endpoints[resource].append((slot['start_time'], 1, 'slot', index))
+                endpoints[resource].append((slot['end_time'], 0, 'slot', index))
+    for position, event in enumerate(bookings):
+        for resource in ((USER, event.user_id), (LOCATION, event.location)):
+            if resource in endpoints:
+                endpoints[resource].append((event.start_time, 1, 'event', position))
+                endpoints[resource].append((event.end_time, 0, 'event', position))
+
+    for (reason, _), points in endpoints.items():
+        points.sort(key=lambda point: (point[0], point[1]))
+        active_slots, active_events = set(), set()
+        for _, is_start, kind, index in points:
+            if not is_start:
+                (active_slots if kind == 'slot' else active_events).discard(index)
+            elif kind == 'slot':
+                for position in active_events:
+                    results[index]['events'][position].append(reason)
+                for other in active_slots:
+                    results[index]['slots'].add(other)
+                    results[other]['slots'].add(index)
+                active_slots.add(index)
+            else:
+                for other in active_slots:
+                    results[other]['events'][index].append(reason)
+                active_events.add(index)
+
+    return [
+        (
+            [(bookings[position], reasons) for position, reasons in sorted(result['events'].items())],
+            sorted(result['slots']),
+        )
+        for result in results
+    ]
@@ -0,0 +1,160 @@
+"""
+Full-text search over startups, incubation forms, users and events.
+
+Every searchable object has one row in the search_index table, created by
+migration 0012: a tsvector column with a GIN index on PostgreSQL, an FTS5
+virtual table on SQLite. Rows are kept current by the save/delete signal
+handlers in signals.py and can be rebuilt with the rebuild_search_index
+management command.
+
+FTS5 tables have no index on their UNINDEXED columns, so on SQLite rows
+are addressed by their rowid, derived from the object type and id (see
+_rowid), instead of filtering on object_type and object_id.
+"""
+import re
+
+from django.db import connection, transaction
+
+from .models import Startup, IncubationForm, User, Event
+
+# object type -> (model, title field, body fields)
+SEARCHABLE = {
+    'startup': (Startup, 'name', ['description']),
+    'incubation_form': (IncubationForm, 'project_title', ['project_summary', 'problem_statement']),
+    'user': (User, 'full_name', ['email']),
+    'event': (Event, 'title', ['description']),
+}
+
+TYPE_BY_MODEL = {model: object_type for object_type, (model, _, _) in SEARCHABLE.items()}
+
+# SQLite rowid = object id * ROWID_STRIDE + type code. Codes are stored in
+# the rows, never renumber them (migration 0020 uses the same values).
+ROWID_STRIDE = 8
+ROWID_TYPE_CODES = {'startup': 0, 'incubation_form': 1, 'user': 2, 'event': 3}
+
+
+def _rowid(object_type, object_id):
+    return object_id * ROWID_STRIDE + ROWID_TYPE_CODES[object_type]
+
+
+def is_supported():
+    return connection.vendor in ('postgresql', 'sqlite')
+
+
+def document_for(object_type, instance):
+    _, title_field, body_fields = SEARCHABLE[object_type]
+    title = getattr(instance, title_field) or ''
+    body = '\n'.join(getattr(instance, field) or '' for field in body_fields)
+    return title, body
+
+
+def index_object(instance):
+    """
+    Insert or refresh the search row of a saved instance.
+    """
+    if not is_supported():
+        return
+    object_type = TYPE_BY_MODEL[type(instance)]
+    title, body = document_for(object_type, instance)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                """
+                INSERT INTO search_index (object_type, object_id, title, body, document)
+                VALUES (%s, %s, %s, %s,
+                        setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B'))
+                ON CONFLICT (object_type, object_id) DO UPDATE
+                SET title = EXCLUDED.title, body = EXCLUDED.body, document = EXCLUDED.document
+                """,
+                [object_type, instance.pk, title, body, title, body]
+            )
+        else:
+            rowid = _rowid(object_type, instance.pk)
+            cursor.execute("DELETE FROM search_index WHERE rowid = %s", [rowid])
+            cursor.execute(
+                "INSERT INTO search_index (rowid, object_type, object_id, title, body) VALUES (%s, %s, %s, %s, %s)",
+                [rowid, object_type, instance.pk, title, body]
+            )
+
+
+def remove_object(model, pk):
+    if not is_supported():
+        return
+    object_type = TYPE_BY_MODEL[model]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "DELETE FROM search_index WHERE object_type = %s AND object_id = %s",
+                [object_type, pk]
+            )
+        else:
+            cursor.execute("DELETE FROM search_index WHERE rowid = %s", [_rowid(object_type, pk)])
+
+
+def rebuild_index(chunk_size=500):
+    """
+    Drop every search row and index all searchable objects again, in one
+    transaction so concurrent searches keep seeing the old rows until the
+    new ones are committed. Returns the number of rows indexed per object
+    type.
+    """
+    counts = {}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM search_index")
+        for object_type, (model, title_field, body_fields) in SEARCHABLE.items():
+            counts[object_type] = 0
+            for instance in model.objects.only('pk', title_field, *body_fields).iterator(chunk_size=chunk_size):
+                index_object(instance)
+                counts[object_type] += 1
+    return counts
+
+
+def _fts5_query(text):
+    # Quote every term so user input can't use FTS5 syntax, the last term
+    # also matches as a prefix
+    terms = re.findall(r'\w[\w@.\-]*', text)
+    if not terms:
+        return None
+    quoted = ['"%s"' % term.replace('"', '""') for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search(text, types=None, limit=20, offset=0):
+    """
+    Return up to limit hits as dicts with type, id, title and rank, best
+    matches first. Titles weigh more than body text.
+    """
+    types = list(types or SEARCHABLE)
+    type_placeholders = ', '.join(['%s'] * len(types))
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f"""
+                SELECT object_type, object_id, title, ts_rank(document, query) AS rank
+                FROM search_index, websearch_to_tsquery('simple', %s) AS query
+                WHERE document @@ query AND object_type IN ({type_placeholders})
+                ORDER BY rank DESC, object_type, object_id
+                LIMIT %s OFFSET %s
+                """,
+                [text, *types, limit, offset]
+            )
+        else:
+            match = _fts5_query(text)
+            if match is None:
+                return []
+            cursor.execute(
+                f"""
+                SELECT object_type, object_id, title, -bm25(search_index, 0, 0, 10.0, 1.0) AS rank
+                FROM search_index
+                WHERE search_index MATCH %s AND object_type IN ({type_placeholders})
+                ORDER BY rank DESC, object_type, object_id
+                LIMIT %s OFFSET %s
+                """,
+                [match, *types, limit, offset]
+            )
+        return [
+            {'type': object_type, 'id': object_id, 'title': title, 'rank': round(rank, 6)}
+            for object_type, object_id, title, rank in cursor.fetchall()
+        ]
@@ -1,20 +1,36 @@
+import os
+
 from rest_framework import serializers
+from django.core.files import File
+from django.db.models import Prefetch, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from .models import (
     User, Role, Startup, TeamMember, Application, ApplicationVote,
     ApplicationScore, Stage, Deliverable, DeliverableEvaluation, Resource,
     ResourceRequest, ResourceAllocation, Event, JuryEvaluation,
-    FileMetadata, Notification , IncubationForm
+    FileMetadata, Notification , IncubationForm, IncubationFormScore, DocumentUpload
 )
+from .reference import get_role, get_role_name
+from . import uploads
 # Create this in a file like auth_views.py or in your views.py
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 from incubator_backend.models import User
+from .authentication import add_user_claims, user_cache
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = 'email'
+
+    @classmethod
+    def get_token(cls, user):
+        # Role and is_active claims let UserJWTAuthentication skip the user lookup
+        return add_user_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         email = attrs.get('email')
         password = attrs.get('password')
@@ -22,6 +38,8 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         try:
             user = User.objects.get(email=email)
         except User.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            User().set_password(password)
             raise AuthenticationFailed('No active account found with the given credentials')
 
         if not user.check_password(password):
@@ -39,10 +57,21 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
                 'id': user.id,
                 'email': user.email,
                 'full_name': user.full_name,
-                'role': user.role.name if user.role else None,
+                'role': get_role_name(user.role_id),
             }
         }
 
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = user_cache.get(refresh.payload.get(api_settings.USER_ID_CLAIM))
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        # Issue the access token with the user's current role and status
+        access = add_user_claims(refresh.access_token, user)
+        return {'access': str(access)}
+
 class RoleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Role
@@ -52,7 +81,7 @@ class RoleSerializer(serializers.ModelSerializer):
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
-    role_name = serializers.StringRelatedField(source='role', read_only=True)
+    role_name = serializers.SerializerMethodField()
     role = serializers.PrimaryKeyRelatedField(queryset=Role.objects.all(), required=True)
 
     class Meta:
@@ -62,6 +91,9 @@ class UserSerializer(serializers.ModelSerializer):
             'role': {'required': True},  # Make role field required
         }
 
+    def get_role_name(self, obj):
+        return get_role_name(obj.role_id)
+
     # Commenting out email validation for now
     '''
     def validate_email(self, value):
@@ -76,13 +108,13 @@ class UserSerializer(serializers.ModelSerializer):
         role = validated_data.pop('role')
         
         # Create the user instance
-        user = User.objects.create(
+        user = User(
             full_name=validated_data['full_name'],
             email=validated_data['email'],
             role=role  # Set the role directly
         )
         
-        # Set the password
+        # Set the password before the insert so the user is written once
         user.set_password(validated_data['password'])
         user.save()
         
@@ -93,7 +125,7 @@ class SignupUserSerializer(serializers.ModelSerializer):
     Automatically assigns the student role.
     """
     password = serializers.CharField(write_only=True, required=True)
-    role_name = serializers.StringRelatedField(source='role', read_only=True)
+    role_name = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -102,6 +134,9 @@ class SignupUserSerializer(serializers.ModelSerializer):
             'role': {'read_only': True}  
         }
 
+    def get_role_name(self, obj):
+        return get_role_name(obj.role_id)
+
     def validate_email(self, value):
         # Check that the email ends with "@ensia.edu.dz"
         if not value.lower().endswith("@ensia.edu.dz"):
@@ -109,10 +144,8 @@ class SignupUserSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        from .models import Role
-        try:
-            student_role = Role.objects.get(name="student")
-        except Role.DoesNotExist:
+        student_role = get_role("student")
+        if student_role is None:
             raise serializers.ValidationError({"role": "Student role not found. Please create it first."})
 
         user = User(
@@ -152,33 +185,50 @@ class StartupSerializer(serializers.ModelSerializer):
     class Meta:
         model = Startup
         fields = ['id', 'name', 'description', 'status', 'user', 'stage', 'created_at', 'updated_at', 'team_members', 'team_leader']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Prefetch each startup's team with its users and roles so that
+        serializing the whole queryset takes a constant number of queries.
+        """
+        return queryset.prefetch_related(
+            Prefetch(
+                'teammember_set',
+                queryset=TeamMember.objects.select_related('user__role').order_by('id'),
+                to_attr='prefetched_team',
+            )
+        )
+
+    def _get_team(self, obj):
+        # Use the prefetched team when available, otherwise load it in one query
+        team = getattr(obj, 'prefetched_team', None)
+        if team is None:
+            team = list(
+                TeamMember.objects.filter(startup=obj).select_related('user__role').order_by('id')
+            )
+            obj.prefetched_team = team
+        return team
     
     def get_team_members(self, obj):
         # Get all team members who are not team leaders
-        members = TeamMember.objects.filter(startup=obj).exclude(role_in_team='Team Leader')
+        members = [member for member in self._get_team(obj) if member.role_in_team != 'Team Leader']
         return TeamMemberSerializer(members, many=True).data
     
     def get_team_leader(self, obj):
-        # Get the team leader if exists
-        try:
-            leader = TeamMember.objects.get(startup=obj, role_in_team='Team Leader')
-            leader_data = TeamMemberSerializer(leader).data
-            # Add the user's full_name directly to the team_leader for easier access
-            if leader_data and 'user_details' in leader_data:
-                leader_data['full_name'] = leader_data['user_details']['full_name']
-                leader_data['email'] = leader_data['user_details']['email']
-            return leader_data
-        except TeamMember.DoesNotExist:
+        # Get the team leader if exists (the first one in case there are several)
+        leader = next(
+            (member for member in self._get_team(obj) if member.role_in_team == 'Team Leader'),
+            None
+        )
+        if leader is None:
             return None
-        except TeamMember.MultipleObjectsReturned:
-            # In case there are multiple team leaders (shouldn't happen with constraints)
-            leaders = TeamMember.objects.filter(startup=obj, role_in_team='Team Leader')
-            leader_data = TeamMemberSerializer(leaders.first()).data
-            # Add the user's full_name directly to the team_leader
-            if leader_data and 'user_details' in leader_data:
-                leader_data['full_name'] = leader_data['user_details']['full_name']
-                leader_data['email'] = leader_data['user_details']['email']
-            return leader_data
+        leader_data = TeamMemberSerializer(leader).data
+        # Add the user's full_name directly to the team_leader for easier access
+        if leader_data and 'user_details' in leader_data:
+            leader_data['full_name'] = leader_data['user_details']['full_name']
+            leader_data['email'] = leader_data['user_details']['email']
+        return leader_data
 
 class TeamMemberSerializer(serializers.ModelSerializer):
     # Add serialized user details
@@ -187,13 +237,16 @@ class TeamMemberSerializer(serializers.ModelSerializer):
     class Meta:
         model = TeamMember
         fields = ['id', 'role_in_team', 'startup', 'user', 'user_details']
+        # Membership uniqueness is enforced by database constraints and reported
+        # by TeamMember.save(), so skip DRF's extra lookup query
+        validators = []
     
     def get_user_details(self, obj):
         return {
             'id': obj.user.id,
             'full_name': obj.user.full_name,
             'email': obj.user.email,
-            'role': obj.user.role.name if obj.user.role else None
+            'role': get_role_name(obj.user.role_id)
         }
 
 class ApplicationSerializer(serializers.ModelSerializer):
@@ -225,6 +278,20 @@ class ApplicationScoreSerializer(serializers.ModelSerializer):
             )
         ]
 
+class ApplicationReviewRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk review submission, a score, a vote or both.
+    """
+    application = serializers.IntegerField()
+    user = serializers.IntegerField()
+    score = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    vote = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if 'score' not in attrs and 'vote' not in attrs:
+            raise serializers.ValidationError("A score or a vote is required.")
+        return attrs
+
 class StageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Stage
@@ -267,9 +334,28 @@ class EventSerializer(serializers.ModelSerializer):
         model = Event
         fields = '__all__'
 
+    def validate(self, data):
+        # A partial update may change only one of the two
+        start_time = data.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = data.get('end_time', getattr(self.instance, 'end_time', None))
+        if end_time <= start_time:
+            raise serializers.ValidationError("Event end time must be after start time.")
+        return data
+
+class EventSlotSerializer(serializers.Serializer):
+    """
+    A proposed booking of a trainer, a location or both.
+    """
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+    user = serializers.IntegerField(required=False, allow_null=True)
+    location = serializers.CharField(max_length=255, required=False, allow_blank=True)
+
     def validate(self, data):
         if data['end_time'] <= data['start_time']:
             raise serializers.ValidationError("Event end time must be after start time.")
+        if data.get('user') is None and not data.get('location'):
+            raise serializers.ValidationError("A user or a location is required.")
         return data
 
 class JuryEvaluationSerializer(serializers.ModelSerializer):
@@ -296,9 +382,36 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = '__all__'
 
+class NotificationFanOutSerializer(serializers.Serializer):
+    """
+    A notification sent to every user of an audience, see notifications.py.
+    """
+    type = serializers.CharField(max_length=50)
+    message = serializers.CharField()
+    audience = serializers.DictField()
+
+
+class NotificationBulkSerializer(serializers.Serializer):
+    """
+    The current user's notifications a bulk operation applies to, by id
+    and/or creation time.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=1000
+    )
+    before = serializers.DateTimeField(required=False)
+
+
 
 
 
+class UploadRelatedField(serializers.PrimaryKeyRelatedField):
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return DocumentUpload.objects.none()
+        return uploads.accessible(request).filter(status='complete')
+
 
 class IncubationFormSerializer(serializers.ModelSerializer):
     """
@@ -313,7 +426,7 @@ class IncubationFormSerializer(serializers.ModelSerializer):
             'project_domain', 'is_ai_project', 'project_summary', 'dev_stage', 
             'demo_link', 'project_video', 'key_milestones', 'current_challenges', 
             'problem_statement', 'target_audience', 'expected_impact', 
-            'additional_motivation', 'supporting_documents', 'confirmation', 
+            'additional_motivation', 'supporting_documents', 'supporting_documents_upload', 'confirmation', 
             'status', 'created_at', 'updated_at'
         ]
         read_only_fields = ['timestamp', 'created_at', 'updated_at', 'status']
@@ -327,7 +440,19 @@ class IncubationFormSerializer(serializers.ModelSerializer):
             'team_leader_year': {'required': False, 'allow_null': True},
         }
 
+    # Completed chunked upload of the requester to use as the supporting
+    # documents, instead of sending the file in the form request
+    supporting_documents_upload = UploadRelatedField(write_only=True, required=False, allow_null=True)
+
     def validate(self, data):
+        upload = data.pop('supporting_documents_upload', None)
+        if upload is not None:
+            if data.get('supporting_documents'):
+                raise serializers.ValidationError(
+                    {"supporting_documents_upload": "Send either a file or an upload, not both."}
+                )
+            data['supporting_documents'] = upload.file.name
+
         # Keep project_id uniqueness check
         project_id = data.get('project_id')
         instance = self.instance
@@ -340,13 +465,63 @@ class IncubationFormSerializer(serializers.ModelSerializer):
 
         return data
 
+class DocumentUploadSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source='received', read_only=True)
+
+    class Meta:
+        model = DocumentUpload
+        fields = ['id', 'filename', 'size', 'offset', 'sha256', 'file', 'status', 'created_at', 'updated_at']
+        read_only_fields = ['file', 'status']
+
+    def validate_filename(self, value):
+        # Same extensions as a file sent with the form
+        value = os.path.basename(value.replace('\\', '/'))
+        for validator in IncubationForm._meta.get_field('supporting_documents').validators:
+            validator(File(None, name=value))
+        return value
+
+    def validate_size(self, value):
+        if not 0 < value <= uploads.max_size():
+            raise serializers.ValidationError(f"Size must be between 1 and {uploads.max_size()} bytes.")
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and (len(value) != 64 or any(char not in '0123456789abcdef' for char in value)):
+            raise serializers.ValidationError("Expected a hex encoded SHA-256.")
+        return value
+
 class IncubationFormListSerializer(serializers.ModelSerializer):
     """
     Simplified serializer for listing incubation forms.
     """
     class Meta:
         model = IncubationForm
-        fields = ['id', 'project_id', 'project_title', 'team_leader_name', 'team_leader_email', 'created_at', 'status']
+        fields = [
+            'id', 'project_id', 'project_title', 'team_leader_name', 'team_leader_email', 'created_at', 'status',
+            'score_count', 'total_score'
+        ]
+
+class IncubationFormScoreInputSerializer(serializers.Serializer):
+    """
+    One reviewer's scores for an incubation form. Without a reviewer the
+    form's anonymous score is updated.
+    """
+    reviewer = serializers.IntegerField(required=False, allow_null=True)
+    problem_understanding = serializers.IntegerField(min_value=0, default=0)
+    solution_fit = serializers.IntegerField(min_value=0, default=0)
+    technical_soundness = serializers.IntegerField(min_value=0, default=0)
+
+class IncubationFormScoreSerializer(serializers.ModelSerializer):
+    reviewer_name = serializers.CharField(source='reviewer.full_name', read_only=True, default=None)
+    total_score = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = IncubationFormScore
+        fields = [
+            'id', 'reviewer', 'reviewer_name', 'problem_understanding', 'solution_fit', 'technical_soundness',
+            'total_score', 'updated_at'
+        ]
 
 class IncubationFormDetailSerializer(serializers.ModelSerializer):
     """
@@ -364,38 +539,74 @@ class IncubationFormDetailSerializer(serializers.ModelSerializer):
             'status', 'created_at', 'updated_at'
         ]
 
-class MentorSerializer(UserSerializer):
+class StaffSerializer(UserSerializer):
+    """
+    Mentor and trainer representation with their assignment and session stats.
+    """
     assigned_startups_count = serializers.SerializerMethodField()
-    
+    sessions_count = serializers.SerializerMethodField()
+    next_session = serializers.SerializerMethodField()
+
     class Meta(UserSerializer.Meta):
-        fields = UserSerializer.Meta.fields + ['assigned_startups_count']
-    
+        fields = UserSerializer.Meta.fields + ['assigned_startups_count', 'sessions_count', 'next_session']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Annotate the stats so that serializing the whole queryset takes one
+        query. Each stat is a correlated subquery on the user's indexed rows:
+        joining team members and events together would multiply them before
+        counting. The next session subqueries use the (user, start_time) index.
+        """
+        def count_for_user(related):
+            counts = related.filter(user=OuterRef('pk')).order_by().values('user').annotate(count=Count('*'))
+            return Coalesce(Subquery(counts.values('count')), 0)
+
+        upcoming = Event.objects.filter(
+            user=OuterRef('pk'), start_time__gt=timezone.now()
+        ).order_by('start_time', 'id')
+        return queryset.annotate(
+            assigned_startups=count_for_user(TeamMember.objects.all()),
+            sessions=count_for_user(Event.objects.all()),
+            next_session_id=Subquery(upcoming.values('id')[:1]),
+            next_session_title=Subquery(upcoming.values('title')[:1]),
+            next_session_start=Subquery(upcoming.values('start_time')[:1]),
+        )
+
     def get_assigned_startups_count(self, obj):
+        if hasattr(obj, 'assigned_startups'):
+            return obj.assigned_startups
         return TeamMember.objects.filter(user=obj).count()
 
-class TrainerSerializer(UserSerializer):
-    sessions_count = serializers.SerializerMethodField()
-    next_session = serializers.SerializerMethodField()
-    
-    class Meta(UserSerializer.Meta):
-        fields = UserSerializer.Meta.fields + ['sessions_count', 'next_session']
-    
     def get_sessions_count(self, obj):
-        from .models import Event
+        if hasattr(obj, 'sessions'):
+            return obj.sessions
         return Event.objects.filter(user=obj).count()
-    
+
     def get_next_session(self, obj):
-        from .models import Event
-        from django.utils import timezone
+        if hasattr(obj, 'next_session_id'):
+            if obj.next_session_id is None:
+                return None
+            return {
+                'id': obj.next_session_id,
+                'title': obj.next_session_title,
+                'start_time': serializers.DateTimeField().to_representation(obj.next_session_start)
+            }
         upcoming_event = Event.objects.filter(
-            user=obj, 
+            user=obj,
             start_time__gt=timezone.now()
-        ).order_by('start_time').first()
-        
+        ).order_by('start_time', 'id').first()
+
         if upcoming_event:
             return {
                 'id': upcoming_event.id,
                 'title': upcoming_event.title,
-                'start_time': upcoming_event.start_time
+                'start_time': serializers.DateTimeField().to_representation(upcoming_event.start_time)
             }
-        return None
\ No newline at end of file
+        return None
+
+class MentorSerializer(StaffSerializer):
+    pass
+
+class TrainerSerializer(StaffSerializer):
+    pass
\ No newline at end of file
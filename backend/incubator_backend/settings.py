@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
 SITE_ID = 1
 
 MIDDLEWARE = [
+    'incubator_backend.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -66,6 +68,18 @@ MIDDLEWARE = [
 
 ]
 
+# Per-route query budgets, keyed by URL name. Requests that run more
+# queries than their budget log a warning with the SQL they executed.
+METRICS_QUERY_BUDGETS = {
+    'startups-list': 5,
+    'dashboard-stats': 3,
+    'resource-utilization-analytics': 3,
+    'application-ranking': 3,
+}
+# Bearer token a Prometheus scraper sends to read /metrics/, admins can also
+# read it with their access token. None allows admins only.
+METRICS_SCRAPE_TOKEN = None
+
 # CORS settings for frontend access
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3001",
@@ -152,6 +166,31 @@ AUTH_PASSWORD_VALIDATORS = [
 
 
 
+# Cache shared by every worker process on the host: version counters for
+# conditional GETs and cached data must be the same in all of them
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'incubator_backend_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+# Upper bound for cached responses, writes invalidate them before that
+RESPONSE_CACHE_TIMEOUT = 300  # seconds
+
+# Password hashing policy. The first hasher hashes new passwords, the others
+# verify older hashes, which are upgraded on the user's next login.
+PASSWORD_HASHERS = [
+    'incubator_backend.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = 1_000_000
+# Threads hashing passwords for async code per process, defaults to the CPU count
+PASSWORD_HASH_WORKERS = None
+
 # JWT Authentication settings
 '''
 SIMPLE_JWT = {
@@ -187,6 +226,20 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Chunked uploads of incubation supporting documents (see uploads.py)
+UPLOAD_MAX_SIZE = 200 * 1024 * 1024  # bytes per document
+UPLOAD_CHUNK_MAX_SIZE = 8 * 1024 * 1024  # bytes per request
+# Incomplete uploads idle for longer are removed by purge_document_uploads
+UPLOAD_EXPIRY = timedelta(days=1)
+
+# Seconds between checks for new notifications on /notifications/stream/
+NOTIFICATION_STREAM_POLL_INTERVAL = 2
+
+# Process-local cache of user rows, used by UserJWTAuthentication for tokens
+# without role claims and by token refresh
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = 30  # seconds
+
 
 
 
@@ -0,0 +1,274 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    User, Role, Stage, Startup, Application, IncubationForm, IncubationFormScore,
+    AnalyticsSnapshot, Resource, ResourceRequest, ResourceUsage, ApplicationScore, ApplicationVote,
+    Notification, NotificationCounter
+)
+from . import search
+from .reference import registry as reference_registry, get_role_name
+from .authentication import user_cache
+from .caching import bump_version, bump_model_version
+from .aggregates import register_sqlite_functions
+
+connection_created.connect(register_sqlite_functions, dispatch_uid='register_sqlite_functions')
+
+# -------------------------------
+# ANALYTICS SNAPSHOT
+# -------------------------------
+# Each tracked model maps to (snapshot counter, tracked field, predicate on
+# the tracked value). On save the counter moves by the difference between the
+# predicate on the value loaded from the database and on the saved value.
+STATUS_COUNTERS = {
+    Startup: ('active_startups', 'status', lambda value: value == 'approved'),
+    Application: ('pending_applications', 'status', lambda value: value == 'pending'),
+    IncubationForm: ('pending_forms', 'status', lambda value: value == 'pending'),
+}
+
+ROLE_COUNTERS = {
+    'mentor': 'mentors_count',
+    'trainer': 'trainers_count',
+}
+
+
+def _remember_status(sender, instance, **kwargs):
+    counter, field, predicate = STATUS_COUNTERS[sender]
+    # Read from __dict__ so deferred fields are not loaded here
+    instance._snapshot_value = instance.__dict__.get(field) if instance.pk else None
+
+
+def _status_saved(sender, instance, created, **kwargs):
+    counter, field, predicate = STATUS_COUNTERS[sender]
+    previous = None if created else getattr(instance, '_snapshot_value', None)
+    current = getattr(instance, field)
+    delta = int(predicate(current)) - int(previous is not None and predicate(previous))
+    AnalyticsSnapshot.increment(counter, delta)
+    instance._snapshot_value = current
+
+
+def _status_deleted(sender, instance, **kwargs):
+    counter, field, predicate = STATUS_COUNTERS[sender]
+    if predicate(getattr(instance, field)):
+        AnalyticsSnapshot.increment(counter, -1)
+
+
+for model in STATUS_COUNTERS:
+    post_init.connect(_remember_status, sender=model, dispatch_uid=f'snapshot_init_{model.__name__}')
+    post_save.connect(_status_saved, sender=model, dispatch_uid=f'snapshot_save_{model.__name__}')
+    post_delete.connect(_status_deleted, sender=model, dispatch_uid=f'snapshot_delete_{model.__name__}')
+
+
+def _role_counter(role_id):
+    return ROLE_COUNTERS.get(get_role_name(role_id))
+
+
+@receiver(post_init, sender=User)
+def remember_user_role(sender, instance, **kwargs):
+    instance._snapshot_role_id = instance.__dict__.get('role_id') if instance.pk else None
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    previous_role_id = None if created else getattr(instance, '_snapshot_role_id', None)
+    if previous_role_id != instance.role_id:
+        previous_counter = _role_counter(previous_role_id)
+        current_counter = _role_counter(instance.role_id)
+        if previous_counter:
+            AnalyticsSnapshot.increment(previous_counter, -1)
+        if current_counter:
+            AnalyticsSnapshot.increment(current_counter, 1)
+    instance._snapshot_role_id = instance.role_id
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    counter = _role_counter(instance.role_id)
+    if counter:
+        AnalyticsSnapshot.increment(counter, -1)
+
+
+# -------------------------------
+# RESOURCE USAGE ROLLUP
+# -------------------------------
+def _approved_quantity(status, quantity):
+    return (quantity or 0) if status == 'approved' else 0
+
+
+@receiver(post_save, sender=Resource)
+def resource_saved(sender, instance, created, **kwargs):
+    if created:
+        ResourceUsage.objects.get_or_create(resource=instance)
+
+
+@receiver(post_init, sender=ResourceRequest)
+def remember_resource_request(sender, instance, **kwargs):
+    if instance.pk:
+        instance._usage_state = (
+            instance.__dict__.get('resource_id'),
+            _approved_quantity(instance.__dict__.get('status'), instance.__dict__.get('quantity_requested')),
+        )
+    else:
+        instance._usage_state = None
+
+
+@receiver(post_save, sender=ResourceRequest)
+def resource_request_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_usage_state', None)
+    current = (instance.resource_id, _approved_quantity(instance.status, instance.quantity_requested))
+    if previous != current:
+        if previous is not None:
+            ResourceUsage.increment(previous[0], -previous[1])
+        ResourceUsage.increment(current[0], current[1])
+    instance._usage_state = current
+
+
+@receiver(post_delete, sender=ResourceRequest)
+def resource_request_deleted(sender, instance, **kwargs):
+    ResourceUsage.increment(
+        instance.resource_id,
+        -_approved_quantity(instance.status, instance.quantity_requested)
+    )
+
+
+# -------------------------------
+# UNREAD NOTIFICATION COUNTERS
+# -------------------------------
+@receiver(post_init, sender=Notification)
+def remember_notification(sender, instance, **kwargs):
+    if instance.pk and 'is_read' in instance.__dict__:
+        instance._unread_state = (instance.__dict__.get('user_id'), not instance.__dict__['is_read'])
+    else:
+        instance._unread_state = None
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_unread_state', None)
+    current = (instance.user_id, not instance.is_read)
+    if not created and previous is None:
+        # Loaded without is_read, recount instead
+        NotificationCounter.rebuild(User.objects.filter(id=instance.user_id))
+    elif previous != current:
+        if previous is not None and previous[1]:
+            NotificationCounter.increment(previous[0], -1)
+        if current[1]:
+            NotificationCounter.increment(current[0], 1)
+    instance._unread_state = current
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        NotificationCounter.increment(instance.user_id, -1)
+
+
+# -------------------------------
+# INCUBATION FORM SCORES
+# -------------------------------
+def _score_values(values):
+    return {criterion: int(values.get(criterion) or 0) for criterion in IncubationFormScore.CRITERIA}
+
+
+def _apply_form_score_delta(form_id, count, deltas):
+    IncubationForm.apply_score_delta(form_id, count, deltas)
+    # The stored averages change through update(), which sends no signal
+    transaction.on_commit(lambda: bump_model_version(IncubationForm))
+
+
+@receiver(post_init, sender=IncubationFormScore)
+def remember_form_score(sender, instance, **kwargs):
+    if instance.pk:
+        instance._score_state = (instance.__dict__.get('incubation_form_id'), _score_values(instance.__dict__))
+    else:
+        instance._score_state = None
+
+
+@receiver(post_save, sender=IncubationFormScore)
+def form_score_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_score_state', None)
+    current = (instance.incubation_form_id, _score_values(instance.__dict__))
+    if previous is None:
+        _apply_form_score_delta(current[0], 1, current[1])
+    elif previous[0] != current[0]:
+        _apply_form_score_delta(previous[0], -1, {name: -value for name, value in previous[1].items()})
+        _apply_form_score_delta(current[0], 1, current[1])
+    elif previous != current:
+        _apply_form_score_delta(current[0], 0, {name: current[1][name] - previous[1][name] for name in current[1]})
+    instance._score_state = current
+
+
+@receiver(post_delete, sender=IncubationFormScore)
+def form_score_deleted(sender, instance, **kwargs):
+    values = _score_values(instance.__dict__)
+    _apply_form_score_delta(instance.incubation_form_id, -1, {name: -value for name, value in values.items()})
+
+
+# -------------------------------
+# SEARCH INDEX
+# -------------------------------
+def _index_saved(sender, instance, **kwargs):
+    search.index_object(instance)
+
+
+def _index_deleted(sender, instance, **kwargs):
+    search.remove_object(sender, instance.pk)
+
+
+for model in search.TYPE_BY_MODEL:
+    post_save.connect(_index_saved, sender=model, dispatch_uid=f'search_save_{model.__name__}')
+    post_delete.connect(_index_deleted, sender=model, dispatch_uid=f'search_delete_{model.__name__}')
+
+
+# -------------------------------
+# APPLICATION RANKING CACHE
+# -------------------------------
+def _invalidate_application_ranking(sender, **kwargs):
+    # After the commit, a ranking read before it would otherwise be cached
+    # under the new version
+    transaction.on_commit(lambda: bump_version('application_ranking'))
+
+
+for model in (Application, ApplicationScore, ApplicationVote):
+    post_save.connect(_invalidate_application_ranking, sender=model, dispatch_uid=f'ranking_save_{model.__name__}')
+    post_delete.connect(_invalidate_application_ranking, sender=model, dispatch_uid=f'ranking_delete_{model.__name__}')
+
+
+# -------------------------------
+# REFERENCE DATA REGISTRY
+# -------------------------------
+def _invalidate_reference_data(sender, **kwargs):
+    reference_registry.invalidate()
+    # Bump again once committed, a process that reloads between the first
+    # bump and the commit still reads the old rows
+    transaction.on_commit(reference_registry.invalidate)
+
+
+for model in (Role, Stage):
+    post_save.connect(_invalidate_reference_data, sender=model, dispatch_uid=f'reference_save_{model.__name__}')
+    post_delete.connect(_invalidate_reference_data, sender=model, dispatch_uid=f'reference_delete_{model.__name__}')
+
+
+# -------------------------------
+# AUTHENTICATION USER CACHE
+# -------------------------------
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+# -------------------------------
+# MODEL VERSIONS
+# -------------------------------
+def _bump_model_version(sender, **kwargs):
+    # After the commit, so a reader never pairs the new version with old rows
+    transaction.on_commit(lambda: bump_model_version(sender))
+
+
+for model in apps.get_app_config('incubator_backend').get_models():
+    post_save.connect(_bump_model_version, sender=model, dispatch_uid=f'version_save_{model.__name__}')
+    post_delete.connect(_bump_model_version, sender=model, dispatch_uid=f'version_delete_{model.__name__}')
@@ -0,0 +1,671 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .caching import bump_version, cache_response, get_version
+from .models import (
+    AnalyticsSnapshot, Application, ApplicationScore, DocumentUpload, Event, IncubationForm, IncubationFormScore, Notification, NotificationCounter, Role, Startup, TeamMember, User
+)
+from . import notifications, search
+from .metrics import registry as metrics_registry
+from .reference import registry
+from .serializers import IncubationFormSerializer, StartupSerializer, TeamMemberSerializer
+from .utils import is_admin
+
+
+class APITestMixin:
+    def setUp(self):
+        # Versions and cached responses live in the shared cache
+        cache.clear()
+        registry.invalidate()
+
+    def create_user(self, full_name='User', role='student', **fields):
+        role, _ = Role.objects.get_or_create(name=role)
+        email = fields.pop('email', f"{full_name.lower().replace(' ', '.')}@example.com")
+        return User.objects.create(full_name=full_name, email=email, role=role, password_hash='!', **fields)
+
+
+class CalendarTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.trainer = self.create_user('Trainer', role='trainer')
+        start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        Event.objects.create(
+            title='Workshop', start_time=start, end_time=start + timedelta(hours=2), location='Room 1', user=self.trainer
+        )
+
+    def test_nonexistent_dates_are_rejected(self):
+        for value in ('2024-02-30', '2024-13-01', '2024-02-30T10:00:00'):
+            for url in ('/events/calendar/', '/events/calendar.ics'):
+                response = self.client.get(url, {'from': value, 'to': '2024-12-31', 'user': self.trainer.id})
+                self.assertEqual(response.status_code, 400, (url, value))
+                self.assertEqual(response.json()['code'], 'invalid_date')
+
+    def test_feed_etag_follows_the_user(self):
+        url = f'/events/calendar.ics?user={self.trainer.id}'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'X-WR-CALNAME:Trainer', b''.join(response.streaming_content))
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Versions are bumped once the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trainer.full_name = 'Renamed'
+            self.trainer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'X-WR-CALNAME:Renamed', b''.join(response.streaming_content))
+
+    def test_feed_etag_follows_the_default_window(self):
+        url = f'/events/calendar.ics?user={self.trainer.id}'
+        etag = self.client.get(url)['ETag']
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch('django.utils.timezone.localdate', return_value=tomorrow):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class IncubationFormExportTests(APITestMixin, APITestCase):
+    def test_nonexistent_dates_are_rejected(self):
+        for param in ('from', 'to'):
+            for value in ('2024-02-30', '2024-13-01', '2024-02-30T10:00:00'):
+                response = self.client.get('/incubation-form/export/', {param: value})
+                self.assertEqual(response.status_code, 400, (param, value))
+                self.assertEqual(response.json()['code'], 'invalid_date')
+
+    def test_valid_dates_are_accepted(self):
+        response = self.client.get('/incubation-form/export/', {'from': '2024-02-29', 'to': '2024-03-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content).count(b'\n'), 1)
+
+
+class UnpaginatedListTests(APITestMixin, APITestCase):
+    def test_plain_lists_are_bounded(self):
+        for index in range(3):
+            Startup.objects.create(name=f'Startup {index}')
+        with mock.patch('incubator_backend.views.UNPAGINATED_LIST_LIMIT', 2):
+            # The second request is served from the response cache
+            for _ in range(2):
+                response = self.client.get('/startups/')
+                self.assertEqual(len(response.json()), 2)
+                self.assertEqual(response['X-Result-Limit'], '2')
+            response = self.client.get('/startups/', {'pagination': 'cursor', 'page_size': 2})
+            self.assertEqual(len(response.json()['results']), 2)
+            self.assertIsNotNone(response.json()['next'])
+
+    def test_short_lists_are_complete(self):
+        Startup.objects.create(name='Startup')
+        response = self.client.get('/startups/')
+        self.assertEqual(len(response.json()), 1)
+        self.assertNotIn('X-Result-Limit', response)
+
+
+class LegacyStartupSerializer(StartupSerializer):
+    """
+    Team lookups as StartupSerializer made them before eager loading, one
+    query per startup and field, to compare the output with.
+    """
+    def get_team_members(self, obj):
+        members = TeamMember.objects.filter(startup=obj).exclude(role_in_team='Team Leader')
+        return TeamMemberSerializer(members, many=True).data
+
+    def get_team_leader(self, obj):
+        try:
+            leader = TeamMember.objects.get(startup=obj, role_in_team='Team Leader')
+        except TeamMember.DoesNotExist:
+            return None
+        leader_data = TeamMemberSerializer(leader).data
+        leader_data['full_name'] = leader_data['user_details']['full_name']
+        leader_data['email'] = leader_data['user_details']['email']
+        return leader_data
+
+
+class StartupQueryTests(APITestMixin, APITestCase):
+    def add_startups(self, count, members):
+        for _ in range(count):
+            index = Startup.objects.count()
+            startup = Startup.objects.create(name=f'Startup {index}')
+            leader = self.create_user(f'Leader {index}')
+            TeamMember.objects.create(startup=startup, user=leader, role_in_team='Team Leader')
+            for member in range(members):
+                user = self.create_user(f'Member {index} {member}')
+                TeamMember.objects.create(startup=startup, user=user, role_in_team='Developer')
+        # No leader at all
+        Startup.objects.create(name=f'Startup {Startup.objects.count()}')
+
+    def fetch(self, path):
+        # Create the version counters, then drop the cached response: the
+        # version lookup and the two queries of the serializer remain
+        self.client.get(path)
+        cache.clear()
+        with self.assertNumQueries(3):
+            return self.client.get(path)
+
+    def list_queries(self):
+        return self.fetch('/startups/').json()
+
+    def test_list_queries_do_not_grow(self):
+        self.add_startups(2, members=1)
+        self.list_queries()
+        self.add_startups(10, members=4)
+        data = self.list_queries()
+        self.assertEqual(len(data), Startup.objects.count())
+
+    def test_detail_queries_do_not_grow(self):
+        self.add_startups(1, members=1)
+        small = Startup.objects.order_by('id').first()
+        self.add_startups(1, members=8)
+        large = Startup.objects.order_by('id')[2]
+        for startup in (small, large):
+            response = self.fetch(f'/startups/{startup.id}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['team_members']), TeamMember.objects.filter(startup=startup).count() - 1)
+
+    def test_output_matches_team_lookups(self):
+        self.add_startups(3, members=3)
+        startups = Startup.objects.order_by('id')
+        expected = LegacyStartupSerializer(startups, many=True).data
+        data = sorted(self.list_queries(), key=lambda startup: startup['id'])
+        self.assertEqual(data, expected)
+        for startup in data:
+            detail = self.client.get(f"/startups/{startup['id']}/").json()
+            self.assertEqual(detail, startup)
+        self.assertIsNone(data[-1]['team_leader'])
+        self.assertEqual(data[0]['team_leader']['full_name'], 'Leader 0')
+        self.assertEqual([member['role_in_team'] for member in data[0]['team_members']], ['Developer'] * 3)
+
+
+class NotificationBulkTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user, self.other = self.create_user('Reader'), self.create_user('Other')
+        notifications.fan_out([self.user.id, self.other.id], 'info', 'First')
+        notifications.fan_out([self.user.id, self.other.id], 'info', 'Second')
+        notifications.fan_out([self.user.id], 'info', 'Third')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def assertCountersInSync(self):
+        self.assertEqual(NotificationCounter.rebuild(repair=False), {})
+
+    def test_delete_moves_the_counter_once(self):
+        mine = list(Notification.objects.filter(user=self.user).order_by('id'))
+        mine[0].is_read = True
+        mine[0].save()
+        theirs = Notification.objects.filter(user=self.other).values_list('id', flat=True)
+        ids = [mine[0].id, mine[1].id, *theirs]
+        response = self.client.post('/notifications/delete/', {'ids': ids}, format='json')
+        self.assertEqual(response.json(), {'deleted': 2, 'unread': 1})
+        self.assertEqual(Notification.objects.filter(user=self.other).count(), 2)
+        self.assertCountersInSync()
+
+    def test_delete_is_one_statement(self):
+        ids = list(Notification.objects.filter(user=self.user).values_list('id', flat=True))
+        # Savepoint, UPDATE of the unread rows, DELETE, counter UPDATE, release
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, self.assertNumQueries(5):
+            self.assertEqual(notifications.delete(self.user, ids), 3)
+        self.assertEqual(len(callbacks), 1)
+        self.assertCountersInSync()
+
+    def test_single_deletes_still_count(self):
+        Notification.objects.filter(user=self.user).first().delete()
+        self.assertEqual(NotificationCounter.get_unread(self.user.id), 2)
+        self.assertCountersInSync()
+
+    def test_mark_read(self):
+        first = Notification.objects.filter(user=self.user).order_by('id').first()
+        response = self.client.post('/notifications/read/', {'ids': [first.id]}, format='json')
+        self.assertEqual(response.json(), {'updated': 1, 'unread': 2})
+        response = self.client.post('/notifications/read/', {}, format='json')
+        self.assertEqual(response.json(), {'updated': 2, 'unread': 0})
+        self.assertEqual(NotificationCounter.get_unread(self.other.id), 2)
+        self.assertCountersInSync()
+
+
+class SearchIndexTests(APITestMixin, APITestCase):
+    def test_saves_replace_the_row(self):
+        startup = Startup.objects.create(name='Quokka labs')
+        startup.name = 'Wombat labs'
+        startup.save()
+        self.assertEqual([hit['title'] for hit in search.search('labs')], ['Wombat labs'])
+        startup.delete()
+        self.assertEqual(search.search('labs'), [])
+
+    def test_rebuild_keeps_every_object(self):
+        Startup.objects.create(name='Quokka labs')
+        self.create_user('Quokka fan')
+        counts = search.rebuild_index()
+        self.assertEqual((counts['startup'], counts['user']), (1, 1))
+        self.assertEqual(len(search.search('quokka')), 2)
+
+
+class MetricsTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        metrics_registry.reset()
+
+    def metric(self, name, route):
+        prefix = f'{name}{{route="{route}",method="GET"}} '
+        line = next(line for line in metrics_registry.render().splitlines() if line.startswith(prefix))
+        return float(line[len(prefix):])
+
+    def test_streamed_responses_are_measured(self):
+        response = self.client.get('/incubation-form/export/')
+        body = b''.join(response.streaming_content)
+        response.close()
+        self.assertEqual(self.metric('http_response_size_bytes_total', 'export-incubation-forms'), len(body))
+        self.assertGreaterEqual(self.metric('http_request_db_queries_total', 'export-incubation-forms'), 1)
+
+    def test_metrics_need_an_admin_or_the_scrape_token(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        student = self.create_user('Student')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(student)}')
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        admin = self.create_user('Admin', role='admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}')
+        self.assertEqual(self.client.get('/metrics/').status_code, 200)
+        with self.settings(METRICS_SCRAPE_TOKEN='scraper-secret'):
+            self.client.credentials(HTTP_AUTHORIZATION='Bearer scraper-secret')
+            self.assertEqual(self.client.get('/metrics/').status_code, 200)
+            self.client.credentials(HTTP_AUTHORIZATION='Bearer wrong')
+            self.assertEqual(self.client.get('/metrics/').status_code, 403)
+
+
+class IncubationFormScoreTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.form = IncubationForm.objects.create(project_id='P-1', project_title='Project')
+        self.url = f'/incubation-form/{self.form.id}/scores/'
+
+    def test_anonymous_scores_update_the_same_row(self):
+        self.client.post(self.url, {'problem_understanding': 2}, format='json')
+        response = self.client.post(self.url, {'problem_understanding': 4}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['score_count'], 1)
+        self.assertEqual(response.json()['problem_understanding'], 4)
+
+    def test_database_rejects_a_second_anonymous_score(self):
+        IncubationFormScore.objects.create(incubation_form=self.form)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            IncubationFormScore.objects.create(incubation_form=self.form)
+
+
+class AudienceTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        admin = self.create_user('Admin', role='admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}')
+
+    def fan_out(self, audience):
+        return self.client.post(
+            '/notifications/fan-out/', {'type': 'info', 'message': 'Hello', 'audience': audience}, format='json'
+        )
+
+    def test_non_scalar_values_are_rejected(self):
+        for audience in ({'role': [[]]}, {'role': {}}, {'startup_status': [{}]}, {'stage': [[1]]}, {'event': [True]}):
+            response = self.fan_out(audience)
+            self.assertEqual(response.status_code, 400, audience)
+            self.assertEqual(response.json()['code'], 'invalid_audience')
+
+    def test_role_audience(self):
+        self.create_user('Student')
+        response = self.fan_out({'role': ['student']})
+        self.assertEqual(response.json(), {'created': 1})
+
+
+class ApplicationRankingTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.application = Application.objects.create(startup=Startup.objects.create(name='Startup'))
+        self.jurors = [self.create_user(f'Juror {index}', role='mentor') for index in range(2)]
+        ApplicationScore.objects.create(application=self.application, user=self.jurors[0], score=10)
+
+    def mean_score(self):
+        return self.client.get('/applications/ranking/').json()['results'][0]['mean_score']
+
+    def test_score_writes_invalidate_the_cached_ranking(self):
+        self.assertEqual(self.mean_score(), 10)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            ApplicationScore.objects.create(application=self.application, user=self.jurors[1], score=20)
+            version = get_version('application_ranking')
+        # Not before the commit, a concurrent read would cache the old rows
+        self.assertEqual(get_version('application_ranking'), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_version('application_ranking'), version)
+        self.assertEqual(self.mean_score(), 15)
+
+
+class PasswordTests(APITestMixin, APITestCase):
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('Student')
+        self.user.set_password('secret')
+        self.user.save()
+
+    async def test_async_check_rehashes_with_the_current_policy(self):
+        user = self.user
+        self.assertFalse(await user.acheck_password('wrong'))
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            self.assertTrue(await user.acheck_password('secret'))
+        user = await User.objects.aget(pk=user.pk)
+        self.assertIn('$2000$', user.password_hash)
+
+
+class DocumentUploadTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = self.settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.owner = self.create_user('Owner')
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def start(self, content, **headers):
+        response = self.client.post(
+            '/incubation-form/uploads/', {'filename': 'deck.pdf', 'size': len(content)}, format='json', **headers
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def put(self, upload_id, offset, chunk, **headers):
+        return self.client.put(
+            f'/incubation-form/uploads/{upload_id}/', chunk, content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset), **headers
+        )
+
+    def request(self, **headers):
+        request = APIRequestFactory().post('/incubation-forms/', **headers)
+        request.user = AnonymousUser()
+        return request
+
+    def test_resumes_from_the_received_offset(self):
+        self.authenticate(self.owner)
+        upload = self.start(b'0123456789')
+        self.assertEqual(self.put(upload['id'], 0, b'01234').headers['Upload-Offset'], '5')
+        self.assertEqual(self.client.get(f'/incubation-form/uploads/{upload["id"]}/').headers['Upload-Offset'], '5')
+
+        # A retry of the first chunk conflicts and reports where to resume
+        response = self.put(upload['id'], 0, b'01234')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.headers['Upload-Offset'], '5')
+
+        response = self.put(upload['id'], 5, b'56789')
+        self.assertEqual(response.json()['status'], 'complete')
+        self.assertEqual(response.json()['sha256'], hashlib.sha256(b'0123456789').hexdigest())
+
+    def test_identical_documents_are_stored_once(self):
+        self.authenticate(self.owner)
+        names = []
+        for _ in range(2):
+            upload = self.start(b'same content')
+            names.append(self.put(upload['id'], 0, b'same content').json()['file'])
+        self.assertEqual(names[0], names[1])
+        directory = os.path.dirname(DocumentUpload.objects.get(id=upload['id']).file.path)
+        self.assertEqual(os.listdir(directory), [os.path.basename(names[0])])
+
+    def test_only_the_uploader_uses_an_upload(self):
+        self.authenticate(self.owner)
+        owned = self.start(b'owned')
+        self.authenticate(self.create_user('Other'))
+        self.assertEqual(self.client.get(f'/incubation-form/uploads/{owned["id"]}/').status_code, 404)
+        self.assertEqual(self.put(owned['id'], 0, b'owned').status_code, 404)
+
+        self.client.credentials()
+        anonymous = self.start(b'anonymous')
+        self.assertNotIn('token', owned)
+        self.assertEqual(self.client.get(f'/incubation-form/uploads/{anonymous["id"]}/').status_code, 404)
+        for upload in (owned, anonymous):
+            response = self.put(upload['id'], 0, b'x', HTTP_UPLOAD_TOKEN=anonymous['token'])
+            self.assertEqual(response.status_code, 404 if upload is owned else 200)
+
+    def test_forms_only_attach_the_requesters_uploads(self):
+        upload = self.start(b'deck')
+        self.put(upload['id'], 0, b'deck', HTTP_UPLOAD_TOKEN=upload['token'])
+        form = {'supporting_documents_upload': upload['id']}
+
+        serializer = IncubationFormSerializer(data=form, context={'request': self.request()})
+        serializer.is_valid()
+        self.assertIn('supporting_documents_upload', serializer.errors)
+        serializer = IncubationFormSerializer(data=form, context={'request': self.request(HTTP_UPLOAD_TOKEN=upload['token'])})
+        serializer.is_valid()
+        self.assertNotIn('supporting_documents_upload', serializer.errors)
+
+
+class ConditionalGetTests(APITestMixin, APITestCase):
+    def test_unchanged_response_is_not_modified(self):
+        etag = self.client.get('/startups/').headers['ETag']
+        response = self.client.get('/startups/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_invalidate_the_etag_and_the_cached_response(self):
+        response = self.client.get('/startups/')
+        self.assertEqual(response.json(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Startup.objects.create(name='Startup')
+        response = self.client.get('/startups/', HTTP_IF_NONE_MATCH=response.headers['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([startup['name'] for startup in response.json()], ['Startup'])
+
+    def test_bumps_increment_the_stored_counter(self):
+        version = get_version('test')
+        bump_version('test')
+        bump_version('test')
+        self.assertEqual(get_version('test'), version + 2)
+
+
+class CachedResponseTests(APITestMixin, APITestCase):
+    def test_per_user_entries_are_not_shared(self):
+        calls = []
+
+        @api_view(['GET'])
+        @cache_response(Role, per_user=True)
+        def view(request):
+            calls.append(request.user)
+            return Response({'admin': is_admin(request.user)})
+
+        admin, student = self.create_user('Admin', role='admin'), self.create_user('Student')
+        for user in (admin, student, admin):
+            request = APIRequestFactory().get('/permissions/')
+            force_authenticate(request, user)
+            response = view(request)
+            self.assertEqual(response.data, {'admin': user is admin})
+        # The admin's second request came from the cache
+        self.assertEqual(calls, [admin, student])
+        self.assertIn('Authorization', response.headers['Vary'])
+
+
+class TeamMemberConstraintTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.startup = Startup.objects.create(name='First')
+        self.leader = self.create_user('Leader')
+        TeamMember.objects.create(startup=self.startup, user=self.leader, role_in_team='Team Leader')
+
+    def assertConflict(self, code, **fields):
+        with self.assertRaises(ValidationError) as raised:
+            TeamMember(**fields).save()
+        self.assertEqual(raised.exception.code, code)
+
+    def test_integrity_errors_become_membership_conflicts(self):
+        other = Startup.objects.create(name='Other')
+        self.assertConflict('already_team_member', startup=other, user=self.leader, role_in_team='Developer')
+        self.assertConflict('already_team_leader', startup=other, user=self.leader, role_in_team='Team Leader')
+        self.assertConflict('already_team_member', startup=self.startup, user=self.leader, role_in_team='Developer')
+        self.assertConflict('startup_has_leader', startup=self.startup, user=self.create_user('Second'), role_in_team='Team Leader')
+        self.assertEqual(TeamMember.objects.count(), 1)
+
+
+class TeamMembersBulkTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.startups = [Startup.objects.create(name=name) for name in ('First', 'Second')]
+        self.students = [self.create_user(f'Student {index}') for index in range(3)]
+
+    def post(self, *members):
+        return self.client.post('/startups/team/bulk/', {'members': list(members)}, format='json')
+
+    def row(self, startup, user, role_in_team='Developer'):
+        return {'startup': startup.id, 'user': user.id, 'role_in_team': role_in_team}
+
+    def test_valid_batch_is_created(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post(
+                self.row(self.startups[0], self.students[0], 'Team Leader'),
+                self.row(self.startups[0], self.students[1]),
+                self.row(self.startups[1], self.students[2], 'Team Leader'),
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 3)
+        self.assertEqual(TeamMember.objects.filter(role_in_team='Team Leader').count(), 2)
+
+    def test_invalid_rows_are_reported_and_nothing_is_created(self):
+        response = self.post(
+            self.row(self.startups[0], self.students[0], 'Team Leader'),
+            self.row(self.startups[0], self.students[1], 'Team Leader'),
+            self.row(self.startups[1], self.students[2], 'x' * 51),
+            self.row(self.startups[1], self.students[2], ['Developer']),
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [(result['index'], result['code']) for result in response.json()['results']],
+            [(1, 'startup_has_leader'), (2, 'invalid_role_in_team'), (3, 'invalid_role_in_team')]
+        )
+        self.assertFalse(TeamMember.objects.exists())
+
+    def test_existing_memberships_conflict(self):
+        TeamMember.objects.create(startup=self.startups[0], user=self.students[0], role_in_team='Team Leader')
+        response = self.post(self.row(self.startups[1], self.students[0]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['results'][0]['code'], 'already_team_member')
+
+        # A membership added after the rows were checked fails the insert
+        with mock.patch.object(TeamMember.objects, 'filter', return_value=TeamMember.objects.none()):
+            response = self.post(self.row(self.startups[1], self.students[0]))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['code'], 'roster_conflict')
+        self.assertEqual(TeamMember.objects.count(), 1)
+
+
+class AnalyticsSnapshotTests(APITestMixin, APITestCase):
+    COUNTERS = ('active_startups', 'pending_applications', 'pending_forms', 'mentors_count', 'trainers_count')
+
+    def assertSnapshotCurrent(self):
+        snapshot = AnalyticsSnapshot.get()
+        actual = AnalyticsSnapshot.compute()
+        self.assertEqual({name: getattr(snapshot, name) for name in self.COUNTERS}, actual)
+        stats = self.client.get('/analytics/dashboard/').json()
+        self.assertEqual({name: stats[name] for name in self.COUNTERS}, actual)
+        return actual
+
+    def test_signals_keep_the_snapshot_current(self):
+        pending = Startup.objects.create(name='Pending')
+        approved = Startup.objects.create(name='Approved', status='approved')
+        application = Application.objects.create(startup=pending)
+        self.create_user('Mentor', role='mentor')
+        trainer = self.create_user('Trainer', role='trainer')
+        self.assertEqual(self.assertSnapshotCurrent(), {
+            'active_startups': 1, 'pending_applications': 1, 'pending_forms': 0, 'mentors_count': 1, 'trainers_count': 1,
+        })
+
+        pending.status = 'approved'
+        pending.save()
+        # Saving again without a change moves nothing
+        pending.save()
+        application.status = 'approved'
+        application.save()
+        trainer.role = Role.objects.get(name='mentor')
+        trainer.save()
+        self.assertEqual(self.assertSnapshotCurrent(), {
+            'active_startups': 2, 'pending_applications': 0, 'pending_forms': 0, 'mentors_count': 2, 'trainers_count': 0,
+        })
+
+        Application.objects.create(startup=approved)
+        approved.delete()
+        trainer.delete()
+        self.assertEqual(self.assertSnapshotCurrent(), {
+            'active_startups': 1, 'pending_applications': 0, 'pending_forms': 0, 'mentors_count': 1, 'trainers_count': 0,
+        })
+
+    def test_reconcile_repairs_drift(self):
+        Startup.objects.create(name='Approved', status='approved')
+        # Queryset updates bypass the signal handlers
+        Startup.objects.update(status='rejected')
+        AnalyticsSnapshot.objects.update(mentors_count=5)
+
+        output = StringIO()
+        call_command('reconcile_analytics', '--check', stdout=output)
+        self.assertIn('active_startups: stored 1, actual 0', output.getvalue())
+        self.assertIn('mentors_count: stored 5, actual 0', output.getvalue())
+        self.assertEqual(AnalyticsSnapshot.get().mentors_count, 5)
+
+        call_command('reconcile_analytics', stdout=StringIO())
+        self.assertSnapshotCurrent()
+        output = StringIO()
+        call_command('reconcile_analytics', '--check', stdout=output)
+        self.assertIn('up to date', output.getvalue())
+
+
+class ApplicationReviewsBulkTests(APITestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.application = Application.objects.create(startup=Startup.objects.create(name='Startup'))
+        self.jurors = [self.create_user(f'Juror {index}', role='mentor') for index in range(2)]
+        ApplicationScore.objects.create(application=self.application, user=self.jurors[0], score=10)
+
+    def post(self, *reviews):
+        return self.client.post('/applications/reviews/bulk/', {'reviews': list(reviews)}, format='json')
+
+    def review(self, juror, **fields):
+        return {'application': self.application.id, 'user': juror.id, **fields}
+
+    def test_rows_are_created_or_updated(self):
+        response = self.post(self.review(self.jurors[0], score=30, vote=True), self.review(self.jurors[1], score=20))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['scores'], 2)
+        self.assertEqual(
+            [(result['score'], result.get('vote')) for result in response.json()['results']],
+            [('updated', 'created'), ('created', None)]
+        )
+        self.assertEqual(
+            sorted(ApplicationScore.objects.values_list('user_id', 'score')),
+            [(self.jurors[0].id, 30), (self.jurors[1].id, 20)]
+        )
+
+    def test_duplicate_review_rejects_the_batch(self):
+        response = self.post(self.review(self.jurors[1], score=20), self.review(self.jurors[1], vote=False))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [(result['index'], result['code']) for result in response.json()['results']], [(1, 'duplicate_review')]
+        )
+        self.assertEqual(ApplicationScore.objects.count(), 1)
+
+    def ranking(self):
+        return self.client.get('/applications/ranking/').json()['results'][0]
+
+    def test_bulk_writes_invalidate_the_cached_ranking(self):
+        self.assertEqual(self.ranking()['mean_score'], 10)
+        self.post(self.review(self.jurors[0], score=30, vote=True), self.review(self.jurors[1], score=20, vote=True))
+        ranking = self.ranking()
+        self.assertEqual((ranking['mean_score'], ranking['yes_votes']), (25, 2))
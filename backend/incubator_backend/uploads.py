@@ -0,0 +1,183 @@
+"""
+Chunked uploads of incubation supporting documents.
+
+A DocumentUpload's bytes go to a partial file in the default storage, one
+chunk per request at the offset the upload has received so far. A chunk is
+streamed to disk as it is read, and the offset only moves by what was
+actually written, so a client resumes an interrupted transfer from the
+upload's offset instead of starting over.
+
+Once complete, the file is hashed with SHA-256 in a single streaming pass
+and moved to incubation_documents/sha256/<xx>/<sha256><ext>. Identical
+documents map to the same name, the first copy is kept and later ones are
+dropped. Storage must be the local filesystem: partial files and stored
+documents live under the same root, so the move is an atomic rename.
+
+An upload belongs to the user who started it. Forms are submitted
+anonymously too, so an anonymous upload gets a signed token instead, sent
+back in the Upload-Token header to resume it or attach it to a form.
+"""
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.http import UnreadablePostError
+from django.utils import timezone
+
+from .models import DocumentUpload
+
+PARTIAL_DIR = 'incubation_documents/partial'
+CONTENT_DIR = 'incubation_documents/sha256'
+
+# Bytes read from the request per write
+COPY_BLOCK_SIZE = 64 * 1024
+
+TOKEN_SALT = 'incubator_backend.uploads'
+
+
+class UploadError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def max_size():
+    return getattr(settings, 'UPLOAD_MAX_SIZE', 200 * 1024 * 1024)
+
+
+def max_chunk_size():
+    return getattr(settings, 'UPLOAD_CHUNK_MAX_SIZE', 8 * 1024 * 1024)
+
+
+def partial_path(upload_id):
+    return default_storage.path(f'{PARTIAL_DIR}/{upload_id}.part')
+
+
+def content_name(sha256, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    return f'{CONTENT_DIR}/{sha256[:2]}/{sha256}{extension}'
+
+
+def issue_token(upload):
+    return signing.dumps(str(upload.id), salt=TOKEN_SALT)
+
+
+def accessible(request):
+    """
+    Uploads the request may use: the user's own, and the anonymous upload
+    named by the Upload-Token header.
+    """
+    access = Q(pk__in=[])
+    if request.user.is_authenticated:
+        access |= Q(uploaded_by=request.user)
+    token = request.headers.get('Upload-Token')
+    if token:
+        try:
+            access |= Q(uploaded_by=None, id=signing.loads(token, salt=TOKEN_SALT))
+        except signing.BadSignature:
+            pass
+    return DocumentUpload.objects.filter(access)
+
+
+def start(upload):
+    path = partial_path(upload.id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+
+
+def write_chunk(upload, offset, stream, length):
+    """
+    Write `length` bytes of stream at `offset` and move the upload's offset
+    past them. Returns the upload's new offset. A chunk cut short still
+    counts for the bytes that made it to disk.
+    """
+    if upload.status != 'uploading':
+        raise UploadError('The upload is already complete', 'upload_complete')
+    if offset != upload.received:
+        raise UploadError(f'Expected offset {upload.received}', 'offset_mismatch')
+    if length > max_chunk_size():
+        raise UploadError(f'Chunks are limited to {max_chunk_size()} bytes', 'chunk_too_large')
+    if offset + length > upload.size:
+        raise UploadError('The chunk goes past the announced size', 'size_exceeded')
+
+    written = 0
+    try:
+        with open(partial_path(upload.id), 'r+b') as part:
+            part.seek(offset)
+            while written < length:
+                try:
+                    block = stream.read(min(COPY_BLOCK_SIZE, length - written))
+                except UnreadablePostError:
+                    # Client went away mid-chunk, keep what was written
+                    break
+                if not block:
+                    break
+                part.write(block)
+                written += len(block)
+            part.truncate()
+    except FileNotFoundError:
+        raise UploadError('The upload expired', 'upload_expired')
+
+    # Only one writer moves the offset from where it started, a concurrent
+    # retry of the same chunk gets an offset mismatch
+    moved = DocumentUpload.objects.filter(pk=upload.pk, received=offset, status='uploading').update(
+        received=offset + written, updated_at=timezone.now()
+    )
+    if not moved:
+        upload.refresh_from_db(fields=['received', 'status'])
+        raise UploadError(f'Expected offset {upload.received}', 'offset_mismatch')
+    upload.received = offset + written
+    return upload.received
+
+
+def complete(upload):
+    """
+    Hash a fully received upload, move it to content-addressed storage and
+    mark it complete. A checksum mismatch discards the received bytes.
+    """
+    path = partial_path(upload.id)
+    with open(path, 'rb') as part:
+        sha256 = hashlib.file_digest(part, 'sha256').hexdigest()
+
+    if upload.sha256 and upload.sha256 != sha256:
+        open(path, 'wb').close()
+        DocumentUpload.objects.filter(pk=upload.pk).update(received=0, updated_at=timezone.now())
+        upload.received = 0
+        raise UploadError('The file does not match the announced SHA-256, upload it again', 'checksum_mismatch')
+
+    name = content_name(sha256, upload.filename)
+    stored_path = default_storage.path(name)
+    if os.path.exists(stored_path):
+        os.remove(path)
+    else:
+        os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+        os.replace(path, stored_path)
+
+    upload.sha256 = sha256
+    upload.file = name
+    upload.status = 'complete'
+    upload.save(update_fields=['sha256', 'file', 'status', 'updated_at'])
+    return upload
+
+
+def purge_stale(older_than=None):
+    """
+    Delete uploads left incomplete for longer than older_than (default
+    settings.UPLOAD_EXPIRY) along with their partial files. Returns the
+    number of uploads deleted.
+    """
+    older_than = older_than or getattr(settings, 'UPLOAD_EXPIRY', timedelta(days=1))
+    stale = DocumentUpload.objects.filter(status='uploading', updated_at__lt=timezone.now() - older_than)
+    upload_ids = list(stale.values_list('id', flat=True))
+    for upload_id in upload_ids:
+        try:
+            os.remove(partial_path(upload_id))
+        except FileNotFoundError:
+            pass
+    DocumentUpload.objects.filter(id__in=upload_ids).delete()
+    return len(upload_ids)
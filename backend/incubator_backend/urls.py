@@ -2,9 +2,10 @@ from django.urls import path
 from rest_framework_simplejwt.views import (
     TokenObtainPairView, TokenRefreshView,
 )
-from .views import MyTokenObtainPairView
+from .views import MyTokenObtainPairView, MyTokenRefreshView
 
 from . import views 
+from .metrics import metrics_view
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
@@ -33,7 +34,7 @@ urlpatterns = [
     # Authentication
     path('auth/register/', views.users_list, name='register'),
     path('auth/login/', MyTokenObtainPairView.as_view(), name='login'),
-    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('auth/token/refresh/', MyTokenRefreshView.as_view(), name='token_refresh'),
     path('auth/signup/', views.public_register, name='public-register'),
     
 
@@ -46,11 +47,14 @@ urlpatterns = [
     path('startups/', views.startups_list, name='startups-list'),
     path('startups/<int:id>/', views.startup_detail, name='startup-detail'),
     path('startups/<int:startup_id>/team/', views.team_members_list, name='team-members'),
+    path('startups/team/bulk/', views.team_members_bulk, name='team-members-bulk'),
     path('startups/<int:startup_id>/team/<int:member_id>/', views.remove_team_member, name='remove-team-member'),
     path('startups/<int:startup_id>/team/<int:member_id>/', views.team_member_detail, name='team-member-detail'),
 
     # Applications
     path('applications/', views.applications_list, name='applications-list'),
+    path('applications/ranking/', views.application_ranking, name='application-ranking'),
+    path('applications/reviews/bulk/', views.application_reviews_bulk, name='application-reviews-bulk'),
     path('applications/<int:id>/', views.application_detail, name='application-detail'),
     path('applications/<int:id>/status/', views.application_status_update, name='application-status'),
     path('applications/<int:id>/average-score/', views.application_average_score, name='application-average-score'),
@@ -74,6 +78,9 @@ urlpatterns = [
     # Events
     path('events/', views.events_list, name='events-list'),
     path('events/<int:id>/', views.event_detail, name='event-detail'),
+    path('events/calendar/', views.events_calendar, name='events-calendar'),
+    path('events/calendar.ics', views.events_calendar_feed, name='events-calendar-feed'),
+    path('events/slots/check/', views.check_event_slots, name='check-event-slots'),
 
     # Jury Evaluations
     path('jury-evaluations/', views.jury_evaluations_list, name='jury-evaluations'),
@@ -86,8 +93,12 @@ urlpatterns = [
 
     # Notifications
     path('notifications/', views.notifications_list, name='notifications-list'),
+    path('notifications/read/', views.notifications_mark_read, name='notifications-mark-read'),
+    path('notifications/delete/', views.notifications_bulk_delete, name='notifications-bulk-delete'),
+    path('notifications/unread-count/', views.notifications_unread_count, name='notifications-unread-count'),
     path('notifications/<int:id>/read/', views.mark_notification_read, name='mark-notification-read'),
     path('notifications/<int:id>/', views.delete_notification, name='delete-notification'),
+    path('notifications/fan-out/', views.notifications_fan_out, name='notifications-fan-out'),
 
     #incubation form 
     path('incubation-form/', views.incubation_forms_list, name='incubation-forms-list'),
@@ -95,7 +106,11 @@ urlpatterns = [
     path('incubation-form/<int:id>/status/', views.incubation_form_status_update, name='incubation-form-status-update'),
     path('incubation-form/pending/', views.pending_incubation_forms, name='pending-incubation-forms'),
     path('incubation-form/my-submissions/', views.my_incubation_submissions, name='my-incubation-submissions'),
+    path('incubation-form/export/', views.export_incubation_forms, name='export-incubation-forms'),
+    path('incubation-form/export-csv/', views.export_incubation_forms, name='export-incubation-forms-csv'),
     path('incubation-form/<int:id>/scores/',views.incubation_form_scores,name='incubation_form_scores'),
+    path('incubation-form/uploads/', views.document_uploads, name='document-uploads'),
+    path('incubation-form/uploads/<uuid:upload_id>/', views.document_upload_detail, name='document-upload-detail'),
     # Mentors and Trainers
     path('mentors/', views.mentors_list, name='mentors-list'),
     path('mentors/create/', views.create_mentor, name='create-mentor'),
@@ -104,6 +119,12 @@ urlpatterns = [
     path('trainers/create/', views.create_trainer, name='create-trainer'),
     path('trainers/<int:id>/', views.trainer_detail, name='trainer-detail'),
 
+    # Search
+    path('search/', views.global_search, name='global-search'),
+
+    # Metrics (Prometheus text format)
+    path('metrics/', metrics_view, name='metrics'),
+
     # Analytics
     path('analytics/dashboard/', views.dashboard_stats, name='dashboard-stats'),
     path('analytics/application-status/', views.application_status_analytics, name='application-status-analytics'),
@@ -1,22 +1,29 @@
 # utils.py
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.response import Response
 from rest_framework import status
 
+from .reference import get_role_name
+
+def _role_name(user):
+    # Resolve the role from the registry so the check costs no query
+    name = get_role_name(getattr(user, 'role_id', None))
+    return name.lower() if name else None
+
 def is_admin(user):
     # Check if user is authenticated and has a role attribute
     if not hasattr(user, 'is_authenticated') or not user.is_authenticated:
         return False
-    if not hasattr(user, 'role') or user.role is None:
-        return False
-    return user.role.name.lower() == 'admin'
+    return _role_name(user) == 'admin'
 
 def is_student(user):
     # Check if user is authenticated and has a role attribute
     if not hasattr(user, 'is_authenticated') or not user.is_authenticated:
         return False
-    if not hasattr(user, 'role') or user.role is None:
-        return False
-    return user.role.name.lower() == 'student'
+    return _role_name(user) == 'student'
 
 def is_owner(user, obj):
     return obj.user == user
@@ -39,3 +46,20 @@ def is_user_available(user):
     Check if a user is available (active)
     """
     return user.is_active
+
+def parse_query_datetime(value, end_of_day=False):
+    """
+    Parse a date or datetime query parameter into an aware datetime. A bare
+    date is the start of the day, or its end with end_of_day. Returns None
+    if the value is not a date, including well formed dates that do not
+    exist such as 2024-02-30.
+    """
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None and parse_date(value) is not None:
+            parsed = datetime.combine(parse_date(value), time.max if end_of_day else time.min)
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
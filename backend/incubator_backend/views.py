@@ -4,36 +4,55 @@ from rest_framework.decorators import (
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, BasePermission, AllowAny
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.pagination import PageNumberPagination
+from .authentication import UserJWTAuthentication
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.throttling import UserRateThrottle
-from django.db.models import Avg
+from django.db.models import (
+    Avg, Q, F, Count, OuterRef, Subquery, Window, FloatField, ExpressionWrapper
+)
+from django.db.models.functions import Cast, Coalesce, Rank
+from django.core.cache import cache
+from django.db import transaction, IntegrityError
+from django.core.exceptions import ValidationError
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 import logging
+import csv
+import json
+from datetime import datetime, timedelta
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
 # Import models
 from .models import (
     User, Role, Startup, TeamMember, Application, ApplicationVote,
     ApplicationScore, Stage, Deliverable, DeliverableEvaluation, Resource,
     ResourceRequest, ResourceAllocation, Event, JuryEvaluation,
-    FileMetadata, Notification , IncubationForm
+    FileMetadata, Notification , IncubationForm, DocumentUpload, NotificationCounter
 )
 
 # Import serializers
 from .serializers import (
     UserSerializer, RoleSerializer, StartupSerializer, TeamMemberSerializer,
-    ApplicationSerializer, ApplicationVoteSerializer, ApplicationScoreSerializer,
+    ApplicationSerializer, ApplicationVoteSerializer, ApplicationScoreSerializer, ApplicationReviewRowSerializer,
     StageSerializer, DeliverableSerializer, DeliverableEvaluationSerializer,
     ResourceSerializer, ResourceRequestSerializer, ResourceAllocationSerializer,
-    EventSerializer, JuryEvaluationSerializer, FileMetadataSerializer, NotificationSerializer,MyTokenObtainPairSerializer,IncubationForm,IncubationFormDetailSerializer,IncubationFormListSerializer,IncubationFormSerializer,SignupUserSerializer
+    EventSerializer, JuryEvaluationSerializer, FileMetadataSerializer, NotificationSerializer,MyTokenObtainPairSerializer,MyTokenRefreshSerializer,IncubationForm,IncubationFormDetailSerializer,IncubationFormListSerializer,IncubationFormSerializer,SignupUserSerializer,
+    IncubationFormScoreSerializer, IncubationFormScoreInputSerializer, DocumentUploadSerializer, EventSlotSerializer,
+    NotificationFanOutSerializer, NotificationBulkSerializer
 )
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+from . import search, uploads, scheduling, notifications
+from .ical import ical_lines
+from .aggregates import Median
+from .caching import get_version, bump_version, bump_model_version, conditional_on, cache_response
+from .reference import get_role, get_roles, get_role_name, get_stages, get_stage
 
 # Import utility functions for permission checks and error responses
-from .utils import is_admin, is_student, is_owner, error_response
+from .utils import is_admin, is_student, is_owner, error_response, parse_query_datetime
 
 # -------------------------------
 # Custom Throttles
@@ -49,6 +68,52 @@ class StandardPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
 
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination. Pages are fetched with an indexed range
+    filter on the ordering key instead of an OFFSET, so deep pages cost the
+    same as the first one, and no COUNT(*) is issued.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    # Primary keys grow with created_at, so ordering on the id keeps the
+    # (created_at, id) order while using the primary key index.
+    ordering = '-id'
+
+# Most rows a list endpoint returns without ?pagination=cursor
+UNPAGINATED_LIST_LIMIT = 1000
+
+def wants_keyset_pagination(request):
+    """
+    List endpoints keep returning plain lists unless the caller opts into
+    cursor pagination with ?pagination=cursor.
+    """
+    return request.query_params.get('pagination') == 'cursor'
+
+def keyset_paginated_response(request, queryset, serializer_class, ordering=None):
+    paginator = KeysetPagination()
+    if ordering:
+        paginator.ordering = ordering
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+def list_response(request, queryset, serializer_class, ordering=None):
+    """
+    Cursor-paginated response with ?pagination=cursor, otherwise a plain
+    list of at most UNPAGINATED_LIST_LIMIT rows. A list that was cut short
+    carries an X-Result-Limit header with the limit; callers that need
+    every row page through them with ?pagination=cursor.
+    """
+    if wants_keyset_pagination(request):
+        return keyset_paginated_response(request, queryset, serializer_class, ordering)
+    rows = list(queryset[:UNPAGINATED_LIST_LIMIT + 1])
+    response = Response(serializer_class(rows[:UNPAGINATED_LIST_LIMIT], many=True).data)
+    if len(rows) > UNPAGINATED_LIST_LIMIT:
+        response['X-Result-Limit'] = str(UNPAGINATED_LIST_LIMIT)
+    return response
+
 # -------------------------------
 # USERS & ROLES
 # -------------------------------
@@ -63,6 +128,9 @@ class MyTokenObtainPairView(TokenObtainPairView):
             logger = logging.getLogger(__name__)
             logger.error(f"Login error: {str(e)}, Request data: {request.data}")
             raise
+
+class MyTokenRefreshView(TokenRefreshView):
+    serializer_class = MyTokenRefreshSerializer
 '''
 @api_view(['POST'])
 @permission_classes([])
@@ -105,7 +173,7 @@ def public_register(request):
                             'id': user.id,
                             'full_name': user.full_name,
                             'email': user.email,
-                            'role': user.role.name if user.role else None
+                            'role': get_role_name(user.role_id)
                         }
                     }, 
                     status=status.HTTP_201_CREATED
@@ -131,6 +199,8 @@ def users_list(request):
         users = User.objects.all()
         if name:
             users = users.filter(full_name__icontains=name)
+        if wants_keyset_pagination(request):
+            return keyset_paginated_response(request, users, UserSerializer)
         
         paginator = StandardPagination()
         page = paginator.paginate_queryset(users, request)
@@ -146,7 +216,7 @@ def users_list(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def user_detail(request, id):
     try:
@@ -174,9 +244,12 @@ def user_detail(request, id):
 @api_view(['GET'])
 # @authentication_classes([JWTAuthentication])
 # @permission_classes([IsAuthenticated])
+@conditional_on(Role)
+@cache_response(Role)
 def roles_list(request):
-    roles = Role.objects.all()
-    serializer = RoleSerializer(roles, many=True)
+    if wants_keyset_pagination(request):
+        return keyset_paginated_response(request, Role.objects.all(), RoleSerializer)
+    serializer = RoleSerializer(get_roles(), many=True)
     return Response(serializer.data)
 
 # -------------------------------
@@ -254,7 +327,10 @@ def team_member_detail(request, startup_id, member_id):
             
             serializer = TeamMemberSerializer(team_member, data=data, partial=True)
             if serializer.is_valid():
-                serializer.save()
+                try:
+                    serializer.save()
+                except ValidationError as e:
+                    return error_response(e.messages[0], e.code, status.HTTP_400_BAD_REQUEST)
                 return Response(serializer.data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
@@ -275,11 +351,12 @@ def team_member_detail(request, startup_id, member_id):
 # TEMPORARY: Comment out authentication for development
 # @authentication_classes([JWTAuthentication])
 # @permission_classes([IsAuthenticated])
+@conditional_on(Startup, TeamMember, User, Role)
+@cache_response(Startup, TeamMember, User, Role)
 def startups_list(request):
     if request.method == 'GET':
-        startups = Startup.objects.all()
-        serializer = StartupSerializer(startups, many=True)
-        return Response(serializer.data)
+        startups = StartupSerializer.setup_eager_loading(Startup.objects.all())
+        return list_response(request, startups, StartupSerializer)
     elif request.method == 'POST':
         # TEMPORARY: Skip user check for development
         # if not is_student(request.user):
@@ -295,9 +372,10 @@ def startups_list(request):
 # TEMPORARY: Comment out authentication for development
 # @authentication_classes([JWTAuthentication])
 # @permission_classes([IsAuthenticated])
+@conditional_on(Startup, TeamMember, User, Role)
 def startup_detail(request, id):
     try:
-        startup = Startup.objects.get(id=id)
+        startup = StartupSerializer.setup_eager_loading(Startup.objects.all()).get(id=id)
     except Startup.DoesNotExist:
         return error_response('Startup not found', 'startup_not_found', status.HTTP_404_NOT_FOUND)
     if request.method == 'GET':
@@ -343,8 +421,7 @@ def team_members_list(request, startup_id):
     
     if request.method == 'GET':
         members = TeamMember.objects.filter(startup=startup)
-        serializer = TeamMemberSerializer(members, many=True)
-        return Response(serializer.data)
+        return list_response(request, members, TeamMemberSerializer)
     
     elif request.method == 'POST':
         data = request.data.copy()
@@ -387,53 +464,161 @@ def team_members_list(request, startup_id):
             return error_response(f"User with ID {data['user']} not found", 'user_not_found', status.HTTP_400_BAD_REQUEST)
         
         # Validate that the user is a student
-        if hasattr(user, 'role') and user.role and user.role.name != 'student':
+        role_name = get_role_name(user.role_id)
+        if role_name and role_name != 'student':
             return error_response(
-                f"Team members must be students, but {user.full_name} has role {user.role.name}", 
+                f"Team members must be students, but {user.full_name} has role {role_name}", 
                 'not_student', 
                 status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if this is a team leader
-        is_team_leader = data.get('role_in_team') == 'Team Leader'
-        
-        # Validate that the user is not already a team leader for another startup
-        if is_team_leader:
-            existing_leader = TeamMember.objects.filter(user=user, role_in_team='Team Leader')
-            if existing_leader.exists():
-                return error_response(
-                    f"{user.full_name} is already a team leader for another startup", 
-                    'already_team_leader',
-                    status.HTTP_400_BAD_REQUEST
-                )
-                
-        # Validate that the user is not already a member of another startup
-        existing_member = TeamMember.objects.filter(user=user)
-        if existing_member.exists():
-            return error_response(
-                f"{user.full_name} is already a member of {existing_member.first().startup.name}", 
-                'already_team_member', 
-                status.HTTP_400_BAD_REQUEST
-            )
-        
-        # If this is a team leader, ensure there's not already a team leader for this startup
-        if is_team_leader:
-            existing_startup_leader = TeamMember.objects.filter(startup=startup, role_in_team='Team Leader')
-            if existing_startup_leader.exists():
-                return error_response(
-                    f"{startup.name} already has a team leader: {existing_startup_leader.first().user.full_name}", 
-                    'startup_has_leader', 
-                    status.HTTP_400_BAD_REQUEST
-                )
-        
-        # All validations passed, create the team member
+        # All validations passed, create the team member. The one startup per
+        # user and one leader per startup rules are database constraints,
+        # violations come back from save() as a ValidationError.
         serializer = TeamMemberSerializer(data=data)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except ValidationError as e:
+                return error_response(e.messages[0], e.code, status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def role_in_team_error(value):
+    """
+    Check a role_in_team against the model field, which bulk_create does
+    not validate. Returns the error message or None.
+    """
+    if not isinstance(value, str):
+        return "role_in_team must be a string"
+    try:
+        TeamMember._meta.get_field('role_in_team').clean(value, None)
+    except ValidationError as e:
+        return ' '.join(e.messages)
+    return None
+
+@api_view(['POST'])
+#@authentication_classes([JWTAuthentication])
+#@permission_classes([IsAuthenticated])
+def team_members_bulk(request):
+    """
+    Add whole rosters, possibly for several startups, in one request.
+
+    Expects {"members": [{"startup": id, "user": id | "member_name": name |
+    "team_leader_name": name, "role_in_team": str}, ...]}. Users, startups
+    and existing memberships are loaded with one query each and every rule
+    is checked in memory. Rows are inserted together in one transaction, so
+    if any row is invalid nothing is created and the errors are reported
+    per row.
+    """
+    rows = request.data.get('members')
+    if not isinstance(rows, list) or not rows:
+        return error_response('A non-empty "members" list is required', 'members_required', status.HTTP_400_BAD_REQUEST)
+
+    # Load everything the rows refer to with one query per table
+    startup_ids, user_ids, names = set(), set(), set()
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        if str(row.get('startup', '')).isdigit():
+            startup_ids.add(int(row['startup']))
+        if str(row.get('user', '')).isdigit():
+            user_ids.add(int(row['user']))
+        elif row.get('member_name') or row.get('team_leader_name'):
+            names.add(row.get('member_name') or row.get('team_leader_name'))
+
+    startups = Startup.objects.in_bulk(startup_ids)
+    users_by_id, users_by_name = {}, {}
+    for user in User.objects.filter(Q(id__in=user_ids) | Q(full_name__in=names)):
+        users_by_id[user.id] = user
+        users_by_name.setdefault(user.full_name, []).append(user)
+
+    member_of, leader_of = {}, {}
+    existing = TeamMember.objects.filter(
+        Q(user__in=users_by_id.values()) | Q(startup_id__in=startup_ids, role_in_team='Team Leader')
+    ).select_related('startup', 'user')
+    for member in existing:
+        member_of[member.user_id] = member.startup.name
+        if member.role_in_team == 'Team Leader':
+            leader_of[member.startup_id] = member.user.full_name
+
+    results, to_create = [], []
+    for index, row in enumerate(rows):
+        error = None
+        user = startup = None
+        if not isinstance(row, dict):
+            error = ('Each member must be an object', 'invalid_row')
+        else:
+            startup = startups.get(int(row['startup'])) if str(row.get('startup', '')).isdigit() else None
+            name = row.get('member_name') or row.get('team_leader_name')
+            if startup is None:
+                error = (f"Startup with ID {row.get('startup')} not found", 'startup_not_found')
+            elif str(row.get('user', '')).isdigit():
+                user = users_by_id.get(int(row['user']))
+                if user is None:
+                    error = (f"User with ID {row['user']} not found", 'user_not_found')
+            elif name:
+                matches = users_by_name.get(name, [])
+                if not matches:
+                    error = (f"User with name '{name}' not found", 'user_not_found')
+                elif len(matches) > 1:
+                    error = (f"Multiple users with name '{name}' found", 'multiple_users_found')
+                else:
+                    user = matches[0]
+            else:
+                error = ("User ID is required", 'user_required')
+
+        if error is None:
+            is_team_leader = row.get('role_in_team') == 'Team Leader'
+            if not row.get('role_in_team'):
+                error = ("role_in_team is required", 'role_in_team_required')
+            elif (role_error := role_in_team_error(row['role_in_team'])) is not None:
+                error = (role_error, 'invalid_role_in_team')
+            elif get_role_name(user.role_id) != 'student':
+                error = (
+                    f"Team members must be students, but {user.full_name} has role {get_role_name(user.role_id)}",
+                    'not_student'
+                )
+            elif user.id in member_of:
+                error = (f"{user.full_name} is already a member of {member_of[user.id]}", 'already_team_member')
+            elif is_team_leader and startup.id in leader_of:
+                error = (f"{startup.name} already has a team leader: {leader_of[startup.id]}", 'startup_has_leader')
+
+        if error is not None:
+            results.append({'index': index, 'error': error[0], 'code': error[1]})
+            continue
+
+        # Later rows of the same batch see this one
+        member_of[user.id] = startup.name
+        if is_team_leader:
+            leader_of[startup.id] = user.full_name
+        to_create.append(TeamMember(startup=startup, user=user, role_in_team=row['role_in_team']))
+        results.append({'index': index, 'error': None})
+
+    if any(result['error'] for result in results):
+        return Response(
+            {'created': 0, 'results': [result for result in results if result['error']]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        with transaction.atomic():
+            created = TeamMember.objects.bulk_create(to_create)
+    except IntegrityError:
+        return error_response(
+            'The roster conflicts with a membership added concurrently, please retry',
+            'roster_conflict',
+            status.HTTP_409_CONFLICT
+        )
+    # bulk_create sends no post_save signals
+    bump_model_version(TeamMember)
+
+    return Response(
+        {'created': len(created), 'results': TeamMemberSerializer(created, many=True).data},
+        status=status.HTTP_201_CREATED
+    )
+
 @api_view(['DELETE'])
 #@authentication_classes([JWTAuthentication])
 #@permission_classes([IsAuthenticated])
@@ -455,11 +640,11 @@ def remove_team_member(request, startup_id, member_id):
 @authentication_classes([])
 @permission_classes([AllowAny])
 @throttle_classes([BurstRateThrottle])
+@conditional_on(Application)
 def applications_list(request):
     if request.method == 'GET':
         applications = Application.objects.all()
-        serializer = ApplicationSerializer(applications, many=True)
-        return Response(serializer.data)
+        return list_response(request, applications, ApplicationSerializer)
     elif request.method == 'POST':
         serializer = ApplicationSerializer(data=request.data)
         if serializer.is_valid():
@@ -470,6 +655,7 @@ def applications_list(request):
 @api_view(['GET', 'PUT', 'DELETE'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+@conditional_on(Application)
 def application_detail(request, id):
     try:
         application = Application.objects.get(id=id)
@@ -522,14 +708,21 @@ def application_average_score(request, id):
 def application_votes(request, id):
     if request.method == 'GET':
         votes = ApplicationVote.objects.filter(application_id=id)
-        serializer = ApplicationVoteSerializer(votes, many=True)
-        return Response(serializer.data)
+        return list_response(request, votes, ApplicationVoteSerializer)
     elif request.method == 'POST':
         data = request.data.copy()
         data['application'] = id
         serializer = ApplicationVoteSerializer(data=data)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                with transaction.atomic():
+                    serializer.save()
+            except IntegrityError:
+                # A concurrent submission won the race past the validator
+                return Response(
+                    {'non_field_errors': ['User can vote only once per application.']},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -539,17 +732,204 @@ def application_votes(request, id):
 def application_scores(request, id):
     if request.method == 'GET':
         scores = ApplicationScore.objects.filter(application_id=id)
-        serializer = ApplicationScoreSerializer(scores, many=True)
-        return Response(serializer.data)
+        return list_response(request, scores, ApplicationScoreSerializer)
     elif request.method == 'POST':
         data = request.data.copy()
         data['application'] = id
         serializer = ApplicationScoreSerializer(data=data)
         if serializer.is_valid():
-            score_obj = serializer.save()
+            try:
+                with transaction.atomic():
+                    score_obj = serializer.save()
+            except IntegrityError:
+                # A concurrent submission won the race past the validator
+                return Response(
+                    {'non_field_errors': ['User can score only once per application.']},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             return Response(ApplicationScoreSerializer(score_obj).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def application_reviews_bulk(request):
+    """
+    Submit the scores and votes of a jury session in one request.
+
+    Expects {"reviews": [{"application": id, "user": id, "score": number,
+    "vote": bool}, ...]} where each row has a score, a vote or both. Rows are
+    upserted on (application, user) in one transaction, so submitting the
+    same session again updates the rows instead of failing. If any row is
+    invalid nothing is written and the errors are reported per row.
+    """
+    rows = request.data.get('reviews')
+    if not isinstance(rows, list) or not rows:
+        return error_response('A non-empty "reviews" list is required', 'reviews_required', status.HTTP_400_BAD_REQUEST)
+
+    parsed = [ApplicationReviewRowSerializer(data=row) if isinstance(row, dict) else None for row in rows]
+    valid = [serializer.validated_data for serializer in parsed if serializer is not None and serializer.is_valid()]
+
+    # Load everything the rows refer to with one query per table
+    application_ids = set(Application.objects.filter(
+        id__in={row['application'] for row in valid}
+    ).values_list('id', flat=True))
+    user_ids = set(User.objects.filter(id__in={row['user'] for row in valid}).values_list('id', flat=True))
+    pairs = {(row['application'], row['user']) for row in valid}
+    existing_scores = set(ApplicationScore.objects.filter(
+        application_id__in={application for application, _ in pairs}, user_id__in={user for _, user in pairs}
+    ).values_list('application_id', 'user_id'))
+    existing_votes = set(ApplicationVote.objects.filter(
+        application_id__in={application for application, _ in pairs}, user_id__in={user for _, user in pairs}
+    ).values_list('application_id', 'user_id'))
+
+    results, scores, votes, seen = [], [], [], set()
+    for index, serializer in enumerate(parsed):
+        if serializer is None:
+            results.append({'index': index, 'error': 'Each review must be an object', 'code': 'invalid_row'})
+            continue
+        if serializer.errors:
+            field, messages = next(iter(serializer.errors.items()))
+            message = messages[0] if field == 'non_field_errors' else f"{field}: {messages[0]}"
+            results.append({'index': index, 'error': message, 'code': 'invalid_row'})
+            continue
+
+        row = serializer.validated_data
+        pair = (row['application'], row['user'])
+        if row['application'] not in application_ids:
+            error = (f"Application with ID {row['application']} not found", 'application_not_found')
+        elif row['user'] not in user_ids:
+            error = (f"User with ID {row['user']} not found", 'user_not_found')
+        elif pair in seen:
+            # One statement can't upsert the same row twice
+            error = (f"User {row['user']} is reviewed twice for application {row['application']}", 'duplicate_review')
+        else:
+            error = None
+        if error is not None:
+            results.append({'index': index, 'error': error[0], 'code': error[1]})
+            continue
+
+        seen.add(pair)
+        result = {'index': index, 'error': None, 'application': row['application'], 'user': row['user']}
+        if 'score' in row:
+            scores.append(ApplicationScore(application_id=pair[0], user_id=pair[1], score=row['score']))
+            result['score'] = 'updated' if pair in existing_scores else 'created'
+        if 'vote' in row:
+            votes.append(ApplicationVote(application_id=pair[0], user_id=pair[1], vote=row['vote']))
+            result['vote'] = 'updated' if pair in existing_votes else 'created'
+        results.append(result)
+
+    if any(result['error'] for result in results):
+        return Response(
+            {'scores': 0, 'votes': 0, 'results': [result for result in results if result['error']]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    with transaction.atomic():
+        ApplicationScore.objects.bulk_create(
+            scores, update_conflicts=True,
+            unique_fields=['application', 'user'], update_fields=['score', 'scored_at']
+        )
+        ApplicationVote.objects.bulk_create(
+            votes, update_conflicts=True,
+            unique_fields=['application', 'user'], update_fields=['vote', 'voted_at']
+        )
+    # bulk_create sends no post_save signals
+    bump_version('application_ranking')
+    bump_model_version(ApplicationScore)
+    bump_model_version(ApplicationVote)
+
+    return Response({'scores': len(scores), 'votes': len(votes), 'results': results})
+
+RANKING_ORDERINGS = ('rank', 'mean_score', 'median_score', 'score_count', 'yes_votes', 'no_votes', 'submitted_at')
+RANKING_CACHE_TIMEOUT = 60 * 15
+
+def _vote_count(vote):
+    votes = ApplicationVote.objects.filter(application=OuterRef('pk'), vote=vote).values('application')
+    return Coalesce(Subquery(votes.annotate(total=Count('id')).values('total')), 0)
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def application_ranking(request):
+    """
+    Rank applications by their scores and votes.
+
+    Each application gets its mean and median score, score count, yes/no
+    vote tallies, a combined score (mean score weighted by the smoothed
+    share of yes votes) and its rank on the combined score. ?ordering= is
+    one of RANKING_ORDERINGS, optionally prefixed with '-', ?status= filters
+    on the application status. Each page is a single aggregate query and
+    is cached until a score, vote or application is written.
+    """
+    ordering = request.query_params.get('ordering', 'rank')
+    if ordering.lstrip('-') not in RANKING_ORDERINGS:
+        return error_response(
+            f"ordering must be one of {', '.join(RANKING_ORDERINGS)}", 'invalid_ordering', status.HTTP_400_BAD_REQUEST
+        )
+    application_status = request.query_params.get('status')
+    try:
+        page = max(1, int(request.query_params.get('page', 1)))
+        page_size = min(100, max(1, int(request.query_params.get('page_size', 20))))
+    except ValueError:
+        return error_response('page and page_size must be integers', 'invalid_page', status.HTTP_400_BAD_REQUEST)
+
+    cache_key = 'application_ranking:{}:{}:{}:{}:{}'.format(
+        get_version('application_ranking'), ordering, application_status, page, page_size
+    )
+    data = cache.get(cache_key)
+    if data is None:
+        applications = Application.objects.all()
+        if application_status:
+            applications = applications.filter(status=application_status)
+        applications = applications.annotate(
+            mean_score=Avg('applicationscore__score'),
+            median_score=Median('applicationscore__score'),
+            score_count=Count('applicationscore'),
+            yes_votes=_vote_count(True),
+            no_votes=_vote_count(False),
+        ).annotate(
+            combined_score=ExpressionWrapper(
+                Coalesce(Cast('mean_score', FloatField()), 0.0)
+                * (F('yes_votes') + 1.0) / (F('yes_votes') + F('no_votes') + 2.0),
+                output_field=FloatField()
+            )
+        ).annotate(
+            rank=Window(expression=Rank(), order_by=F('combined_score').desc())
+        )
+        # Break ties on the id so pages never overlap
+        if ordering.lstrip('-') == 'rank':
+            order_by = [ordering, 'id']
+        else:
+            direction = '-' if ordering.startswith('-') else ''
+            order_by = [F(ordering.lstrip('-')).desc(nulls_last=True) if direction else F(ordering).asc(nulls_last=True), 'id']
+        rows = applications.order_by(*order_by)[(page - 1) * page_size:page * page_size + 1]
+
+        results = [
+            {
+                'id': application.id,
+                'startup': application.startup_id,
+                'status': application.status,
+                'submitted_at': application.submitted_at,
+                'mean_score': round(float(application.mean_score), 2) if application.mean_score is not None else None,
+                'median_score': round(application.median_score, 2) if application.median_score is not None else None,
+                'score_count': application.score_count,
+                'yes_votes': application.yes_votes,
+                'no_votes': application.no_votes,
+                'combined_score': round(application.combined_score, 4),
+                'rank': application.rank,
+            }
+            for application in rows
+        ]
+        data = {
+            'page': page,
+            'next': page + 1 if len(results) > page_size else None,
+            'previous': page - 1 if page > 1 else None,
+            'results': results[:page_size],
+        }
+        cache.set(cache_key, data, RANKING_CACHE_TIMEOUT)
+    return Response(data)
+
 # -------------------------------
 # STAGES
 # -------------------------------
@@ -557,10 +937,13 @@ def application_scores(request, id):
 @api_view(['GET', 'POST'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+@conditional_on(Stage)
+@cache_response(Stage)
 def stages_list(request):
     if request.method == 'GET':
-        stages = Stage.objects.all()
-        serializer = StageSerializer(stages, many=True)
+        if wants_keyset_pagination(request):
+            return keyset_paginated_response(request, Stage.objects.all(), StageSerializer)
+        serializer = StageSerializer(get_stages(), many=True)
         return Response(serializer.data)
     elif request.method == 'POST':
         serializer = StageSerializer(data=request.data)
@@ -572,15 +955,19 @@ def stages_list(request):
 @api_view(['GET', 'PUT', 'DELETE'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+@conditional_on(Stage)
 def stage_detail(request, id):
+    if request.method == 'GET':
+        stage = get_stage(id)
+        if stage is None:
+            return error_response('Stage not found', 'stage_not_found', status.HTTP_404_NOT_FOUND)
+        serializer = StageSerializer(stage)
+        return Response(serializer.data)
     try:
         stage = Stage.objects.get(id=id)
     except Stage.DoesNotExist:
         return error_response('Stage not found', 'stage_not_found', status.HTTP_404_NOT_FOUND)
-    if request.method == 'GET':
-        serializer = StageSerializer(stage)
-        return Response(serializer.data)
-    elif request.method == 'PUT':
+    if request.method == 'PUT':
         serializer = StageSerializer(stage, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -595,13 +982,13 @@ def stage_detail(request, id):
 # -------------------------------
 
 @api_view(['GET', 'POST'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_on(Deliverable)
 def deliverables_list(request):
     if request.method == 'GET':
         deliverables = Deliverable.objects.all()
-        serializer = DeliverableSerializer(deliverables, many=True)
-        return Response(serializer.data)
+        return list_response(request, deliverables, DeliverableSerializer)
     elif request.method == 'POST':
         serializer = DeliverableSerializer(data=request.data)
         if serializer.is_valid():
@@ -610,8 +997,9 @@ def deliverables_list(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_on(Deliverable)
 def deliverable_detail(request, id):
     try:
         deliverable = Deliverable.objects.get(id=id)
@@ -631,7 +1019,7 @@ def deliverable_detail(request, id):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 @api_view(['POST'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def evaluate_deliverable(request, id):
     data = request.data.copy()
@@ -643,12 +1031,11 @@ def evaluate_deliverable(request, id):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def deliverable_evaluations(request, id):
     evaluations = DeliverableEvaluation.objects.filter(deliverable=id)
-    serializer = DeliverableEvaluationSerializer(evaluations, many=True)
-    return Response(serializer.data)
+    return list_response(request, evaluations, DeliverableEvaluationSerializer)
 
 # -------------------------------
 # RESOURCE MANAGEMENT
@@ -724,13 +1111,48 @@ def resource_allocations_list(request):
 # EVENTS
 # -------------------------------
 
+def booking_conflicts(serializer):
+    """
+    Lock the trainer and the location of a validated event and return the
+    events it would overlap. Call inside the transaction that saves it.
+    """
+    data, event = serializer.validated_data, serializer.instance
+    def value(field):
+        return data[field] if field in data else getattr(event, field)
+    user = value('user')
+    user_id = user.id if user is not None else None
+    scheduling.lock_resources(user_id, value('location'))
+    return scheduling.conflicting_events(
+        value('start_time'), value('end_time'), user_id, value('location'),
+        exclude_id=event.id if event is not None else None
+    )
+
+def conflict_data(event, reasons):
+    return {
+        'event': event.id,
+        'title': event.title,
+        'start_time': event.start_time,
+        'end_time': event.end_time,
+        'location': event.location,
+        'user': event.user_id,
+        'reasons': reasons,
+    }
+
+def event_conflict_response(conflicts):
+    return Response({
+        'error': 'The event overlaps existing bookings of its trainer or location',
+        'code': 'event_conflict',
+        'conflicts': [conflict_data(event, event.conflict_reasons) for event in conflicts],
+    }, status=status.HTTP_409_CONFLICT)
+
 @api_view(['GET', 'POST'])
 # @permission_classes([])  # Allow all requests without authentication
+@conditional_on(Event)
+@cache_response(Event)
 def events_list(request):
     if request.method == 'GET':
         events = Event.objects.all()
-        serializer = EventSerializer(events, many=True)
-        return Response(serializer.data)
+        return list_response(request, events, EventSerializer)
     elif request.method == 'POST':
         # Check if the user exists
         user_id = request.data.get('user')
@@ -745,7 +1167,11 @@ def events_list(request):
         
         serializer = EventSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                conflicts = booking_conflicts(serializer)
+                if conflicts:
+                    return event_conflict_response(conflicts)
+                serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -753,6 +1179,7 @@ def events_list(request):
 # Remove authentication for event detail view
 @authentication_classes([])
 @permission_classes([AllowAny])
+@conditional_on(Event)
 def event_detail(request, id):
     """
     Get, update or delete an event
@@ -776,7 +1203,11 @@ def event_detail(request, id):
         
         serializer = EventSerializer(event, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                conflicts = booking_conflicts(serializer)
+                if conflicts:
+                    return event_conflict_response(conflicts)
+                serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -787,18 +1218,179 @@ def event_detail(request, id):
         
         event.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+# Most slots checked in one request
+SLOT_CHECK_MAX = 500
+
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def check_event_slots(request):
+    """
+    Check up to SLOT_CHECK_MAX proposed slots, {"slots": [{start_time,
+    end_time, user, location}, ...]}, against the existing events and
+    against each other, without booking anything. All slots are checked
+    with one query and a single sweep over the sorted slots and bookings.
+    """
+    slots = request.data.get('slots')
+    if not isinstance(slots, list) or not slots:
+        return error_response('slots must be a non-empty list', 'invalid_slots', status.HTTP_400_BAD_REQUEST)
+    if len(slots) > SLOT_CHECK_MAX:
+        return error_response(
+            f"At most {SLOT_CHECK_MAX} slots can be checked at once", 'too_many_slots', status.HTTP_400_BAD_REQUEST
+        )
+
+    valid, errors = [], []
+    for index, slot in enumerate(slots):
+        serializer = EventSlotSerializer(data=slot) if isinstance(slot, dict) else None
+        if serializer is None:
+            errors.append({'index': index, 'error': 'Each slot must be an object', 'code': 'invalid_slot'})
+        elif not serializer.is_valid():
+            field, messages = next(iter(serializer.errors.items()))
+            message = messages[0] if field == 'non_field_errors' else f"{field}: {messages[0]}"
+            errors.append({'index': index, 'error': message, 'code': 'invalid_slot'})
+        else:
+            valid.append(serializer.validated_data)
+    if errors:
+        return Response({'results': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = [
+        {
+            'index': index,
+            'available': not events and not overlapping_slots,
+            'conflicts': [conflict_data(event, reasons) for event, reasons in events],
+            'overlapping_slots': overlapping_slots,
+        }
+        for index, (events, overlapping_slots) in enumerate(scheduling.check_slots(valid))
+    ]
+    return Response({'results': results})
+
+# Longest window a calendar query may cover
+CALENDAR_MAX_RANGE = timedelta(days=366)
+# Events starting this long before the window that still run into it are
+# included, longer events are only listed from the window they start in.
+# Bounding the lookback keeps the query a range scan on start_time.
+CALENDAR_OVERLAP = timedelta(days=1)
+# Window of the .ics feed when the client gives none
+ICS_DEFAULT_PAST = timedelta(days=30)
+ICS_DEFAULT_FUTURE = timedelta(days=180)
+
+def calendar_events(request, default_range=None):
+    """
+    Events overlapping [?from, ?to), optionally for one ?user or
+    ?location, ordered by start time. Without from/to, default_range
+    (start, end) is used if given. Returns the queryset and an error
+    response.
+    """
+    bounds = []
+    for param in ('from', 'to'):
+        value = request.query_params.get(param)
+        if not value:
+            if default_range is None:
+                return None, error_response(f"'{param}' is required", 'missing_date', status.HTTP_400_BAD_REQUEST)
+            bounds.append(default_range[len(bounds)])
+            continue
+        parsed = parse_query_datetime(value, end_of_day=param == 'to')
+        if parsed is None:
+            return None, error_response(f"Invalid '{param}' date: {value}", 'invalid_date', status.HTTP_400_BAD_REQUEST)
+        bounds.append(parsed)
+    start, end = bounds
+    if end <= start:
+        return None, error_response("'to' must be after 'from'", 'invalid_range', status.HTTP_400_BAD_REQUEST)
+    if end - start > CALENDAR_MAX_RANGE:
+        return None, error_response(
+            f"The range is limited to {CALENDAR_MAX_RANGE.days} days", 'range_too_large', status.HTTP_400_BAD_REQUEST
+        )
+
+    # Range scans on (start_time, ...), (user, start_time) or (location, start_time)
+    events = Event.objects.filter(
+        start_time__gte=start - CALENDAR_OVERLAP, start_time__lt=end, end_time__gt=start
+    )
+    user_id = request.query_params.get('user')
+    if user_id:
+        if not user_id.isdigit():
+            return None, error_response('user must be a user id', 'invalid_user', status.HTTP_400_BAD_REQUEST)
+        events = events.filter(user_id=int(user_id))
+    location = request.query_params.get('location')
+    if location:
+        events = events.filter(location=location)
+    return events.order_by('start_time', 'id'), None
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@conditional_on(Event)
+@cache_response(Event)
+def events_calendar(request):
+    """
+    Events overlapping the ?from= / ?to= window (dates or datetimes, at
+    most CALENDAR_MAX_RANGE apart), filtered by ?user= and ?location=.
+    """
+    events, error = calendar_events(request)
+    if error:
+        return error
+    serializer = EventSerializer(events, many=True)
+    return Response(serializer.data)
+
+def ics_default_range():
+    # Whole days, so the feed and its ETag only move once a day
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+    return today - ICS_DEFAULT_PAST, today + timedelta(days=1) + ICS_DEFAULT_FUTURE
+
+def ics_feed_window(request):
+    if request.GET.get('from') and request.GET.get('to'):
+        return ''
+    return timezone.localdate().isoformat()
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+# The calendar name comes from the user, the default window from the date
+@conditional_on(Event, User, vary=ics_feed_window)
+def events_calendar_feed(request):
+    """
+    iCalendar feed of one trainer's (?user=) or one location's
+    (?location=) events, for calendar clients to subscribe to. Covers
+    ICS_DEFAULT_PAST before to ICS_DEFAULT_FUTURE after today unless
+    ?from= and ?to= are given. Events are streamed from a server-side
+    cursor.
+    """
+    user_id, location = request.query_params.get('user'), request.query_params.get('location')
+    if not user_id and not location:
+        return error_response('Give a user or a location', 'missing_filter', status.HTTP_400_BAD_REQUEST)
+
+    events, error = calendar_events(request, default_range=ics_default_range())
+    if error:
+        return error
+
+    if user_id:
+        full_name = User.objects.filter(id=user_id).values_list('full_name', flat=True).first()
+        if full_name is None:
+            return error_response('User not found', 'user_not_found', status.HTTP_404_NOT_FOUND)
+        name = full_name if not location else f"{full_name} - {location}"
+    else:
+        name = location
+
+    rows = events.only('id', 'title', 'description', 'start_time', 'end_time', 'location').iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+    response = StreamingHttpResponse(
+        ical_lines(rows, name, request.get_host().split(':')[0]), content_type='text/calendar; charset=utf-8'
+    )
+    response['Content-Disposition'] = 'inline; filename="events.ics"'
+    return response
+
 # -------------------------------
 # JURY EVALUATIONS
 # -------------------------------
 
 @api_view(['GET', 'POST'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def jury_evaluations_list(request):
     if request.method == 'GET':
         evaluations = JuryEvaluation.objects.all()
-        serializer = JuryEvaluationSerializer(evaluations, many=True)
-        return Response(serializer.data)
+        return list_response(request, evaluations, JuryEvaluationSerializer)
     elif request.method == 'POST':
         serializer = JuryEvaluationSerializer(data=request.data)
         if serializer.is_valid():
@@ -807,7 +1399,7 @@ def jury_evaluations_list(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def jury_evaluation_detail(request, id):
     try:
@@ -822,7 +1414,7 @@ def jury_evaluation_detail(request, id):
 # -------------------------------
 
 @api_view(['POST'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def upload_file(request):
     serializer = FileMetadataSerializer(data=request.data)
@@ -832,15 +1424,14 @@ def upload_file(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def list_files(request):
     files = FileMetadata.objects.all()
-    serializer = FileMetadataSerializer(files, many=True)
-    return Response(serializer.data)
+    return list_response(request, files, FileMetadataSerializer)
 
 @api_view(['GET'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def file_detail(request, id):
     try:
@@ -855,15 +1446,25 @@ def file_detail(request, id):
 # -------------------------------
 
 @api_view(['GET'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def notifications_list(request):
     notifications = Notification.objects.filter(user=request.user)
-    serializer = NotificationSerializer(notifications, many=True)
-    return Response(serializer.data)
+    return list_response(request, notifications, NotificationSerializer)
+
+@api_view(['GET'])
+@authentication_classes([UserJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def notifications_unread_count(request):
+    """
+    Number of unread notifications of the current user, read from the
+    maintained counter. ASGI deployments also push it on
+    /notifications/stream/ (see notification_stream.py).
+    """
+    return Response({'unread': NotificationCounter.get_unread(request.user.id)})
 
 @api_view(['PUT'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def mark_notification_read(request, id):
     try:
@@ -875,7 +1476,7 @@ def mark_notification_read(request, id):
     return Response({'message': 'Notification marked as read'})
 
 @api_view(['DELETE'])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def delete_notification(request, id):
     try:
@@ -885,28 +1486,121 @@ def delete_notification(request, id):
     note.delete()
     return Response({'message': 'Notification deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
 
+@api_view(['POST'])
+@authentication_classes([UserJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def notifications_mark_read(request):
+    """
+    Mark the current user's notifications as read: all of them for an
+    empty body, or those matching {"ids": [...]} and/or {"before":
+    "<datetime>"}. One UPDATE whatever the number of notifications.
+    """
+    serializer = NotificationBulkSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+    updated = notifications.mark_read(request.user, ids=data.get('ids'), before=data.get('before'))
+    return Response({'updated': updated, 'unread': NotificationCounter.get_unread(request.user.id)})
+
+@api_view(['POST'])
+@authentication_classes([UserJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def notifications_bulk_delete(request):
+    """
+    Delete the current user's notifications listed in {"ids": [...]}.
+    Ids of other users' notifications are ignored.
+    """
+    serializer = NotificationBulkSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    ids = serializer.validated_data.get('ids')
+    if ids is None:
+        return error_response('ids is required', 'ids_required', status.HTTP_400_BAD_REQUEST)
+    deleted = notifications.delete(request.user, ids)
+    return Response({'deleted': deleted, 'unread': NotificationCounter.get_unread(request.user.id)})
+
+@api_view(['POST'])
+@authentication_classes([UserJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def notifications_fan_out(request):
+    """
+    Send one notification to every user of an audience, e.g.
+    {"type": "announcement", "message": "...", "audience": {"role": "student"}}
+    or {"audience": {"stage": 2, "startup_status": "approved"}}. See
+    notifications.py for the audience criteria. Returns the number of
+    notifications created.
+    """
+    if not is_admin(request.user):
+        return error_response('Admin required', 'admin_required', status.HTTP_403_FORBIDDEN)
+    serializer = NotificationFanOutSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+    try:
+        user_ids = notifications.resolve_audience(data['audience'])
+    except notifications.AudienceError as e:
+        return error_response(str(e), 'invalid_audience', status.HTTP_400_BAD_REQUEST)
+    created = notifications.fan_out(user_ids, data['type'], data['message'])
+    return Response({'created': created}, status=status.HTTP_201_CREATED)
+
 # -------------------------------
 # INCUBATION FORM
 # -------------------------------
 
+INCUBATION_FORM_ORDERINGS = ('created_at', 'total_score')
+
+def filter_incubation_forms_by_score(request, forms):
+    """
+    Apply ?min_score= and ?max_score= on the stored total score and
+    ?ordering= (one of INCUBATION_FORM_ORDERINGS, optionally prefixed with
+    '-') to an incubation form queryset. Returns the queryset, the ordering
+    for keyset pagination (None for the default) and an error response.
+    """
+    for param, lookup in (('min_score', 'total_score__gte'), ('max_score', 'total_score__lte')):
+        value = request.query_params.get(param)
+        if value in (None, ''):
+            continue
+        try:
+            forms = forms.filter(**{lookup: float(value)})
+        except ValueError:
+            return None, None, error_response(f"{param} must be a number", 'invalid_score', status.HTTP_400_BAD_REQUEST)
+
+    ordering = request.query_params.get('ordering')
+    if not ordering:
+        return forms, None, None
+    if ordering.lstrip('-') not in INCUBATION_FORM_ORDERINGS:
+        return None, None, error_response(
+            f"ordering must be one of {', '.join(INCUBATION_FORM_ORDERINGS)}", 'invalid_ordering', status.HTTP_400_BAD_REQUEST
+        )
+    # Break ties on the id in the same direction, which the score indexes cover.
+    # Cursors only encode the first key: with ?pagination=cursor, pages
+    # inside a run of equal scores (e.g. unscored forms) are reached with an
+    # OFFSET into the run, so they cost more the longer the run is. Use the
+    # default or created_at ordering to walk every form at a constant cost.
+    ordering = (ordering, '-id' if ordering.startswith('-') else 'id')
+    return forms.order_by(*ordering), ordering, None
+
 @api_view(['GET', 'POST'])
-@authentication_classes([])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([AllowAny])
+@conditional_on(IncubationForm)
 def incubation_forms_list(request):
     if request.method == 'GET':
-        incubation_forms = IncubationForm.objects.all()
-        serializer = IncubationFormListSerializer(incubation_forms, many=True)
-        return Response(serializer.data)
+        incubation_forms, ordering, error = filter_incubation_forms_by_score(request, IncubationForm.objects.all())
+        if error:
+            return error
+        return list_response(request, incubation_forms, IncubationFormListSerializer, ordering)
     elif request.method == 'POST':
-        serializer = IncubationFormSerializer(data=request.data)
+        serializer = IncubationFormSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save(status='pending')
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@authentication_classes([])
+@authentication_classes([UserJWTAuthentication])
 @permission_classes([AllowAny])
+@conditional_on(IncubationForm)
 def incubation_form_detail(request, id):
     try:
         incubation_form = IncubationForm.objects.get(id=id)
@@ -919,7 +1613,7 @@ def incubation_form_detail(request, id):
     elif request.method == 'PUT':
         # if not is_admin(request.user):
         #     return error_response('Admin required', 'admin_required', status.HTTP_403_FORBIDDEN)
-        serializer = IncubationFormSerializer(incubation_form, data=request.data, partial=True)
+        serializer = IncubationFormSerializer(incubation_form, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -958,22 +1652,97 @@ def incubation_form_status_update(request, id):
 @authentication_classes([])
 @permission_classes([AllowAny])
 def pending_incubation_forms(request):
-    pending_forms = IncubationForm.objects.filter(status='pending')
+    pending_forms, ordering, error = filter_incubation_forms_by_score(
+        request, IncubationForm.objects.filter(status='pending')
+    )
+    if error:
+        return error
+    if wants_keyset_pagination(request):
+        return keyset_paginated_response(request, pending_forms, IncubationFormListSerializer, ordering)
     paginator = StandardPagination()
     page = paginator.paginate_queryset(pending_forms, request)
     serializer = IncubationFormListSerializer(page, many=True)
     return paginator.get_paginated_response(serializer.data)
 
-@api_view(['POST'])
+class Echo:
+    """
+    Pseudo-buffer for csv.writer that hands each row back instead of storing it.
+    """
+    def write(self, value):
+        return value
+
+EXPORT_CHUNK_SIZE = 500
+
+@api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+def export_incubation_forms(request):
+    """
+    Stream incubation forms as CSV (default) or NDJSON with ?output=ndjson.
+
+    Filters: ?status=pending,approved, ?from= and ?to= (date or datetime on
+    created_at) and ?fields= (comma separated, defaults to every field).
+    Rows are read through a server-side cursor and written out as they
+    arrive, so memory use does not grow with the number of forms.
+    """
+    output = request.query_params.get('output', 'csv')
+    if output not in ('csv', 'ndjson'):
+        return error_response('output must be csv or ndjson', 'invalid_output', status.HTTP_400_BAD_REQUEST)
+
+    allowed_fields = IncubationFormDetailSerializer.Meta.fields
+    fields = [field for field in request.query_params.get('fields', '').split(',') if field]
+    unknown = [field for field in fields if field not in allowed_fields]
+    if unknown:
+        return error_response(f"Unknown fields: {', '.join(unknown)}", 'invalid_fields', status.HTTP_400_BAD_REQUEST)
+    fields = fields or list(allowed_fields)
+
+    forms = IncubationForm.objects.order_by('id')
+    statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+    if statuses:
+        forms = forms.filter(status__in=statuses)
+    for param, lookup in (('from', 'created_at__gte'), ('to', 'created_at__lte')):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+        parsed = parse_query_datetime(value, end_of_day=param == 'to')
+        if parsed is None:
+            return error_response(f"Invalid '{param}' date: {value}", 'invalid_date', status.HTTP_400_BAD_REQUEST)
+        forms = forms.filter(**{lookup: parsed})
+
+    rows = forms.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    def as_text(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    if output == 'csv':
+        writer = csv.writer(Echo())
+        def stream():
+            yield writer.writerow(fields)
+            for row in rows:
+                yield writer.writerow([as_text(value) for value in row])
+        content_type, extension = 'text/csv', 'csv'
+    else:
+        def stream():
+            for row in rows:
+                yield json.dumps(dict(zip(fields, map(as_text, row)))) + '\n'
+        content_type, extension = 'application/x-ndjson', 'ndjson'
+
+    response = StreamingHttpResponse(stream(), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="incubation-forms.{extension}"'
+    return response
+
+@api_view(['POST'])
+@authentication_classes([UserJWTAuthentication])
+@permission_classes([AllowAny])
 def my_incubation_submissions(request):
     try:
         # Add the authenticated user to the data before validation
         data = request.data.copy()
         # data['user'] = request.user.id  # Associate the form with the authenticated user
         
-        serializer = IncubationFormSerializer(data=data)
+        serializer = IncubationFormSerializer(data=data, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(
@@ -988,8 +1757,123 @@ def my_incubation_submissions(request):
         )
 
 
+# -------------------------------
+# INCUBATION DOCUMENT UPLOADS
+# -------------------------------
+
+@api_view(['POST'])
+@authentication_classes([UserJWTAuthentication])
+@permission_classes([AllowAny])
+def document_uploads(request):
+    """
+    Start a chunked upload of supporting documents with the file's name,
+    its size in bytes and optionally its SHA-256, checked on completion.
+
+    The upload belongs to the authenticated user. An anonymous upload comes
+    with a token instead, which later requests send in the Upload-Token
+    header.
+    """
+    serializer = DocumentUploadSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    upload = serializer.save(uploaded_by=request.user if request.user.is_authenticated else None)
+    uploads.start(upload)
+    data = DocumentUploadSerializer(upload).data
+    if upload.uploaded_by is None:
+        data['token'] = uploads.issue_token(upload)
+    response = Response(data, status=status.HTTP_201_CREATED)
+    response['Upload-Offset'] = upload.received
+    return response
+
+@api_view(['GET', 'PUT'])
+@authentication_classes([UserJWTAuthentication])
+@permission_classes([AllowAny])
+def document_upload_detail(request, upload_id):
+    """
+    GET returns the upload's offset, where the next chunk starts.
+
+    PUT appends the raw request body at the offset given in the
+    Upload-Offset header, which must match the upload's offset. The body is
+    streamed to disk, not buffered. When the last byte arrives the upload is
+    hashed and completed, and its id can be sent as
+    supporting_documents_upload with the incubation form.
+
+    Someone else's upload is not found.
+    """
+    try:
+        upload = uploads.accessible(request).get(id=upload_id)
+    except DocumentUpload.DoesNotExist:
+        return error_response('Upload not found', 'upload_not_found', status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'PUT':
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length') or 0)
+        except ValueError:
+            return error_response(
+                'The Upload-Offset header must be an integer', 'invalid_offset', status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            uploads.write_chunk(upload, offset, request.stream, length)
+            if upload.received == upload.size:
+                uploads.complete(upload)
+        except uploads.UploadError as e:
+            response = error_response(
+                e.message, e.code,
+                status.HTTP_409_CONFLICT if e.code in ('offset_mismatch', 'upload_complete') else status.HTTP_400_BAD_REQUEST
+            )
+            response['Upload-Offset'] = upload.received
+            return response
+
+    response = Response(DocumentUploadSerializer(upload).data)
+    response['Upload-Offset'] = upload.received
+    return response
+
+# -------------------------------
+# SEARCH
+# -------------------------------
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def global_search(request):
+    """
+    Ranked full-text search over startups, incubation forms, users and events.
+
+    ?q= is the search text, ?type= optionally restricts the results to a
+    comma separated list of types. Results are paged with ?page= and
+    ?page_size= (at most 50) without counting the total.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return error_response('The q parameter is required', 'query_required', status.HTTP_400_BAD_REQUEST)
+    if not search.is_supported():
+        return error_response('Search is not available on this database', 'search_unavailable', status.HTTP_501_NOT_IMPLEMENTED)
+
+    types = [value for value in request.query_params.get('type', '').split(',') if value]
+    unknown = [value for value in types if value not in search.SEARCHABLE]
+    if unknown:
+        return error_response(f"Unknown types: {', '.join(unknown)}", 'invalid_type', status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page = max(1, int(request.query_params.get('page', 1)))
+        page_size = min(50, max(1, int(request.query_params.get('page_size', 20))))
+    except ValueError:
+        return error_response('page and page_size must be integers', 'invalid_page', status.HTTP_400_BAD_REQUEST)
+
+    # Fetch one extra hit to know whether there is a next page
+    hits = search.search(query, types, limit=page_size + 1, offset=(page - 1) * page_size)
+    has_next = len(hits) > page_size
+    return Response({
+        'query': query,
+        'page': page,
+        'next': page + 1 if has_next else None,
+        'previous': page - 1 if page > 1 else None,
+        'results': hits[:page_size],
+    })
+
 from .models import User, Role
-from .serializers import UserSerializer
+from .serializers import UserSerializer, MentorSerializer, TrainerSerializer
 from .utils import is_admin, error_response
 
 @api_view(['GET'])
@@ -998,13 +1882,11 @@ def mentors_list(request):
     """
     Get all users with the mentor role
     """
-    try:
-        mentor_role = Role.objects.get(name='mentor')
-        mentors = User.objects.filter(role=mentor_role)
-        serializer = UserSerializer(mentors, many=True)
-        return Response(serializer.data)
-    except Role.DoesNotExist:
+    mentor_role = get_role('mentor')
+    if mentor_role is None:
         return error_response('Mentor role not found', 'role_not_found', status.HTTP_404_NOT_FOUND)
+    mentors = MentorSerializer.setup_eager_loading(User.objects.filter(role_id=mentor_role.id)).order_by('id')
+    return list_response(request, mentors, MentorSerializer)
 
 @api_view(['GET'])
 #@permission_classes([])  # Allow all requests without authentication
@@ -1012,13 +1894,11 @@ def trainers_list(request):
     """
     Get all users with the trainer role
     """
-    try:
-        trainer_role = Role.objects.get(name='trainer')
-        trainers = User.objects.filter(role=trainer_role)
-        serializer = UserSerializer(trainers, many=True)
-        return Response(serializer.data)
-    except Role.DoesNotExist:
+    trainer_role = get_role('trainer')
+    if trainer_role is None:
         return error_response('Trainer role not found', 'role_not_found', status.HTTP_404_NOT_FOUND)
+    trainers = TrainerSerializer.setup_eager_loading(User.objects.filter(role_id=trainer_role.id)).order_by('id')
+    return list_response(request, trainers, TrainerSerializer)
 
 @api_view(['POST'])
 # TEMPORARY: Comment out authentication for development
@@ -1034,7 +1914,9 @@ def create_mentor(request):
     
     try:
         # Get the mentor role explicitly
-        mentor_role = Role.objects.get(name='mentor')
+        mentor_role = get_role('mentor')
+        if mentor_role is None:
+            return error_response('Mentor role not found in database.', 'role_not_found', status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         # Create a copy of the request data
         data = request.data.copy()
@@ -1051,8 +1933,6 @@ def create_mentor(request):
             return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-    except Role.DoesNotExist:
-        return error_response('Mentor role not found in database.', 'role_not_found', status.HTTP_500_INTERNAL_SERVER_ERROR)
     except Exception as e:
         # Log the exception for debugging
         import logging
@@ -1077,7 +1957,9 @@ def create_trainer(request):
     
     try:
         # Get the trainer role
-        trainer_role = Role.objects.get(name='trainer')
+        trainer_role = get_role('trainer')
+        if trainer_role is None:
+            return error_response('Trainer role not found', 'role_not_found', status.HTTP_404_NOT_FOUND)
         
         # Create a copy of the request data
         data = request.data.copy()
@@ -1095,8 +1977,6 @@ def create_trainer(request):
             
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-    except Role.DoesNotExist:
-        return error_response('Trainer role not found', 'role_not_found', status.HTTP_404_NOT_FOUND)
     except Exception as e:
         return Response(
             {'error': str(e)}, 
@@ -1112,16 +1992,18 @@ def mentor_detail(request, id):
     Get, update or delete a mentor
     """
     try:
-        try:
-            mentor_role = Role.objects.get(name='mentor')
-        except Role.DoesNotExist:
+        mentor_role = get_role('mentor')
+        if mentor_role is None:
             return Response(
                 {'error': 'Mentor role not found'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
             
         try:
-            mentor = User.objects.get(id=id, role=mentor_role)
+            mentors = User.objects.filter(role_id=mentor_role.id)
+            if request.method == 'GET':
+                mentors = MentorSerializer.setup_eager_loading(mentors)
+            mentor = mentors.get(id=id)
         except User.DoesNotExist:
             return Response(
                 {'error': 'Mentor not found'}, 
@@ -1129,7 +2011,7 @@ def mentor_detail(request, id):
             )
         
         if request.method == 'GET':
-            serializer = UserSerializer(mentor)
+            serializer = MentorSerializer(mentor)
             return Response(serializer.data)
         
         elif request.method == 'PUT':
@@ -1172,14 +2054,19 @@ def trainer_detail(request, id):
     Get, update or delete a trainer
     """
     try:
-        trainer_role = Role.objects.get(name='trainer')
+        trainer_role = get_role('trainer')
+        if trainer_role is None:
+            return error_response('Trainer role not found', 'role_not_found', status.HTTP_404_NOT_FOUND)
         try:
-            trainer = User.objects.get(id=id, role=trainer_role)
+            trainers = User.objects.filter(role_id=trainer_role.id)
+            if request.method == 'GET':
+                trainers = TrainerSerializer.setup_eager_loading(trainers)
+            trainer = trainers.get(id=id)
         except User.DoesNotExist:
             return error_response('Trainer not found', 'trainer_not_found', status.HTTP_404_NOT_FOUND)
         
         if request.method == 'GET':
-            serializer = UserSerializer(trainer)
+            serializer = TrainerSerializer(trainer)
             return Response(serializer.data)
         
         elif request.method == 'PUT':
@@ -1204,8 +2091,6 @@ def trainer_detail(request, id):
             trainer.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
     
-    except Role.DoesNotExist:
-        return error_response('Trainer role not found', 'role_not_found', status.HTTP_404_NOT_FOUND)
     except Exception as e:
         # Log the exception for debugging
         import logging
@@ -1223,7 +2108,8 @@ from django.db.models import Count, Q, Sum
 from datetime import timedelta
 
 from .models import (
-    User, Startup, Application, Resource, ResourceRequest, Event, Role
+    User, Startup, Application, Resource, ResourceRequest, Event, Role,
+    AnalyticsSnapshot, ResourceUsage
 )
 
 @api_view(['GET'])
@@ -1235,49 +2121,30 @@ def dashboard_stats(request):
     now = timezone.now()
     one_week_later = now + timedelta(days=7)
     
-    # Count active startups
-    active_startups = Startup.objects.filter(status='approved').count()
-    
-    # Count pending applications
-    pending_applications = Application.objects.filter(status='pending').count()
-    
-    # Count pending incubation forms (if applicable)
-    pending_forms = 0
-    try:
-        from .models import IncubationForm
-        pending_forms = IncubationForm.objects.filter(status='pending').count()
-    except ImportError:
-        pass
+    # Startup, application, form, mentor and trainer counts are maintained
+    # incrementally in the analytics snapshot
+    snapshot = AnalyticsSnapshot.get()
     
-    # Count mentors
-    mentor_role = Role.objects.filter(name='mentor').first()
-    mentors_count = User.objects.filter(role=mentor_role).count() if mentor_role else 0
-    
-    # Count trainers
-    trainer_role = Role.objects.filter(name='trainer').first()
-    trainers_count = User.objects.filter(role=trainer_role).count() if trainer_role else 0
-    
-    # Count upcoming events
-    upcoming_events = Event.objects.filter(start_time__gt=now).count()
-    
-    # Count events this week
-    events_this_week = Event.objects.filter(
-        start_time__gt=now,
-        start_time__lt=one_week_later
-    ).count()
+    # Event counts depend on the current time, count both ranges in one query
+    events = Event.objects.filter(start_time__gt=now).aggregate(
+        upcoming_events=Count('id'),
+        events_this_week=Count('id', filter=Q(start_time__lt=one_week_later))
+    )
     
     return Response({
-        'active_startups': active_startups,
-        'pending_applications': pending_applications,
-        'pending_forms': pending_forms,
-        'mentors_count': mentors_count,
-        'trainers_count': trainers_count,
-        'upcoming_events': upcoming_events,
-        'events_this_week': events_this_week
+        'active_startups': snapshot.active_startups,
+        'pending_applications': snapshot.pending_applications,
+        'pending_forms': snapshot.pending_forms,
+        'mentors_count': snapshot.mentors_count,
+        'trainers_count': snapshot.trainers_count,
+        'upcoming_events': events['upcoming_events'],
+        'events_this_week': events['events_this_week']
     })
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_on(Startup)
+@cache_response(Startup)
 def startup_status_analytics(request):
     """
     Get analytics on startup statuses
@@ -1296,6 +2163,8 @@ def startup_status_analytics(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_on(Application)
+@cache_response(Application)
 def application_status_analytics(request):
     """
     Get analytics on application statuses
@@ -1314,20 +2183,29 @@ def application_status_analytics(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_on(Resource, ResourceRequest, ResourceUsage)
+@cache_response(Resource, ResourceRequest, ResourceUsage)
 def resource_utilization_analytics(request):
     """
-    Get analytics on resource utilization
+    Get analytics on resource utilization, optionally filtered by ?type=
     """
-    resources = Resource.objects.all()
-    result = []
+    # Used quantities come from the ResourceUsage rollup, joined in the same query
+    resources = Resource.objects.select_related('usage').order_by('id')
+    resource_type = request.query_params.get('type')
+    if resource_type:
+        resources = resources.filter(type=resource_type)
     
+    resources = list(resources)
+    usage = {resource.id: resource.usage.used for resource in resources if hasattr(resource, 'usage')}
+    missing = [resource.id for resource in resources if resource.id not in usage]
+    if missing:
+        # Resources created without going through save() have no rollup row yet
+        for resource_id, (stored, used) in ResourceUsage.rebuild(Resource.objects.filter(id__in=missing)).items():
+            usage[resource_id] = used
+    
+    result = []
     for resource in resources:
-        # Calculate used resources
-        used = ResourceRequest.objects.filter(
-            resource=resource,
-            status='approved'
-        ).aggregate(total=Sum('quantity_requested'))['total'] or 0
-        
+        used = usage.get(resource.id, 0)
         available = max(0, resource.quantity_available - used)
         
         result.append({
@@ -1341,6 +2219,8 @@ def resource_utilization_analytics(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_on(Application)
+@cache_response(Application)
 def acceptance_rate_analytics(request):
     """
     Get analytics on application acceptance rate
@@ -1365,6 +2245,8 @@ def acceptance_rate_analytics(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_on(Startup)
+@cache_response(Startup)
 def survival_rate_analytics(request):
     """
     Get analytics on startup survival rate
@@ -1397,11 +2279,12 @@ from .serializers import ResourceSerializer, ResourceRequestSerializer, Resource
 
 @api_view(['GET', 'POST'])
 @permission_classes([AllowAny])  # Allow access without authentication for now
+@conditional_on(Resource)
+@cache_response(Resource)
 def resources_list(request):
     if request.method == 'GET':
         resources = Resource.objects.all()
-        serializer = ResourceSerializer(resources, many=True)
-        return Response(serializer.data)
+        return list_response(request, resources, ResourceSerializer)
     elif request.method == 'POST':
         serializer = ResourceSerializer(data=request.data)
         if serializer.is_valid():
@@ -1411,6 +2294,7 @@ def resources_list(request):
 
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([AllowAny])  # Allow access without authentication for now
+@conditional_on(Resource)
 def resource_detail(request, id):
     try:
         resource = Resource.objects.get(id=id)
@@ -1435,8 +2319,7 @@ def resource_detail(request, id):
 def resource_requests_list(request):
     if request.method == 'GET':
         reqs = ResourceRequest.objects.all()
-        serializer = ResourceRequestSerializer(reqs, many=True)
-        return Response(serializer.data)
+        return list_response(request, reqs, ResourceRequestSerializer)
     elif request.method == 'POST':
         serializer = ResourceRequestSerializer(data=request.data)
         if serializer.is_valid():
@@ -1449,8 +2332,7 @@ def resource_requests_list(request):
 def resource_allocations_list(request):
     if request.method == 'GET':
         allocations = ResourceAllocation.objects.all()
-        serializer = ResourceAllocationSerializer(allocations, many=True)
-        return Response(serializer.data)
+        return list_response(request, allocations, ResourceAllocationSerializer)
     elif request.method == 'POST':
         serializer = ResourceAllocationSerializer(data=request.data)
         if serializer.is_valid():
@@ -1465,47 +2347,55 @@ from .models import IncubationForm, IncubationFormScore
 @authentication_classes([])
 @permission_classes([AllowAny])
 def incubation_form_scores(request, id):
+    """
+    GET returns the form's per-criterion averages and total over every
+    reviewer, read from the form row, along with each reviewer's scores.
+    POST creates or updates one reviewer's scores, the averages on the form
+    are updated in the same transaction by the score signal handlers.
+    """
     try:
         incubation_form = IncubationForm.objects.get(id=id)
     except IncubationForm.DoesNotExist:
         return Response({'error': 'Incubation form not found'}, status=status.HTTP_404_NOT_FOUND)
-    
+
+    def scores_response(incubation_form, **extra):
+        return Response({
+            'score_count': incubation_form.score_count,
+            'problem_understanding': round(incubation_form.problem_understanding_avg, 2),
+            'solution_fit': round(incubation_form.solution_fit_avg, 2),
+            'technical_soundness': round(incubation_form.technical_soundness_avg, 2),
+            'total_score': round(incubation_form.total_score, 2),
+            **extra,
+        })
+
     if request.method == 'GET':
-        # Get existing scores
-        try:
-            score = IncubationFormScore.objects.filter(incubation_form_id=id).first()
-            if score:
-                return Response({
-                    'problem_understanding': score.problem_understanding,
-                    'solution_fit': score.solution_fit,
-                    'technical_soundness': score.technical_soundness,
-                    'total_score': score.total_score()
-                })
+        if not incubation_form.score_count:
             return Response({}, status=status.HTTP_404_NOT_FOUND)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
+        reviews = incubation_form.scores.select_related('reviewer').order_by('id')
+        return scores_response(incubation_form, reviews=IncubationFormScoreSerializer(reviews, many=True).data)
+
     elif request.method == 'POST':
-        # Create or update scores
-        problem_understanding = request.data.get('problem_understanding', 0)
-        solution_fit = request.data.get('solution_fit', 0)
-        technical_soundness = request.data.get('technical_soundness', 0)
-        
+        serializer = IncubationFormScoreInputSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        reviewer_id = data.pop('reviewer', None)
+        if reviewer_id is not None and not User.objects.filter(id=reviewer_id).exists():
+            return error_response('Reviewer not found', 'reviewer_not_found', status.HTTP_400_BAD_REQUEST)
+
         try:
             score, created = IncubationFormScore.objects.update_or_create(
                 incubation_form=incubation_form,
-                defaults={
-                    'problem_understanding': problem_understanding,
-                    'solution_fit': solution_fit,
-                    'technical_soundness': technical_soundness
-                }
+                reviewer_id=reviewer_id,
+                defaults=data
             )
-            
-            return Response({
-                'problem_understanding': score.problem_understanding,
-                'solution_fit': score.solution_fit,
-                'technical_soundness': score.technical_soundness,
-                'total_score': score.total_score()
-            })
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except IntegrityError:
+            # Another request created this reviewer's score first
+            return error_response(
+                'The score was submitted concurrently, please retry', 'concurrent_score', status.HTTP_409_CONFLICT
+            )
+
+        incubation_form.refresh_from_db(fields=[
+            'score_count', 'problem_understanding_avg', 'solution_fit_avg', 'technical_soundness_avg', 'total_score'
+        ])
+        return scores_response(incubation_form, review=IncubationFormScoreSerializer(score).data)
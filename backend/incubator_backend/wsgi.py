@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'incubator_backend.settings')
 
 application = get_wsgi_application()
+
+# Load roles and stages before the first request. Lookups load them lazily
+# if the database is not reachable yet.
+from django.db import DatabaseError  # noqa: E402
+from incubator_backend.reference import registry  # noqa: E402
+
+try:
+    registry.warm()
+except DatabaseError:
+    pass